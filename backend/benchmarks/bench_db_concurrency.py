@@ -0,0 +1,185 @@
+"""
+Ticket submission latency while dashboards poll the database, with the previous
+storage setup (rollback journal, one engine for everything) and the current one
+(WAL, one writer connection plus a read-only pool).
+
+    python -m backend.benchmarks.bench_db_concurrency --tickets 20000 --rate 100 --readers 16 --poll-interval 0.25
+
+Writes go through the group-commit TicketWriter at a fixed rate; each reader
+requests what the admin dashboard polls (ticket list, stats, a ticket's logs, a
+search) every --poll-interval seconds (0 to poll back to back).
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import List
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool  # noqa: E402
+
+from backend.database import async_crud, models  # noqa: E402
+from backend.database.migrations import run_migrations  # noqa: E402
+from backend.database.search import search_tickets  # noqa: E402
+from backend.database.session import Base, configure_sqlite  # noqa: E402
+from backend.database.stats import read_ticket_stats  # noqa: E402
+from backend.database.writer import TicketWriter  # noqa: E402
+
+
+# ~2% of messages contain any one word, so searches match a realistic slice of the table
+WORDS = [f"{stem}{n}" for stem in ("login", "invoice", "refund", "export", "upload", "card", "outage") for n in range(300)]
+
+
+def _values(i: int, rng: random.Random):
+    message = " ".join(rng.choice(WORDS) for _ in range(40))
+    ticket = dict(
+        name=f"Customer {i}",
+        email=f"customer{i}@example.com",
+        subject=" ".join(rng.choice(WORDS) for _ in range(4)),
+        message=message,
+        message_hash=f"{i:064x}",
+        is_duplicate=False,
+        category="account",
+        urgency=rng.choice(["low", "medium", "high"]),
+        priority_score=20,
+        confidence_score=0.9,
+        draft_reply="Hi, please use the reset link we just sent. Sufiyan Ali",
+        reasoning_summary="Password reset request.",
+        status=rng.choice(["Auto-Resolved", "Needs Human Review"]),
+        guardrail_flags="",
+        routing_decision="Auto-Resolve",
+    )
+    log = dict(
+        raw_input=f"name=Customer {i}; message={message}",
+        ai_output='{"category": "account"}',
+        guardrail_flags="",
+        routing_decision="Auto-Resolve",
+    )
+    return ticket, log
+
+
+def _seed(path: str, tickets: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    rng = random.Random(1)
+    rows = [_values(i, rng) for i in range(tickets)]
+    with engine.begin() as conn:
+        conn.execute(insert(models.Ticket), [ticket for ticket, _ in rows])
+        conn.execute(
+            insert(models.TicketLog), [dict(log, ticket_id=i + 1) for i, (_, log) in enumerate(rows)]
+        )
+    engine.dispose()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def _run(label: str, write_engine, read_engine, args: argparse.Namespace, max_id: int) -> None:
+    writer = TicketWriter(
+        async_sessionmaker(bind=write_engine, expire_on_commit=False), max_batch_size=64, max_delay_ms=5.0
+    )
+    read_sessions = async_sessionmaker(bind=read_engine, expire_on_commit=False)
+    await writer.start()
+
+    write_latencies: List[float] = []
+    read_latencies: List[float] = []
+    failures = {"write": 0, "read": 0}
+    started = time.perf_counter()
+    stop_at = started + args.duration
+
+    async def submit(i: int) -> None:
+        begin = time.perf_counter()
+        try:
+            await writer.submit(*_values(max_id + i, random.Random(i)))
+        except OperationalError:
+            failures["write"] += 1
+        write_latencies.append(time.perf_counter() - begin)
+
+    async def submitter() -> None:
+        pending = []
+        i = 0
+        while time.perf_counter() < stop_at:
+            pending.append(asyncio.create_task(submit(i)))
+            i += 1
+            await asyncio.sleep(max(0.0, started + i / args.rate - time.perf_counter()))
+        await asyncio.gather(*pending)
+
+    async def reader(seed: int) -> None:
+        rng = random.Random(seed)
+        while time.perf_counter() < stop_at:
+            begin = time.perf_counter()
+            try:
+                async with read_sessions() as db:
+                    await async_crud.list_tickets(db, status=rng.choice([None, "Needs Human Review"]), limit=50)
+                    await read_ticket_stats(db)
+                    await async_crud.list_ticket_logs(db, rng.randint(1, max_id), include_payload=False)
+                    await search_tickets(db, f"{rng.choice(WORDS)} {rng.choice(WORDS)}", limit=20)
+            except OperationalError:
+                failures["read"] += 1
+            read_latencies.append(time.perf_counter() - begin)
+            await asyncio.sleep(args.poll_interval)
+
+    await asyncio.gather(submitter(), *(reader(seed) for seed in range(args.readers)))
+    await writer.stop()
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{label:<34} {_percentile(write_latencies, 0.5) * 1000:>7.1f} {_percentile(write_latencies, 0.99) * 1000:>8.1f} "
+        f"{max(write_latencies) * 1000:>8.1f} {failures['write']:>6}   "
+        f"{len(read_latencies) / elapsed:>8.0f} {_percentile(read_latencies, 0.99) * 1000:>8.1f} {failures['read']:>6}"
+    )
+
+
+async def _previous(path: str, args: argparse.Namespace) -> None:
+    # Default rollback journal; aiosqlite's default NullPool opens a connection per session
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    await _run("rollback journal, one engine", engine, engine, args, args.tickets)
+    await engine.dispose()
+
+
+async def _current(path: str, args: argparse.Namespace) -> None:
+    url = f"sqlite+aiosqlite:///{path}"
+    write_engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+    read_engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=args.read_pool, max_overflow=0)
+    configure_sqlite(write_engine.sync_engine, immediate_transactions=True)
+    configure_sqlite(read_engine.sync_engine, read_only=True)
+    await _run("WAL, writer + read-only pool", write_engine, read_engine, args, args.tickets)
+    await write_engine.dispose()
+    await read_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=20_000, help="Tickets in the database before the run")
+    parser.add_argument("--rate", type=float, default=100.0, help="Ticket submissions per second")
+    parser.add_argument("--readers", type=int, default=16, help="Dashboard pollers")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Seconds between a reader's polls")
+    parser.add_argument("--read-pool", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        seeded = os.path.join(tmp, "seed.db")
+        _seed(seeded, args.tickets)
+        print(f"{'':<34} {'submit latency (ms)':^25} {'errors':>6}   {'reads/s':>8} {'p99 ms':>8} {'errors':>6}")
+        print(f"{'':<34} {'p50':>7} {'p99':>8} {'max':>8}")
+        for name, run in (("previous.db", _previous), ("current.db", _current)):
+            path = os.path.join(tmp, name)
+            shutil.copy(seeded, path)
+            asyncio.run(run(path, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Guardrail phrase scanning: linear ``phrase in text`` scan vs the compiled engine.
+
+    python -m backend.benchmarks.bench_guardrails --sizes 1000 10000 100000 --drafts 200
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from backend.services.guardrail_engine import GuardrailEngine  # noqa: E402
+
+WORDS = (
+    "account refund policy billing invoice payment password reset login error service "
+    "support order delivery shipping charge credit card subscription cancel upgrade plan "
+    "guarantee compliant legal liable terms conditions access security data privacy team"
+).split()
+
+FLAGS = [
+    "refund_or_financial_commitment",
+    "legal_advice_or_liability",
+    "compliance_claim",
+    "fabricated_or_risky_policy",
+]
+
+
+def _phrases(count: int, rng: random.Random) -> dict:
+    phrases = {}
+    while len(phrases) < count:
+        phrase = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5)))
+        phrases[phrase] = rng.choice(FLAGS)
+    return phrases
+
+
+def _drafts(count: int, rng: random.Random) -> list:
+    return [
+        "Hi there, thanks for reaching out. "
+        + " ".join(rng.choice(WORDS) for _ in range(90))
+        + " Best regards, Sufiyan Ali"
+        for _ in range(count)
+    ]
+
+
+def _linear_scan(phrases: dict, draft: str) -> list:
+    text = draft.lower()
+    return sorted({flag for phrase, flag in phrases.items() if phrase in text})
+
+
+def main(sizes, draft_count: int) -> None:
+    rng = random.Random(42)
+    drafts = _drafts(draft_count, rng)
+    print(f"{'phrases':>8} {'compile':>10} {'linear/draft':>14} {'engine/draft':>14} {'scan_many/draft':>16}")
+
+    for size in sizes:
+        phrases = _phrases(size, rng)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rules.json")
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump({"phrases": phrases, "patterns": {}}, fh)
+            started = time.perf_counter()
+            engine = GuardrailEngine(path, reload_interval=-1)
+            compile_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        expected = [_linear_scan(phrases, d) for d in drafts]
+        linear_us = (time.perf_counter() - started) / len(drafts) * 1e6
+
+        started = time.perf_counter()
+        got = [engine.scan(d) for d in drafts]
+        engine_us = (time.perf_counter() - started) / len(drafts) * 1e6
+        assert got == expected, "engine and linear scan disagree"
+
+        started = time.perf_counter()
+        engine.scan_many(drafts)
+        batch_us = (time.perf_counter() - started) / len(drafts) * 1e6
+
+        print(
+            f"{size:>8} {compile_s:>9.2f}s {linear_us:>12.0f}us {engine_us:>12.0f}us {batch_us:>14.0f}us"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--drafts", type=int, default=200)
+    args = parser.parse_args()
+    main(args.sizes, args.drafts)
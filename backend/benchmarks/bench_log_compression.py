@@ -0,0 +1,129 @@
+"""
+Storage used by ``ticket_logs`` with plain TEXT payloads versus compressed ones.
+
+    python -m backend.benchmarks.bench_log_compression --tickets 20000
+
+The corpus mimics production logs: multi-paragraph customer messages built from
+a support vocabulary plus the pretty-printed Gemini JSON for each ticket.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from backend.database import models  # noqa: E402,F401
+from backend.database.migrations import compress_log_payloads, run_migrations  # noqa: E402
+from backend.database.session import Base  # noqa: E402
+
+
+SENTENCES = [
+    "I was charged twice for my subscription this month.",
+    "The password reset email never arrives, even after checking spam.",
+    "Our team cannot access the dashboard since this morning's update.",
+    "Please refund the duplicate payment to my original card.",
+    "The export button returns an error whenever the report is larger than a few pages.",
+    "I have attached the invoice number and the last four digits of the card.",
+    "This is blocking our month-end close, so a quick answer would be appreciated.",
+    "The mobile app logs me out every few minutes on Android.",
+    "Can you confirm whether my data was affected by the outage?",
+    "We would like to upgrade to the business plan and add five seats.",
+]
+CATEGORIES = ["billing", "account", "technical", "general"]
+
+
+def _corpus(tickets: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(tickets):
+        message = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 12)))
+        message += f" Order reference #{rng.randint(100000, 999999)}."
+        category = rng.choice(CATEGORIES)
+        ai_output = json.dumps(
+            {
+                "category": category,
+                "urgency": rng.choice(["low", "medium", "high"]),
+                "priority_score": rng.randint(0, 100),
+                "confidence_score": round(rng.random(), 2),
+                "draft_reply": "Hi,\n\nThanks for reaching out. "
+                + " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 5)))
+                + "\n\nBest regards,\nSufiyan Ali",
+                "reasoning_summary": f"Customer reports a {category} issue.",
+            },
+            indent=2,
+        )
+        raw_input = f"name=Customer {i}; email=customer{i}@example.com; subject=Help; message={message}"
+        yield raw_input, ai_output
+
+
+def _build(path: str, tickets: int, seed: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO tickets (name, email, subject, message, message_hash, is_duplicate, "
+                "status, created_at) VALUES ('c', 'c@example.com', 's', 'm', 'h', 0, 'Auto-Resolved', "
+                "CURRENT_TIMESTAMP)"
+            )
+        )
+        # Plain TEXT rows, exactly as written before payload compression
+        conn.execute(
+            text(
+                "INSERT INTO ticket_logs (ticket_id, timestamp, raw_input, ai_output, routing_decision) "
+                "VALUES (1, CURRENT_TIMESTAMP, :raw_input, :ai_output, 'Auto-Resolve')"
+            ),
+            [{"raw_input": r, "ai_output": a} for r, a in _corpus(tickets, seed)],
+        )
+    engine.dispose()
+
+
+def _payload_bytes(path: str) -> int:
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as conn:
+        size = conn.execute(
+            text("SELECT SUM(LENGTH(CAST(raw_input AS BLOB)) + LENGTH(CAST(ai_output AS BLOB))) FROM ticket_logs")
+        ).scalar_one()
+    engine.dispose()
+    return int(size or 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        path = os.path.join(tmp, "logs.db")
+        _build(path, args.tickets, args.seed)
+        plain_payload = _payload_bytes(path)
+        plain_file = os.path.getsize(path)
+
+        # The same migration ``python -m backend.cli compress-logs --vacuum`` runs
+        engine = create_engine(f"sqlite:///{path}")
+        started = time.perf_counter()
+        compress_log_payloads(engine, batch_size=1000)
+        elapsed = time.perf_counter() - started
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+        engine.dispose()
+        compressed_payload = _payload_bytes(path)
+        compressed_file = os.path.getsize(path)
+
+    print(f"{'':<20} {'payload bytes':>14} {'db file bytes':>14}")
+    print(f"{'plain TEXT':<20} {plain_payload:>14,} {plain_file:>14,}")
+    print(f"{'compressed':<20} {compressed_payload:>14,} {compressed_file:>14,}")
+    print(
+        f"payload reduction {1 - compressed_payload / plain_payload:.1%}, "
+        f"file reduction {1 - compressed_file / plain_file:.1%}, migration {elapsed:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
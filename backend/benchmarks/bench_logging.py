@@ -0,0 +1,135 @@
+"""
+Event-loop cost of logging during an error storm: many concurrent requests
+logging Gemini timeouts with tracebacks at once, as during a Gemini outage.
+
+    python -m backend.benchmarks.bench_logging --requests 2000 --errors-per-request 2
+
+Compares the previous setup (RotatingFileHandler + StreamHandler written on the
+calling thread) with the queue-based pipeline, with and without the repeated-record
+limit. Console output goes to /dev/null so only the handler cost is measured.
+Reports the time the loop spent in logging calls and the worst loop stall seen
+by a 1 ms ticker task.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Callable, List
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from backend.utils.logging_config import TEXT_FORMAT, setup_logging, stop_logging  # noqa: E402
+
+
+logger = logging.getLogger("backend.services.gemini_service")
+
+
+def _legacy_setup(log_dir: str) -> Callable[[], None]:
+    # The handlers setup_logging installed before the queue pipeline
+    formatter = logging.Formatter(TEXT_FORMAT)
+    handler = RotatingFileHandler(
+        os.path.join(log_dir, "flowgen_backend.log"), maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8"
+    )
+    handler.setFormatter(formatter)
+    console = logging.StreamHandler()
+    console.setFormatter(formatter)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(handler)
+    root.addHandler(console)
+
+    def teardown() -> None:
+        for h in (handler, console):
+            root.removeHandler(h)
+            h.close()
+
+    return teardown
+
+
+def _queue_setup(rate_limit_burst: int) -> Callable[[str], Callable[[], None]]:
+    def setup(log_dir: str) -> Callable[[], None]:
+        setup_logging(log_dir=log_dir, rate_limit_burst=rate_limit_burst)
+        return stop_logging
+
+    return setup
+
+
+def _fail() -> None:
+    # A few frames deep, like a timeout surfacing from the executor
+    def inner(depth: int) -> None:
+        if depth == 0:
+            raise asyncio.TimeoutError()
+        inner(depth - 1)
+
+    inner(8)
+
+
+async def _storm(requests: int, errors_per_request: int) -> tuple:
+    in_logging: List[float] = []
+    stalls: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - started - 0.001)
+
+    async def request() -> None:
+        for attempt in range(errors_per_request):
+            await asyncio.sleep(0)
+            try:
+                _fail()
+            except asyncio.TimeoutError:
+                started = time.perf_counter()
+                logger.exception("Gemini timeout on attempt %s", attempt + 1)
+                in_logging.append(time.perf_counter() - started)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+    return elapsed, in_logging, max(stalls, default=0.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--errors-per-request", type=int, default=2)
+    args = parser.parse_args()
+
+    variants = (
+        ("file + console (previous)", _legacy_setup),
+        ("queue, no limit", _queue_setup(0)),
+        ("queue, limit 10/min", _queue_setup(10)),
+    )
+    print(f"{'':<28} {'total':>9} {'per record':>11} {'p99':>9} {'max stall':>10} {'log lines':>10}")
+    stderr = sys.stderr
+    for label, setup in variants:
+        with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, "w") as devnull:
+            sys.stderr = devnull
+            teardown = setup(log_dir)
+            try:
+                elapsed, in_logging, max_stall = asyncio.run(_storm(args.requests, args.errors_per_request))
+            finally:
+                teardown()
+                sys.stderr = stderr
+            with open(os.path.join(log_dir, "flowgen_backend.log"), encoding="utf-8") as fh:
+                lines = sum(1 for _ in fh)
+        in_logging.sort()
+        per_record = sum(in_logging) / len(in_logging) * 1e6
+        p99 = in_logging[int(len(in_logging) * 0.99)] * 1e6
+        print(
+            f"{label:<28} {elapsed:>8.2f}s {per_record:>8.1f} us {p99:>6.0f} us "
+            f"{max_stall * 1000:>7.1f} ms {lines:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Cost of recording a histogram observation: per-thread shards versus a single
+lock-protected histogram, from 1 and from several threads.
+
+    python -m backend.benchmarks.bench_metrics --observations 200000 --threads 8
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from backend.utils.metrics import DEFAULT_BUCKETS, Histogram  # noqa: E402
+
+
+STAGES = ["validation", "dedupe", "llm", "guardrails", "db"]
+
+
+class LockedHistogram:
+    """The straightforward alternative: one dict guarded by one lock."""
+
+    def __init__(self) -> None:
+        self._cells: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            cell = self._cells.get(labels)
+            if cell is None:
+                cell = self._cells[labels] = [0.0] * (len(DEFAULT_BUCKETS) + 2)
+            cell[bisect_left(DEFAULT_BUCKETS, value)] += 1
+            cell[-1] += value
+
+
+def _run(observe: Callable[..., None], observations: int, threads: int) -> float:
+    rng = random.Random(1)
+    values = [(rng.lognormvariate(-5, 2), rng.choice(STAGES)) for _ in range(observations)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker() -> None:
+        barrier.wait()
+        for value, stage in values:
+            observe(value, stage)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return elapsed / (observations * threads) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--observations", type=int, default=200_000, help="Observations per thread")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'':<24} {'1 thread':>12} {f'{args.threads} threads':>12}")
+    variants = (
+        ("per-thread shards", lambda: Histogram("bench", "", ("stage",))),
+        ("single lock", LockedHistogram),
+    )
+    for label, factory in variants:
+        single = _run(factory().observe, args.observations, 1)
+        multi = _run(factory().observe, args.observations, args.threads)
+        print(f"{label:<24} {single:>9.0f} ns {multi:>9.0f} ns")
+
+    histogram = Histogram("bench", "", ("stage",))
+    _run(histogram.observe, args.observations, args.threads)
+    started = time.perf_counter()
+    histogram.render()
+    print(f"render after {args.threads} threads: {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
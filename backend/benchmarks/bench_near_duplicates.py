@@ -0,0 +1,133 @@
+"""
+Near-duplicate index: build rate, lookup latency, recall and snapshot restore.
+
+    python -m backend.benchmarks.bench_near_duplicates --tickets 1000000
+
+Indexes synthetic support messages, then looks up near-duplicates (one word
+changed, a different order number, a signature added) and unrelated messages,
+verifying candidates against the stored messages exactly as ``prepare_ticket``
+does.
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from backend.benchmarks.bench_search import WORDS  # noqa: E402
+from backend.services.near_duplicates import NearDuplicateIndex, jaccard, shingles  # noqa: E402
+
+
+def _vocabulary(size: int, seed: int):
+    # Letters only: digits are normalised away by the shingler
+    rng = random.Random(seed)
+    words = set(WORDS)
+    while len(words) < size:
+        words.add("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9))))
+    return sorted(words, key=lambda word: (word not in WORDS, word))
+
+
+VOCABULARY = _vocabulary(5000, seed=3)
+CUM_WEIGHTS = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+
+def _message(rng: random.Random) -> str:
+    words = rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=rng.randint(20, 60))
+    return f"Hello, {' '.join(words)}. Order #{rng.randint(100000, 999999)}."
+
+
+def _perturb(message: str, rng: random.Random) -> str:
+    words = message.split()
+    variant = rng.randrange(3)
+    if variant == 0:
+        words[rng.randrange(1, len(words) - 2)] = rng.choice(VOCABULARY)
+        return " ".join(words)
+    if variant == 1:
+        return message.rsplit("#", 1)[0] + f"#{rng.randint(100000, 999999)}."
+    return message + "\n\nBest regards,\nJamie"
+
+
+def _ms(timings):
+    timings = sorted(timings)
+    return statistics.median(timings) * 1000, timings[int(len(timings) * 0.95)] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--num-perm", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    messages = {ticket_id: _message(rng) for ticket_id in range(1, args.tickets + 1)}
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        snapshot = os.path.join(tmp, "near_duplicates.npz")
+        index = NearDuplicateIndex(threshold=args.threshold, num_perm=args.num_perm, snapshot_path=snapshot)
+        print(f"{index.bands} bands x {index.rows} rows, threshold {args.threshold}")
+
+        items = sorted(messages.items())
+
+        def fetch_after(after_id: int, chunk: int = 10000):
+            return items[after_id : after_id + chunk]
+
+        started = time.perf_counter()
+        index.catch_up(fetch_after)
+        elapsed = time.perf_counter() - started
+        print(f"Indexed {args.tickets:,} messages in {elapsed:.1f}s ({args.tickets / elapsed:,.0f}/sec)")
+
+        def lookup(message: str):
+            started = time.perf_counter()
+            candidates = index.candidates(message)
+            match = index.best_match(message, {i: messages[i] for i in candidates})
+            return match, time.perf_counter() - started
+
+        found = eligible = 0
+        timings = []
+        for _ in range(args.queries):
+            original = rng.randint(1, args.tickets)
+            variant = _perturb(messages[original], rng)
+            match, took = lookup(variant)
+            # Recall over variants that really are above the threshold
+            if jaccard(shingles(variant), shingles(messages[original])) >= args.threshold:
+                eligible += 1
+                found += match is not None
+            timings.append(took)
+        p50, p95 = _ms(timings)
+        print(
+            f"near-duplicate lookups: {eligible}/{args.queries} above threshold, "
+            f"recall {found / max(eligible, 1):.1%}, p50 {p50:.2f} ms, p95 {p95:.2f} ms"
+        )
+
+        false_matches = 0
+        timings = []
+        for _ in range(args.queries):
+            match, took = lookup(_message(rng))
+            false_matches += match is not None
+            timings.append(took)
+        p50, p95 = _ms(timings)
+        print(f"unrelated lookups: false matches {false_matches / args.queries:.1%}, p50 {p50:.2f} ms, p95 {p95:.2f} ms")
+
+        index._complete = True
+        started = time.perf_counter()
+        index.save_snapshot()
+        saved = time.perf_counter() - started
+        restored = NearDuplicateIndex(threshold=args.threshold, num_perm=args.num_perm, snapshot_path=snapshot)
+        started = time.perf_counter()
+        restored.load_snapshot()
+        loaded = time.perf_counter() - started
+        print(
+            f"snapshot {os.path.getsize(snapshot) / 1e6:,.1f} MB: save {saved:.2f}s, "
+            f"restore {loaded:.2f}s ({len(restored):,} tickets)"
+        )
+
+
+if __name__ == "__main__":
+    main()
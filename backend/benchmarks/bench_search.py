@@ -0,0 +1,145 @@
+"""
+Full-text search latency on a large ticket table.
+
+    python -m backend.benchmarks.bench_search --tickets 1000000
+
+Loads synthetic tickets (indexed by the FTS triggers as they are inserted), then
+times ``search_tickets`` for common, rare, prefix, multi-word and filtered
+queries, plus the second page of a common query. Also reports the time of a full
+``backfill-search`` rebuild and the size of the index.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from backend.database import models  # noqa: E402,F401
+from backend.database.migrations import run_migrations  # noqa: E402
+from backend.database.search import FTS_TABLE, rebuild_search_index, search_tickets  # noqa: E402
+from backend.database.session import Base  # noqa: E402
+
+
+WORDS = (
+    "account access login password reset email invoice refund payment charge card billing "
+    "subscription plan upgrade downgrade cancel export report dashboard error crash slow "
+    "mobile android ios browser update outage data security team seat license api webhook "
+    "integration sync calendar notification order shipping delivery address receipt tax"
+).split()
+# Zipf-distributed vocabulary: the support terms above rank 10-70 among 5,000
+# words, so a "common" query word appears in roughly a tenth of the tickets
+VOCABULARY = [f"w{n}" for n in range(10)] + WORDS + [f"w{n}" for n in range(10, 5000 - len(WORDS))]
+CUM_WEIGHTS = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+STATUSES = ["Auto-Resolved", "Needs Human Review", "Escalated"]
+URGENCIES = ["low", "medium", "high"]
+
+QUERIES = [
+    ("common word", "payment", {}),
+    ("rare word", "chargeback", {}),
+    ("prefix", "subscr*", {}),
+    ("two words", "refund invoice", {}),
+    ("filtered", "login error", {"status": "Escalated", "urgency": "high"}),
+]
+
+
+def _rows(tickets: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(tickets):
+        words = rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=rng.randint(20, 60))
+        if rng.random() < 0.0005:
+            words.append("chargeback")
+        yield {
+            "name": f"Customer {i}",
+            "email": f"customer{i}@example.com",
+            "subject": " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=4)),
+            "message": " ".join(words),
+            "message_hash": f"{i:064x}",
+            "is_duplicate": False,
+            "category": "billing",
+            "urgency": rng.choice(URGENCIES),
+            "status": rng.choice(STATUSES),
+            "draft_reply": "Hi, thanks for reaching out. "
+            + " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=15)),
+            "created_at": "2024-01-01 00:00:00",
+        }
+
+
+def _load(engine, tickets: int, seed: int) -> float:
+    insert = text(
+        "INSERT INTO tickets (name, email, subject, message, message_hash, is_duplicate, category, "
+        "urgency, status, draft_reply, created_at) VALUES (:name, :email, :subject, :message, "
+        ":message_hash, :is_duplicate, :category, :urgency, :status, :draft_reply, :created_at)"
+    )
+    started = time.perf_counter()
+    batch = []
+    for row in _rows(tickets, seed):
+        batch.append(row)
+        if len(batch) == 10000:
+            with engine.begin() as conn:
+                conn.execute(insert, batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert, batch)
+    return time.perf_counter() - started
+
+
+async def _time_queries(path: str, repeat: int) -> None:
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+    print(f"{'query':<24} {'hits':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    async with session_factory() as db:
+        first_page = await search_tickets(db, "payment", limit=20)
+        page_two = {"after": (first_page[-1].score, first_page[-1].id)} if first_page else {}
+        for label, query, filters in QUERIES + [("common word, page 2", "payment", page_two)]:
+            timings = []
+            hits = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                hits = await search_tickets(db, query, limit=20, **filters)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{label:<24} {len(hits):>5} {statistics.median(timings):>8.1f} {p95:>8.1f}")
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        path = os.path.join(tmp, "search.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+
+        elapsed = _load(engine, args.tickets, args.seed)
+        print(f"Loaded {args.tickets:,} tickets with FTS triggers in {elapsed:.1f}s "
+              f"({args.tickets / elapsed:,.0f} tickets/sec)")
+
+        started = time.perf_counter()
+        rebuild_search_index(engine)
+        print(f"backfill-search rebuild: {time.perf_counter() - started:.1f}s")
+        with engine.connect() as conn:
+            index_bytes = conn.execute(text(f"SELECT sum(length(block)) FROM {FTS_TABLE}_data")).scalar_one()
+        print(f"Index size: {index_bytes / 1e6:,.1f} MB, database file: {os.path.getsize(path) / 1e6:,.1f} MB")
+        engine.dispose()
+
+        asyncio.run(_time_queries(path, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Cost per 1k rows of the ticket list and ticket log responses, before and after
+rows are sent straight to orjson instead of through a Pydantic model per row.
+
+    python -m backend.benchmarks.bench_serialization --repeat 50
+
+"previous" re-implements the earlier handlers: a TicketListItem / TicketLogEntry
+built per row (log rows loaded as ORM entities) and the result validated and
+serialized again by FastAPI's response_model handling. "current" calls the route
+functions. Both include the query; "fetch" is the query alone (projected rows),
+so the serialization cost is the difference.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import undefer_group  # noqa: E402
+
+from backend.database import async_crud, models  # noqa: E402
+from backend.database.session import Base  # noqa: E402
+from backend.models.schemas import TicketListItem, TicketListResponse, TicketLogEntry  # noqa: E402
+from backend.routers import tickets as routes  # noqa: E402
+from backend.utils.pagination import encode_cursor  # noqa: E402
+
+
+PAGE_SIZE = 200
+ROWS = 1000
+LOG_TICKET_ID = 1
+
+# Cursor of each page (filled by _fetch_list), so the current handler pages as the dashboard does
+_page_cursors: List[Optional[str]] = []
+
+LIST_FIELD = create_model_field(name="list", type_=TicketListResponse, mode="serialization")
+LOGS_FIELD = create_model_field(name="logs", type_=List[TicketLogEntry], mode="serialization")
+
+
+def _seed(path: str) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    started = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.Ticket),
+            [
+                dict(
+                    name=f"Customer {i}",
+                    email=f"customer{i}@example.com",
+                    subject="Cannot log in",
+                    message="I forgot my password and the reset link does not arrive.",
+                    message_hash=f"{i:064x}",
+                    is_duplicate=False,
+                    category="account",
+                    urgency="low",
+                    priority_score=20,
+                    confidence_score=0.9,
+                    status="Auto-Resolved",
+                    routing_decision="Auto-Resolve",
+                    created_at=started + timedelta(seconds=i),
+                )
+                for i in range(ROWS)
+            ],
+        )
+        conn.execute(
+            insert(models.TicketLog),
+            [
+                dict(
+                    ticket_id=LOG_TICKET_ID,
+                    timestamp=started + timedelta(seconds=i),
+                    raw_input="name=Customer; subject=Cannot log in; message=I forgot my password. " * 3,
+                    ai_output='{"category": "account", "urgency": "low", "priority_score": 20}',
+                    guardrail_flags="",
+                    routing_decision="Auto-Resolve",
+                    prompt_tokens=420,
+                    output_tokens=95,
+                    total_tokens=515,
+                    classifier="gemini",
+                )
+                for i in range(ROWS)
+            ],
+        )
+    engine.dispose()
+
+
+async def _fastapi_body(field, content) -> bytes:
+    # What FastAPI does with a return value that is not a Response
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def _previous_list(db: AsyncSession) -> None:
+    after = None
+    for _ in range(ROWS // PAGE_SIZE):
+        rows = await async_crud.list_tickets(db, limit=PAGE_SIZE, after=after)
+        items = [
+            TicketListItem(
+                id=t.id,
+                name=t.name,
+                email=t.email,
+                subject=t.subject,
+                category=t.category,
+                urgency=t.urgency,
+                priority_score=t.priority_score,
+                confidence_score=t.confidence_score,
+                status=t.status,
+                created_at=t.created_at,
+            )
+            for t in rows
+        ]
+        await _fastapi_body(LIST_FIELD, TicketListResponse(items=items, next_cursor=None))
+        after = (rows[-1].created_at, rows[-1].id)
+
+
+async def _current_list(db: AsyncSession) -> None:
+    for cursor in _page_cursors:
+        await routes.list_tickets(status_filter=None, urgency=None, limit=PAGE_SIZE, cursor=cursor, db=db)
+
+
+async def _fetch_list(db: AsyncSession) -> None:
+    after = None
+    _page_cursors[:] = [None]
+    for _ in range(ROWS // PAGE_SIZE):
+        rows = await async_crud.list_tickets(db, limit=PAGE_SIZE, after=after)
+        after = (rows[-1].created_at, rows[-1].id)
+        _page_cursors.append(encode_cursor(*after))
+    del _page_cursors[-1]
+
+
+async def _previous_logs(db: AsyncSession) -> None:
+    result = await db.execute(
+        select(models.TicketLog)
+        .where(models.TicketLog.ticket_id == LOG_TICKET_ID)
+        .order_by(models.TicketLog.timestamp.asc())
+        .options(undefer_group("payload"))
+    )
+    logs = result.scalars().all()
+    entries = [
+        TicketLogEntry(
+            id=log.id,
+            timestamp=log.timestamp,
+            raw_input=log.raw_input,
+            ai_output=log.ai_output,
+            guardrail_flags=log.guardrail_flags,
+            routing_decision=log.routing_decision,
+            gemini_error=log.gemini_error,
+            prompt_tokens=log.prompt_tokens,
+            output_tokens=log.output_tokens,
+            total_tokens=log.total_tokens,
+            classifier=log.classifier,
+        )
+        for log in logs
+    ]
+    await _fastapi_body(LOGS_FIELD, entries)
+
+
+async def _current_logs(db: AsyncSession) -> None:
+    await routes.get_ticket_logs(LOG_TICKET_ID, view="full", db=db)
+
+
+async def _fetch_logs(db: AsyncSession) -> None:
+    await async_crud.list_ticket_logs(db, LOG_TICKET_ID)
+
+
+async def _time(sessions, run: Callable[[AsyncSession], Awaitable[None]], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        # A fresh session each time, so ORM entities are never served from the identity map
+        async with sessions() as db:
+            started = time.perf_counter()
+            await run(db)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+async def _main(path: str, repeat: int) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    print(f"per {ROWS} rows (median of {repeat})  {'fetch':>8} {'previous':>9} {'current':>9} {'serialization':>22}")
+    for label, fetch, previous, current in (
+        (f"GET /tickets ({PAGE_SIZE}/page)", _fetch_list, _previous_list, _current_list),
+        ("GET /tickets/{id}/logs", _fetch_logs, _previous_logs, _current_logs),
+    ):
+        # Warm-up (also fills the page cursors)
+        await _time(sessions, fetch, 3)
+        await _time(sessions, current, 3)
+        fetch_ms = await _time(sessions, fetch, repeat)
+        previous_ms = await _time(sessions, previous, repeat)
+        current_ms = await _time(sessions, current, repeat)
+        before, after = previous_ms - fetch_ms, current_ms - fetch_ms
+        print(
+            f"{label:<32} {fetch_ms:>6.2f}ms {previous_ms:>7.2f}ms {current_ms:>7.2f}ms "
+            f"{before:>6.2f} -> {after:>5.2f} ms ({before / max(after, 1e-6):.1f}x)"
+        )
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        path = os.path.join(tmp, "serialization.db")
+        _seed(path)
+        asyncio.run(_main(path, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
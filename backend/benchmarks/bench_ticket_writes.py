@@ -0,0 +1,114 @@
+"""
+Tickets/sec for the ticket + log write path, before and after group commit.
+
+    python -m backend.benchmarks.bench_ticket_writes --tickets 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend.database import crud, models  # noqa: E402
+from backend.database.session import Base  # noqa: E402
+from backend.database.writer import TicketWriter  # noqa: E402
+
+
+def _values(i: int):
+    ticket = dict(
+        name=f"Customer {i}",
+        email=f"customer{i}@example.com",
+        subject="Cannot log in",
+        message="I forgot my password and the reset link does not arrive. " * 4,
+        message_hash=f"{i:064x}",
+        is_duplicate=False,
+        category="account",
+        urgency="low",
+        priority_score=20,
+        confidence_score=0.9,
+        draft_reply="Hi, please use the reset link we just sent. Sufiyan Ali",
+        reasoning_summary="Password reset request.",
+        status="Auto-Resolved",
+        guardrail_flags="",
+        routing_decision="Auto-Resolve",
+    )
+    log = dict(
+        raw_input=f"name=Customer {i}; message={ticket['message']}",
+        ai_output='{"category": "account"}',
+        guardrail_flags="",
+        routing_decision="Auto-Resolve",
+    )
+    return ticket, log
+
+
+async def _run(label: str, tickets: int, concurrency: int, write) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await write(*_values(i))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(tickets)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {tickets / elapsed:>10.1f} tickets/sec  ({elapsed:.2f}s)")
+
+
+def _run_baseline(db_path: str, tickets: int) -> None:
+    # The previous path: sync Session, commit + refresh for the ticket, then again for the log
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    started = time.perf_counter()
+    for i in range(tickets):
+        ticket_values, log_values = _values(i)
+        with session_factory() as db:
+            ticket = crud.create_ticket(db, models.Ticket(**ticket_values))
+            crud.create_ticket_log(db, ticket_id=ticket.id, **log_values)
+    elapsed = time.perf_counter() - started
+    print(f"{'two commits per ticket':<32} {tickets / elapsed:>10.1f} tickets/sec  ({elapsed:.2f}s)")
+    engine.dispose()
+
+
+async def _run_group_commit(
+    db_path: str, tickets: int, concurrency: int, batch_size: int, delay_ms: float
+) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    writer = TicketWriter(
+        async_sessionmaker(bind=engine, expire_on_commit=False),
+        max_batch_size=batch_size,
+        max_delay_ms=delay_ms,
+    )
+    await writer.start()
+    await _run("group commit", tickets, concurrency, writer.submit)
+    await writer.stop()
+    await engine.dispose()
+
+
+def main(tickets: int, concurrency: int, batch_size: int, delay_ms: float) -> None:
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        _run_baseline(os.path.join(tmp, "baseline.db"), tickets)
+        asyncio.run(
+            _run_group_commit(
+                os.path.join(tmp, "group_commit.db"), tickets, concurrency, batch_size, delay_ms
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    main(args.tickets, args.concurrency, args.batch_size, args.delay_ms)
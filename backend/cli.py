@@ -0,0 +1,249 @@
+"""
+Maintenance commands for the FlowGen AI backend.
+
+    python -m backend.cli compress-logs [--batch-size 500] [--vacuum]
+    python -m backend.cli rebuild-stats
+    python -m backend.cli backfill-search
+    python -m backend.cli archive --older-than-days 180 [--output-dir ./flowgen_archive] [--dry-run]
+    python -m backend.cli reevaluate [--dry-run] [--chunk-size 1000] [--workers 0]
+    python -m backend.cli train-classifier [--holdout 0.2] [--dry-run]
+    python -m backend.cli evaluate-classifier [--all]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from backend.config import get_settings
+from backend.database import crud, models  # noqa: F401  (registers tables on Base)
+from backend.database.archive import archive_tickets, count_archivable
+from backend.database.migrations import compress_log_payloads, run_migrations
+from backend.database.search import rebuild_search_index, supports_search
+from backend.database.session import Base, SessionLocal, async_engine, async_read_engine, engine
+from backend.database.stats import rebuild_ticket_stats
+from backend.services import local_classifier
+from backend.services.reevaluation import ReevaluationJob, reevaluate_tickets
+
+
+settings = get_settings()
+
+DEFAULT_THRESHOLDS = "0.5,0.7,0.8,0.9,0.95,0.99"
+
+
+def _prepare_schema() -> None:
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+
+def compress_logs(args: argparse.Namespace) -> int:
+    _prepare_schema()
+    scanned, rewritten = compress_log_payloads(engine, batch_size=args.batch_size)
+    print(f"Scanned {scanned} log rows, compressed {rewritten}.")
+    if args.vacuum and engine.dialect.name == "sqlite":
+        # Freed pages are only returned to the filesystem by VACUUM
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+        print("Database vacuumed.")
+    return 0
+
+
+def rebuild_stats(args: argparse.Namespace) -> int:
+    _prepare_schema()
+    counters = rebuild_ticket_stats(engine)
+    print(f"Rebuilt {counters} ticket stat counters.")
+    return 0
+
+
+def backfill_search(args: argparse.Namespace) -> int:
+    _prepare_schema()
+    if not supports_search(engine.dialect.name):
+        print(f"Full-text search is only available on SQLite (DATABASE_URL uses {engine.dialect.name}).")
+        return 1
+    indexed = rebuild_search_index(engine)
+    print(f"Indexed {indexed} tickets for full-text search.")
+    return 0
+
+
+def archive(args: argparse.Namespace) -> int:
+    _prepare_schema()
+    before = datetime.utcnow() - timedelta(days=args.older_than_days)
+    if args.dry_run:
+        tickets, logs = count_archivable(engine, before)
+        print(f"Would archive {tickets} tickets and {logs} log entries created before {before:%Y-%m-%d %H:%M} UTC.")
+        return 0
+    result = archive_tickets(
+        engine, before=before, output_dir=args.output_dir, format=args.format, chunk_size=args.chunk_size
+    )
+    print(
+        f"Archived {result.tickets} tickets and {result.logs} log entries created before "
+        f"{before:%Y-%m-%d %H:%M} UTC to {args.output_dir} ({len(result.partitions)} daily partitions)."
+    )
+    if args.vacuum and result.tickets and engine.dialect.name == "sqlite":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+        print("Database vacuumed.")
+    return 0
+
+
+async def _reevaluate(job: ReevaluationJob, args: argparse.Namespace) -> None:
+    try:
+        await reevaluate_tickets(job, chunk_size=args.chunk_size, workers=args.workers)
+    finally:
+        await async_engine.dispose()
+        await async_read_engine.dispose()
+
+
+def reevaluate(args: argparse.Namespace) -> int:
+    _prepare_schema()
+    job = ReevaluationJob(dry_run=args.dry_run, diff_limit=args.diff_limit)
+    asyncio.run(_reevaluate(job, args))
+    for change in job.changes:
+        print(
+            f"#{change.ticket_id}: {change.status} -> {change.new_status}; "
+            f"flags {','.join(change.guardrail_flags) or '-'} -> {','.join(change.new_guardrail_flags) or '-'}; "
+            f"routing {change.routing_decision or '-'} -> {change.new_routing_decision}"
+        )
+    if job.changed > len(job.changes):
+        print(f"... and {job.changed - len(job.changes)} more")
+    for transition, count in sorted(job.transitions.items()):
+        print(f"{transition}: {count}")
+    if job.dry_run:
+        print(f"Scanned {job.scanned} tickets; {job.changed} would change under the current guardrails.")
+    else:
+        print(
+            f"Scanned {job.scanned} tickets; updated {job.updated} of {job.changed} changed "
+            f"({job.skipped} skipped because they were modified meanwhile)."
+        )
+    return 0
+
+
+def _labelled_tickets() -> List[local_classifier.TrainingExample]:
+    with SessionLocal() as db:
+        return local_classifier.load_examples(lambda after: crud.list_labelled_tickets_after(db, after))
+
+
+def _templates() -> List[local_classifier.ReplyTemplate]:
+    return local_classifier.load_templates(
+        settings.local_classifier_templates_path or local_classifier.DEFAULT_TEMPLATES_PATH
+    )
+
+
+def _thresholds(value: str) -> List[float]:
+    return [float(part) for part in value.split(",") if part.strip()]
+
+
+def train_classifier(args: argparse.Namespace) -> int:
+    _prepare_schema()
+    examples = _labelled_tickets()
+    if len(examples) < args.min_examples:
+        print(f"Only {len(examples)} Gemini-labelled tickets; at least {args.min_examples} are needed.")
+        return 1
+
+    # Hold out the most recent tickets, as the model will only ever see newer ones
+    split = int(len(examples) * (1 - args.holdout))
+    if 0 < split < len(examples):
+        model = local_classifier.train(examples[:split], epochs=args.epochs)
+        report = local_classifier.evaluate(model, _templates(), examples[split:], _thresholds(args.thresholds))
+        print(f"Trained on the first {split} tickets.")
+        print(local_classifier.format_report(report))
+        print()
+    if args.dry_run:
+        return 0
+
+    model = local_classifier.train(examples, epochs=args.epochs)
+    model.save(args.output)
+    print(f"Saved a model trained on all {len(examples)} tickets to {args.output}; restart the backend to load it.")
+    return 0
+
+
+def evaluate_classifier(args: argparse.Namespace) -> int:
+    _prepare_schema()
+    try:
+        model = local_classifier.LocalModel.load(args.model)
+    except (OSError, ValueError) as exc:
+        print(f"Cannot load {args.model}: {exc}")
+        return 1
+    examples = _labelled_tickets()
+    if not args.all:
+        # Tickets labelled by Gemini since the model was trained
+        examples = [e for e in examples if e.ticket_id > int(model.meta.get("max_ticket_id", 0))]
+    if not examples:
+        print("No Gemini-labelled tickets to evaluate on (use --all to include the training tickets).")
+        return 1
+    report = local_classifier.evaluate(model, _templates(), examples, _thresholds(args.thresholds))
+    print(local_classifier.format_report(report))
+    return 0
+
+
+COMMANDS: Dict[str, Callable[[argparse.Namespace], int]] = {
+    "compress-logs": compress_logs,
+    "rebuild-stats": rebuild_stats,
+    "backfill-search": backfill_search,
+    "archive": archive,
+    "reevaluate": reevaluate,
+    "train-classifier": train_classifier,
+    "evaluate-classifier": evaluate_classifier,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend.cli", description="FlowGen AI maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compress = subparsers.add_parser("compress-logs", help="Compress legacy plain-text log payloads")
+    compress.add_argument("--batch-size", type=int, default=500)
+    compress.add_argument("--vacuum", action="store_true", help="VACUUM afterwards (SQLite only)")
+
+    subparsers.add_parser("rebuild-stats", help="Recompute the dashboard counters from the ticket tables")
+    subparsers.add_parser("backfill-search", help="Build the full-text index for existing tickets")
+
+    archive_parser = subparsers.add_parser(
+        "archive", help="Move old tickets and their logs to date-partitioned gzip files and delete them"
+    )
+    archive_parser.add_argument("--older-than-days", type=float, required=True)
+    archive_parser.add_argument("--output-dir", default="./flowgen_archive")
+    archive_parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    archive_parser.add_argument("--chunk-size", type=int, default=1000, help="Tickets per delete transaction")
+    archive_parser.add_argument("--dry-run", action="store_true", help="Only count what would be archived")
+    archive_parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards (SQLite only)")
+
+    reevaluate_parser = subparsers.add_parser(
+        "reevaluate", help="Re-apply the current guardrails and routing to stored tickets (no Gemini calls)"
+    )
+    reevaluate_parser.add_argument("--dry-run", action="store_true", help="Only print what would change")
+    reevaluate_parser.add_argument("--chunk-size", type=int, default=settings.reevaluation_chunk_size)
+    reevaluate_parser.add_argument(
+        "--workers", type=int, default=settings.reevaluation_workers, help="Guardrail processes (0 = one per CPU)"
+    )
+    reevaluate_parser.add_argument("--diff-limit", type=int, default=50, help="Changed tickets to list")
+
+    train = subparsers.add_parser(
+        "train-classifier", help="Train the local classifier on Gemini-labelled tickets and report its agreement"
+    )
+    train.add_argument("--output", default=settings.local_classifier_path)
+    train.add_argument("--holdout", type=float, default=0.2, help="Share of the newest tickets held out for the report")
+    train.add_argument("--epochs", type=int, default=15)
+    train.add_argument("--min-examples", type=int, default=200)
+    train.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="Comma-separated confidence thresholds")
+    train.add_argument("--dry-run", action="store_true", help="Only print the report; do not write the model")
+
+    evaluate = subparsers.add_parser(
+        "evaluate-classifier", help="Report the saved model's agreement with Gemini on tickets labelled since training"
+    )
+    evaluate.add_argument("--model", default=settings.local_classifier_path)
+    evaluate.add_argument("--all", action="store_true", help="Evaluate on every labelled ticket")
+    evaluate.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="Comma-separated confidence thresholds")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    args = build_parser().parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 import os
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,13 +11,115 @@ class Settings(BaseSettings):
 
     gemini_api_key: str
     gemini_model: str = "gemini-1.5-flash"
+    # "google" (real API) or "fake" (local stand-in for load testing, no quota used)
+    gemini_provider: str = "google"
+
+    # Fake provider behaviour (GEMINI_PROVIDER=fake)
+    fake_gemini_latency_median_ms: float = 800.0
+    fake_gemini_latency_sigma: float = 0.5
+    fake_gemini_error_rate: float = 0.0
+    fake_gemini_quota_error_rate: float = 0.0
+    fake_gemini_malformed_json_rate: float = 0.0
+    fake_gemini_seed: Optional[int] = None
+
+    # Dedicated Gemini executor: concurrency cap, token-bucket quota and deadline admission
+    gemini_max_concurrency: int = 8
+    gemini_requests_per_minute: float = 60.0
+    gemini_burst: int = 8
+    gemini_expected_latency_seconds: float = 3.0
+    gemini_request_deadline_seconds: float = 40.0
+
+    # Micro-batching: tickets arriving within the window share one Gemini request
+    gemini_batch_enabled: bool = False
+    gemini_batch_window_ms: float = 50.0
+    gemini_batch_max_size: int = 8
+
+    # Structured output: static instructions sent once as the system instruction and the
+    # GeminiResult shape enforced by a response schema (false: prose schema in every prompt)
+    gemini_structured_output: bool = True
 
     database_url: str = "sqlite:///./flowgen.db"
 
+    # SQLite only: WAL journal so dashboard reads never block ticket writes; one writer
+    # connection per process plus a pool of read-only connections for the API reads.
+    # synchronous=NORMAL is durable across app crashes (a power loss may drop the last commits)
+    sqlite_wal_enabled: bool = True
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 16 * 1024
+    sqlite_mmap_size_mib: int = 256
+    db_read_pool_size: int = 8
+
+    # Group-commit writer: tickets + logs from concurrent requests share one transaction
+    db_write_batch_max_size: int = 64
+    db_write_batch_max_delay_ms: float = 5.0
+
+    # Gemini result cache keyed on message hash + subject + model ("" disables the SQLite tier)
+    ai_cache_enabled: bool = True
+    ai_cache_max_entries: int = 10000
+    ai_cache_ttl_seconds: int = 24 * 60 * 60
+    ai_cache_path: str = "./flowgen_ai_cache.db"
+
+    # Asynchronous submissions (POST /tickets?mode=async): in-process worker pool
+    ticket_workers: int = 4
+    ticket_queue_max_size: int = 1000
+
+    # Bulk ingestion (POST /tickets/bulk)
+    bulk_max_concurrency: int = 8
+    bulk_max_record_bytes: int = 64 * 1024
+
+    # Live change feed (GET /tickets/changes): events kept for Last-Event-ID resume, events
+    # buffered per subscriber before a slow one is disconnected, SSE keep-alive interval
+    change_feed_history_size: int = 1000
+    change_feed_subscriber_queue_size: int = 256
+    change_feed_max_subscribers: int = 100
+    change_feed_heartbeat_seconds: float = 15.0
+
+    # GET /tickets/export: rows fetched per cursor round trip; concurrent exports beyond
+    # the limit wait, so long exports cannot take over the read connection pool
+    export_chunk_size: int = 1000
+    export_max_concurrency: int = 2
+
+    # Near-duplicate detection (MinHash/LSH over messages); snapshot restored at startup
+    near_duplicate_enabled: bool = True
+    near_duplicate_threshold: float = 0.8
+    near_duplicate_num_perm: int = 64
+    near_duplicate_snapshot_path: str = "./flowgen_near_duplicates.npz"
+
+    # Local first-tier classifier (python -m backend.cli train-classifier): tickets it is
+    # confident about and that match a reply template skip Gemini; without a model file
+    # every ticket goes to Gemini. Templates: "" uses the bundled services/reply_templates.json
+    local_classifier_enabled: bool = True
+    local_classifier_path: str = "./flowgen_local_classifier.npz"
+    local_classifier_min_confidence: float = 0.9
+    local_classifier_templates_path: str = ""
+
+    # Guardrail rules file (phrase/regex -> flag); "" uses the bundled services/guardrail_rules.json
+    guardrail_rules_path: str = ""
+    guardrail_reload_interval_seconds: float = 5.0
+    # Re-evaluation of stored tickets under the current guardrails (POST /tickets/reevaluate, cli reevaluate)
+    reevaluation_chunk_size: int = 1000
+    # Guardrail worker processes; 0 = one per CPU
+    reevaluation_workers: int = 0
+
     # Store as string so env var is not parsed as JSON (Render/Vercel set comma-separated URLs)
     allowed_origins: str = ""
 
     rate_limit_requests_per_minute: int = 5
+    # "memory" (per process) or "sqlite" (shared by all workers on this host)
+    rate_limit_backend: str = "memory"
+    rate_limit_sqlite_path: str = "./flowgen_ratelimit.db"
+    rate_limit_max_keys: int = 100_000
+    rate_limit_sweep_interval_seconds: float = 30.0
+
+    # Logging: bounded queue drained by a background thread; repeated warnings/errors
+    # (same logger + message template) limited to BURST per INTERVAL (0 disables)
+    log_queue_max_size: int = 10_000
+    log_rate_limit_burst: int = 10
+    log_rate_limit_interval_seconds: float = 60.0
+
+    # Prometheus text endpoint (GET /metrics); metrics are recorded either way
+    metrics_enabled: bool = True
 
     model_config = SettingsConfigDict(
         env_file=".env",
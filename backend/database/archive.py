@@ -0,0 +1,145 @@
+"""
+Archival of old tickets (``python -m backend.cli archive``).
+
+Tickets created before a cutoff are moved, with their log entries, into gzip
+files partitioned by the ticket's creation date::
+
+    <output_dir>/date=2025-01-31/tickets.ndjson.gz
+    <output_dir>/date=2025-01-31/ticket_logs.ndjson.gz
+
+and deleted from the live tables one chunk per transaction. Each chunk is
+appended to its files as a new gzip member (``zcat`` and ``gzip.open`` read them
+as one stream) and fsynced before the transaction deleting it commits. A run
+interrupted between the two leaves that chunk in both places; the next run
+archives it again, so consumers should treat ``id`` as the key.
+"""
+import gzip
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import DefaultDict, Dict, List, NamedTuple, Sequence, Set, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from . import models
+from .export import LOGS, TICKETS, make_encoder
+from .stats import StatDeltas, apply_deltas
+
+
+logger = logging.getLogger(__name__)
+
+TICKET_FILE = "tickets"
+LOG_FILE = "ticket_logs"
+
+
+class ArchiveResult(NamedTuple):
+    tickets: int
+    logs: int
+    partitions: List[str]
+
+
+def partition_name(created_at: datetime) -> str:
+    return f"date={created_at.date().isoformat()}"
+
+
+def count_archivable(engine: Engine, before: datetime) -> Tuple[int, int]:
+    """(tickets, log entries) that ``archive_tickets`` would move."""
+    tickets = models.Ticket.__table__
+    logs = models.TicketLog.__table__
+    old_ids = select(tickets.c.id).where(tickets.c.created_at < before)
+    with engine.connect() as conn:
+        ticket_count = conn.execute(select(func.count()).where(tickets.c.created_at < before)).scalar_one()
+        log_count = conn.execute(select(func.count()).where(logs.c.ticket_id.in_(old_ids))).scalar_one()
+    return ticket_count, log_count
+
+
+def _append(path: str, encoder, rows: Sequence) -> None:
+    is_new = not os.path.exists(path)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as member:
+            text = (encoder.header() if is_new else "") + encoder.encode(rows)
+            member.write(text.encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_tickets(
+    engine: Engine,
+    *,
+    before: datetime,
+    output_dir: str,
+    format: str = "ndjson",
+    chunk_size: int = 1000,
+) -> ArchiveResult:
+    """
+    Move tickets created before ``before`` (and their logs) to ``output_dir`` and
+    delete them, ``chunk_size`` tickets per transaction. The dashboard counters are
+    decremented in the same transactions; the FTS triggers drop the tickets from
+    the search index. Links from newer duplicates to archived originals are cleared
+    (``is_duplicate`` stays set; the original is in the archive).
+    """
+    tickets = models.Ticket.__table__
+    logs = models.TicketLog.__table__
+    ticket_encoder = make_encoder(format, TICKETS)
+    log_encoder = make_encoder(format, LOGS)
+    suffix = f".{ticket_encoder.extension}.gz"
+
+    after = 0
+    archived_tickets = archived_logs = 0
+    partitions: Set[str] = set()
+    while True:
+        with Session(engine) as db, db.begin():
+            chunk = list(
+                db.execute(
+                    select(tickets.c.id)
+                    .where(tickets.c.created_at < before, tickets.c.id > after)
+                    .order_by(tickets.c.id)
+                    .limit(chunk_size)
+                ).scalars()
+            )
+            if not chunk:
+                break
+            # Writing first takes the write lock, so the rows read below cannot
+            # change (e.g. gain a log entry) before they are deleted
+            db.execute(
+                update(tickets).where(tickets.c.original_ticket_id.in_(chunk)).values(original_ticket_id=None)
+            )
+            ticket_rows = db.execute(
+                select(*tickets.c).where(tickets.c.id.in_(chunk)).order_by(tickets.c.id)
+            ).all()
+            ids = [row.id for row in ticket_rows]
+            log_rows = db.execute(
+                select(*logs.c).where(logs.c.ticket_id.in_(ids)).order_by(logs.c.id)
+            ).all()
+
+            by_partition: DefaultDict[str, Dict[str, List]] = defaultdict(lambda: {TICKET_FILE: [], LOG_FILE: []})
+            ticket_partition: Dict[int, str] = {}
+            deltas = StatDeltas()
+            for row in ticket_rows:
+                partition = ticket_partition[row.id] = partition_name(row.created_at)
+                by_partition[partition][TICKET_FILE].append(row)
+                deltas.add_ticket(row, sign=-1)
+            for row in log_rows:
+                by_partition[ticket_partition[row.ticket_id]][LOG_FILE].append(row)
+                deltas.add_log(row, sign=-1)
+
+            for partition, files in by_partition.items():
+                directory = os.path.join(output_dir, partition)
+                os.makedirs(directory, exist_ok=True)
+                _append(os.path.join(directory, TICKET_FILE + suffix), ticket_encoder, files[TICKET_FILE])
+                if files[LOG_FILE]:
+                    _append(os.path.join(directory, LOG_FILE + suffix), log_encoder, files[LOG_FILE])
+
+            db.execute(delete(logs).where(logs.c.ticket_id.in_(ids)))
+            db.execute(delete(tickets).where(tickets.c.id.in_(ids)))
+            apply_deltas(db, deltas)
+
+        after = chunk[-1]
+        archived_tickets += len(ticket_rows)
+        archived_logs += len(log_rows)
+        partitions.update(by_partition)
+        logger.info("Archived tickets: tickets=%s logs=%s", archived_tickets, archived_logs)
+    return ArchiveResult(archived_tickets, archived_logs, sorted(partitions))
@@ -0,0 +1,193 @@
+"""Async counterparts of ``crud`` for the request path (``AsyncSession``)."""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Row, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .stats import StatDeltas, apply_deltas_async
+
+
+async def get_ticket_by_hash(db: AsyncSession, message_hash: str) -> Optional[models.Ticket]:
+    result = await db.execute(
+        select(models.Ticket)
+        .where(models.Ticket.message_hash == message_hash)
+        .order_by(models.Ticket.created_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def create_ticket(db: AsyncSession, ticket: models.Ticket) -> models.Ticket:
+    db.add(ticket)
+    await db.flush()
+    deltas = StatDeltas()
+    deltas.add_ticket(ticket)
+    await apply_deltas_async(db, deltas)
+    await db.commit()
+    await db.refresh(ticket)
+    return ticket
+
+
+async def get_ticket(db: AsyncSession, ticket_id: int) -> Optional[models.Ticket]:
+    return await db.get(models.Ticket, ticket_id)
+
+
+async def get_ticket_messages(db: AsyncSession, ticket_ids: List[int]) -> Dict[int, str]:
+    if not ticket_ids:
+        return {}
+    result = await db.execute(
+        select(models.Ticket.id, models.Ticket.message).where(models.Ticket.id.in_(ticket_ids))
+    )
+    return {row.id: row.message for row in result}
+
+
+async def list_ticket_ids_by_status(db: AsyncSession, status: str) -> List[int]:
+    result = await db.execute(
+        select(models.Ticket.id).where(models.Ticket.status == status).order_by(models.Ticket.id)
+    )
+    return list(result.scalars().all())
+
+
+async def create_ticket_with_log(
+    db: AsyncSession, ticket: models.Ticket, log: Optional[models.TicketLog]
+) -> models.Ticket:
+    """Persist a ticket and its log entry (if any) in a single commit."""
+    db.add(ticket)
+    if log is not None:
+        log.ticket = ticket
+        db.add(log)
+    await db.flush()
+    deltas = StatDeltas()
+    deltas.add_ticket(ticket)
+    if log is not None:
+        deltas.add_log(log)
+    await apply_deltas_async(db, deltas)
+    await db.commit()
+    return ticket
+
+
+async def complete_ticket(
+    db: AsyncSession,
+    ticket_id: int,
+    values: Dict[str, Any],
+    log_values: Dict[str, Any],
+    *,
+    pending_status: str,
+) -> Optional[models.Ticket]:
+    """
+    Apply AI results to an accepted ticket and add its log entry in one commit.
+    Returns None, writing nothing, unless the ticket is still in ``pending_status``
+    (another worker may have completed it meanwhile).
+    """
+    ticket = await db.get(models.Ticket, ticket_id, with_for_update=True)
+    if ticket is None or ticket.status != pending_status:
+        return None
+    deltas = StatDeltas()
+    # Move the ticket's counters from its "Processing" values to the final ones
+    deltas.add_ticket(ticket, sign=-1)
+    for key, value in values.items():
+        setattr(ticket, key, value)
+    deltas.add_ticket(ticket)
+    log = models.TicketLog(ticket_id=ticket_id, **log_values)
+    db.add(log)
+    deltas.add_log(log)
+    await apply_deltas_async(db, deltas)
+    await db.commit()
+    return ticket
+
+
+async def create_ticket_log(
+    db: AsyncSession,
+    *,
+    ticket_id: int,
+    raw_input: str,
+    ai_output: Optional[str],
+    guardrail_flags: Optional[str],
+    routing_decision: Optional[str],
+) -> models.TicketLog:
+    log = models.TicketLog(
+        ticket_id=ticket_id,
+        raw_input=raw_input,
+        ai_output=ai_output,
+        guardrail_flags=guardrail_flags,
+        routing_decision=routing_decision,
+    )
+    db.add(log)
+    deltas = StatDeltas()
+    deltas.add_log(log)
+    await apply_deltas_async(db, deltas)
+    await db.commit()
+    await db.refresh(log)
+    return log
+
+
+# Columns needed by TicketListItem; the large Text columns are never loaded for lists
+TICKET_LIST_COLUMNS = (
+    models.Ticket.id,
+    models.Ticket.name,
+    models.Ticket.email,
+    models.Ticket.subject,
+    models.Ticket.category,
+    models.Ticket.urgency,
+    models.Ticket.priority_score,
+    models.Ticket.confidence_score,
+    models.Ticket.status,
+    models.Ticket.created_at,
+)
+
+
+async def list_tickets(
+    db: AsyncSession,
+    *,
+    status: Optional[str] = None,
+    urgency: Optional[str] = None,
+    limit: int = 50,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> List[Row]:
+    """
+    Newest-first page of ticket list rows (projected columns only).
+    ``after`` is the (created_at, id) of the last row of the previous page.
+    """
+    query = select(*TICKET_LIST_COLUMNS).order_by(
+        models.Ticket.created_at.desc(), models.Ticket.id.desc()
+    )
+    if status:
+        query = query.where(models.Ticket.status == status)
+    if urgency:
+        query = query.where(models.Ticket.urgency == urgency)
+    if after is not None:
+        query = query.where(tuple_(models.Ticket.created_at, models.Ticket.id) < tuple_(*after))
+    result = await db.execute(query.limit(limit))
+    return list(result.all())
+
+
+# Columns of TicketLogSummary, then the payloads TicketLogEntry adds, in schema order
+TICKET_LOG_SUMMARY_COLUMNS = (
+    models.TicketLog.id,
+    models.TicketLog.timestamp,
+    models.TicketLog.guardrail_flags,
+    models.TicketLog.routing_decision,
+    models.TicketLog.gemini_error,
+    models.TicketLog.prompt_tokens,
+    models.TicketLog.output_tokens,
+    models.TicketLog.total_tokens,
+    models.TicketLog.classifier,
+)
+TICKET_LOG_PAYLOAD_COLUMNS = (models.TicketLog.raw_input, models.TicketLog.ai_output)
+
+
+async def list_ticket_logs(db: AsyncSession, ticket_id: int, *, include_payload: bool = True) -> List[Row]:
+    """
+    Log entries for a ticket, oldest first, as projected rows. The compressed
+    ``raw_input`` / ``ai_output`` payloads are only read and decompressed when
+    ``include_payload`` is set.
+    """
+    columns = TICKET_LOG_SUMMARY_COLUMNS + (TICKET_LOG_PAYLOAD_COLUMNS if include_payload else ())
+    result = await db.execute(
+        select(*columns)
+        .where(models.TicketLog.ticket_id == ticket_id)
+        .order_by(models.TicketLog.timestamp.asc())
+    )
+    return list(result.all())
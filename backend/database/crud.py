@@ -1,7 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import exists
 from sqlalchemy.orm import Session
 
 from . import models
+from .stats import StatDeltas, apply_deltas
 
 
 def get_ticket_by_hash(db: Session, message_hash: str) -> Optional[models.Ticket]:
@@ -15,6 +17,10 @@ def get_ticket_by_hash(db: Session, message_hash: str) -> Optional[models.Ticket
 
 def create_ticket(db: Session, ticket: models.Ticket) -> models.Ticket:
     db.add(ticket)
+    db.flush()
+    deltas = StatDeltas()
+    deltas.add_ticket(ticket)
+    apply_deltas(db, deltas)
     db.commit()
     db.refresh(ticket)
     return ticket
@@ -37,6 +43,9 @@ def create_ticket_log(
         routing_decision=routing_decision,
     )
     db.add(log)
+    deltas = StatDeltas()
+    deltas.add_log(log)
+    apply_deltas(db, deltas)
     db.commit()
     db.refresh(log)
     return log
@@ -65,3 +74,47 @@ def list_ticket_logs(db: Session, ticket_id: int) -> List[models.TicketLog]:
         .all()
     )
 
+
+
+def list_ticket_messages_after(db: Session, after_id: int, limit: int = 1000) -> List[Tuple[int, str]]:
+    """(id, message) of the next ``limit`` tickets with id > ``after_id``, in id order."""
+    rows = (
+        db.query(models.Ticket.id, models.Ticket.message)
+        .filter(models.Ticket.id > after_id)
+        .order_by(models.Ticket.id)
+        .limit(limit)
+        .all()
+    )
+    return [(row.id, row.message) for row in rows]
+
+
+def list_labelled_tickets_after(db: Session, after_id: int, limit: int = 1000) -> List[Tuple]:
+    """
+    (id, subject, message, message_hash, category, urgency, priority_score) of the next
+    ``limit`` tickets with id > ``after_id`` that Gemini classified, in id order.
+    Tickets handled by the local classifier are left out so it never trains on itself.
+    """
+    handled_locally = exists().where(
+        models.TicketLog.ticket_id == models.Ticket.id, models.TicketLog.classifier == "local"
+    )
+    rows = (
+        db.query(
+            models.Ticket.id,
+            models.Ticket.subject,
+            models.Ticket.message,
+            models.Ticket.message_hash,
+            models.Ticket.category,
+            models.Ticket.urgency,
+            models.Ticket.priority_score,
+        )
+        .filter(
+            models.Ticket.id > after_id,
+            models.Ticket.category.is_not(None),
+            models.Ticket.urgency.is_not(None),
+            ~handled_locally,
+        )
+        .order_by(models.Ticket.id)
+        .limit(limit)
+        .all()
+    )
+    return [tuple(row) for row in rows]
@@ -0,0 +1,118 @@
+"""
+Bulk export of tickets and logs (``GET /tickets/export`` and the archive command).
+
+Rows are read through a server-side cursor in ``yield_per``-sized partitions and
+encoded one partition at a time, so memory use does not depend on the number of
+rows exported. Every column is exported, log payloads decompressed.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
+
+from sqlalchemy import Column, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+
+TICKETS = "tickets"
+LOGS = "logs"
+
+TICKET_COLUMNS: Sequence[Column] = tuple(models.Ticket.__table__.columns)
+LOG_COLUMNS: Sequence[Column] = tuple(models.TicketLog.__table__.columns)
+
+
+def export_query(
+    resource: str,
+    *,
+    status: Optional[str] = None,
+    urgency: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Select:
+    """
+    Rows of ``resource`` ("tickets" or "logs") in id order. ``status`` / ``urgency``
+    filter logs by their ticket; ``since`` / ``until`` (inclusive / exclusive) apply
+    to the ticket's ``created_at`` or the log's ``timestamp``.
+    """
+    tickets = models.Ticket.__table__
+    if resource == TICKETS:
+        query = select(*TICKET_COLUMNS).order_by(tickets.c.id)
+        created = tickets.c.created_at
+    else:
+        logs = models.TicketLog.__table__
+        query = select(*LOG_COLUMNS).order_by(logs.c.id)
+        created = logs.c.timestamp
+        if status or urgency:
+            query = query.join(tickets, tickets.c.id == logs.c.ticket_id)
+    if status:
+        query = query.where(tickets.c.status == status)
+    if urgency:
+        query = query.where(tickets.c.urgency == urgency)
+    if since is not None:
+        query = query.where(created >= since)
+    if until is not None:
+        query = query.where(created < until)
+    return query
+
+
+async def stream_rows(db: AsyncSession, query: Select, chunk_size: int) -> AsyncIterator[Sequence[Any]]:
+    """Yield the rows of ``query`` in lists of at most ``chunk_size``."""
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions():
+        yield partition
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class NdjsonEncoder:
+    """One JSON object per row and line."""
+
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def __init__(self, columns: Sequence[Column]) -> None:
+        self.names = [column.name for column in columns]
+
+    def header(self) -> str:
+        return ""
+
+    def encode(self, rows: Iterable[Sequence[Any]]) -> str:
+        return "".join(
+            json.dumps(dict(zip(self.names, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows
+        )
+
+
+class CsvEncoder:
+    """CSV with a header line of column names; NULL is written as an empty field."""
+
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, columns: Sequence[Column]) -> None:
+        self.names = [column.name for column in columns]
+
+    def _lines(self, rows: Iterable[Sequence[Any]]) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    def header(self) -> str:
+        return self._lines([self.names])
+
+    def encode(self, rows: Iterable[Sequence[Any]]) -> str:
+        return self._lines([[_plain(value) for value in row] for row in rows])
+
+
+ENCODERS = {"ndjson": NdjsonEncoder, "csv": CsvEncoder}
+
+
+def make_encoder(format: str, resource: str):
+    return ENCODERS[format](TICKET_COLUMNS if resource == TICKETS else LOG_COLUMNS)
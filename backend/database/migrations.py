@@ -0,0 +1,123 @@
+"""
+Idempotent, additive schema upgrades for existing databases.
+
+``Base.metadata.create_all`` only creates missing tables; indexes (and, later,
+columns) added to models that already have a table are applied here on startup.
+"""
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+from .search import create_search_index, supports_search
+from .session import Base
+from .types import CompressedText
+
+
+logger = logging.getLogger(__name__)
+
+
+def _add_missing_columns(engine: Engine) -> None:
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name}")
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                logger.info("Added column %s.%s", table.name, column.name)
+
+
+def _create_missing_indexes(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+def _create_search_index(engine: Engine) -> None:
+    if not supports_search(engine.dialect.name):
+        return
+    with engine.begin() as conn:
+        created = create_search_index(conn)
+        has_tickets = conn.execute(text("SELECT 1 FROM tickets LIMIT 1")).first() is not None
+    if created and has_tickets:
+        logger.warning(
+            "Full-text index created for an existing database; "
+            "run `python -m backend.cli backfill-search` to index existing tickets."
+        )
+
+
+def run_migrations(engine: Engine) -> None:
+    _add_missing_columns(engine)
+    _create_missing_indexes(engine)
+    _create_search_index(engine)
+    logger.info("Database migrations applied.")
+
+
+_ERROR_MARKER = "\nERROR: "
+
+
+def compress_log_payloads(engine: Engine, batch_size: int = 500) -> Tuple[int, int]:
+    """
+    Rewrite ``ticket_logs`` payloads stored as plain TEXT (written before payload
+    compression) into the ``CompressedText`` format, backfilling ``gemini_error``
+    from the ``ERROR:`` suffix of ``ai_output``. Walks the table in id order, one
+    transaction per chunk; rows already stored as bytes are skipped, so it is safe
+    to re-run. Returns (rows scanned, rows rewritten).
+
+    On PostgreSQL the payload columns must first be altered to ``bytea``; SQLite
+    stores either representation in the existing column.
+    """
+    codec = CompressedText()
+    select_chunk = text(
+        "SELECT id, raw_input, ai_output, gemini_error FROM ticket_logs "
+        "WHERE id > :after ORDER BY id LIMIT :limit"
+    )
+    update = text(
+        "UPDATE ticket_logs SET raw_input = :raw_input, ai_output = :ai_output, "
+        "gemini_error = :gemini_error WHERE id = :id"
+    )
+
+    after = 0
+    scanned = rewritten = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(select_chunk, {"after": after, "limit": batch_size}).all()
+            if not rows:
+                break
+            updates: List[Dict] = []
+            for row in rows:
+                raw_input, ai_output, gemini_error = row.raw_input, row.ai_output, row.gemini_error
+                if not isinstance(raw_input, str) and not isinstance(ai_output, str):
+                    continue
+                if isinstance(ai_output, str):
+                    if gemini_error is None and _ERROR_MARKER in ai_output:
+                        gemini_error = ai_output.rsplit(_ERROR_MARKER, 1)[1][:255]
+                    ai_output = codec.process_bind_param(ai_output, engine.dialect)
+                if isinstance(raw_input, str):
+                    raw_input = codec.process_bind_param(raw_input, engine.dialect)
+                updates.append(
+                    {
+                        "id": row.id,
+                        "raw_input": raw_input,
+                        "ai_output": ai_output,
+                        "gemini_error": gemini_error,
+                    }
+                )
+            if updates:
+                conn.execute(update, updates)
+            scanned += len(rows)
+            rewritten += len(updates)
+            after = rows[-1].id
+        logger.info("Compressed log payloads: scanned=%s rewritten=%s", scanned, rewritten)
+    return scanned, rewritten
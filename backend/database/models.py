@@ -1,8 +1,9 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, Index
+from sqlalchemy.orm import deferred, relationship
 
 from .session import Base
+from .types import CompressedText
 
 
 class Ticket(Base):
@@ -36,6 +37,14 @@ class Ticket(Base):
     original_ticket = relationship("Ticket", remote_side=[id])
     logs = relationship("TicketLog", back_populates="ticket", cascade="all, delete-orphan")
 
+    # Keyset pagination on (created_at, id), optionally narrowed by the dashboard filters
+    __table_args__ = (
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tickets_urgency_created_at_id", "urgency", "created_at", "id"),
+        Index("ix_tickets_status_urgency_created_at_id", "status", "urgency", "created_at", "id"),
+    )
+
 
 class TicketLog(Base):
     __tablename__ = "ticket_logs"
@@ -45,10 +54,33 @@ class TicketLog(Base):
 
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    raw_input = Column(Text, nullable=False)
-    ai_output = Column(Text, nullable=True)
+    # Large payloads: compressed at rest and only loaded when explicitly requested
+    raw_input = deferred(Column(CompressedText(), nullable=False), group="payload")
+    ai_output = deferred(Column(CompressedText(), nullable=True), group="payload")
     guardrail_flags = Column(Text, nullable=True)
     routing_decision = Column(String(50), nullable=True)
+    gemini_error = Column(String(255), nullable=True)
+    # Gemini usage_metadata for this analysis (NULL for cached results and older rows)
+    prompt_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    total_tokens = Column(Integer, nullable=True)
+    # "gemini" or "local" (local classifier + reply template); NULL for older rows (Gemini)
+    classifier = Column(String(16), nullable=True)
 
     ticket = relationship("Ticket", back_populates="logs")
 
+
+
+class TicketStat(Base):
+    """
+    Incrementally maintained dashboard counters, one row per (dimension, value),
+    e.g. ("status", "Auto-Resolved"). ``total`` holds running sums for averages.
+    Updated in the same transaction as the ticket writes; see ``stats.py``.
+    """
+
+    __tablename__ = "ticket_stats"
+
+    dimension = Column(String(32), primary_key=True)
+    value = Column(String(100), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,195 @@
+"""
+Full-text search over tickets (SQLite FTS5).
+
+``tickets_fts`` is an external-content FTS5 table over ``subject``, ``message`` and
+``draft_reply``: it stores only the inverted index and reads snippets back from
+``tickets``. Triggers keep it in sync with every insert, update and delete, in
+the same transaction as the ticket write, whichever code path performs it.
+"""
+import html
+import logging
+import re
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import DateTime, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "tickets_fts"
+
+# Column weights for bm25(): a match in the subject counts most
+_BM25 = f"bm25({FTS_TABLE}, 5.0, 1.0, 0.5)"
+
+# snippet() markers; replaced with <mark> after HTML-escaping the ticket text
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+_SNIPPET = f"snippet({FTS_TABLE}, -1, char(2), char(3), '…', 12)"
+
+# No stemming: porter would stem prefix queries too ("pay*" -> "pai*") and miss
+# "payment". The prefix indexes keep short ``word*`` queries fast.
+_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        subject, message, draft_reply,
+        content='tickets', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_ai AFTER INSERT ON tickets BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, subject, message, draft_reply)
+        VALUES (new.id, new.subject, new.message, new.draft_reply);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_ad AFTER DELETE ON tickets BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, message, draft_reply)
+        VALUES ('delete', old.id, old.subject, old.message, old.draft_reply);
+    END
+    """,
+    # Only the indexed columns: status/score updates must not rewrite the index
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_au AFTER UPDATE OF subject, message, draft_reply
+    ON tickets BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, message, draft_reply)
+        VALUES ('delete', old.id, old.subject, old.message, old.draft_reply);
+        INSERT INTO {FTS_TABLE}(rowid, subject, message, draft_reply)
+        VALUES (new.id, new.subject, new.message, new.draft_reply);
+    END
+    """,
+)
+
+_TERM = re.compile(r"\w+\*?", re.UNICODE)
+
+
+class InvalidSearchQuery(ValueError):
+    pass
+
+
+class SearchHit(NamedTuple):
+    id: int
+    subject: str
+    category: Optional[str]
+    urgency: Optional[str]
+    status: str
+    created_at: datetime
+    score: float
+    snippet: str
+
+
+def supports_search(dialect_name: str) -> bool:
+    return dialect_name == "sqlite"
+
+
+def create_search_index(conn: Connection) -> bool:
+    """Create the FTS table and triggers if missing; returns True if the table is new."""
+    existed = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    ).first()
+    for statement in _DDL:
+        conn.exec_driver_sql(statement)
+    return existed is None
+
+
+def rebuild_search_index(engine: Engine) -> int:
+    """(Re)index every ticket; returns the number of indexed tickets."""
+    with engine.begin() as conn:
+        create_search_index(conn)
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        indexed = conn.execute(text("SELECT count(*) FROM tickets")).scalar_one()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    logger.info("Rebuilt full-text index for %s tickets.", indexed)
+    return indexed
+
+
+def to_match_expression(query: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression: every word must match (prefix
+    match with a trailing ``*``). Operators and column filters are not exposed.
+    """
+    terms = []
+    for term in _TERM.findall(query):
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    if not terms:
+        raise InvalidSearchQuery("Search query must contain at least one word.")
+    return " ".join(terms)
+
+
+def highlight(snippet: Optional[str]) -> str:
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+async def search_tickets(
+    db: AsyncSession,
+    query: str,
+    *,
+    status: Optional[str] = None,
+    urgency: Optional[str] = None,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None,
+) -> List[SearchHit]:
+    """
+    Best matches first (BM25, lower is better), ties broken by id. ``after`` is
+    the (score, id) of the last hit of the previous page. Scores depend on corpus
+    statistics, so pages fetched across concurrent writes may shift slightly.
+    """
+    conditions = [f"{FTS_TABLE} MATCH :match"]
+    params = {"match": to_match_expression(query), "limit": limit}
+    if status:
+        conditions.append("f.status = :status")
+        params["status"] = status
+    if urgency:
+        conditions.append("f.urgency = :urgency")
+        params["urgency"] = urgency
+    # Only join tickets while ranking when filtering needs it; otherwise rank on
+    # the index alone and fetch ticket columns for the final page only
+    filter_join = ""
+    ticket_id = f"{FTS_TABLE}.rowid"
+    if status or urgency:
+        filter_join = f"JOIN tickets AS f ON f.id = {FTS_TABLE}.rowid"
+        ticket_id = "f.id"
+    if after is not None:
+        conditions.append(
+            f"({_BM25} > :after_score OR ({_BM25} = :after_score AND {ticket_id} > :after_id))"
+        )
+        params["after_score"], params["after_id"] = after
+
+    sql = text(
+        f"""
+        SELECT t.id, t.subject, t.category, t.urgency, t.status, t.created_at,
+               hits.score, hits.snippet
+        FROM (
+            SELECT {ticket_id} AS id, {_BM25} AS score, {_SNIPPET} AS snippet
+            FROM {FTS_TABLE} {filter_join}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY score, {ticket_id}
+            LIMIT :limit
+        ) AS hits
+        JOIN tickets AS t ON t.id = hits.id
+        ORDER BY hits.score, hits.id
+        """
+    ).columns(created_at=DateTime)
+    result = await db.execute(sql, params)
+    return [
+        SearchHit(
+            id=row.id,
+            subject=row.subject,
+            category=row.category,
+            urgency=row.urgency,
+            status=row.status,
+            created_at=row.created_at,
+            score=row.score,
+            snippet=highlight(row.snippet),
+        )
+        for row in result
+    ]
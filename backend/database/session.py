@@ -1,18 +1,120 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from backend.config import get_settings
 
 
 settings = get_settings()
 
+# Sync driver -> asyncio driver used for the request path
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Derive the asyncio URL (e.g. sqlite+aiosqlite://) from DATABASE_URL."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if url.get_dialect().is_async or backend not in _ASYNC_DRIVERS:
+        return database_url
+    return url.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def sqlite_pragmas(*, read_only: bool = False) -> list:
+    """Per-connection settings; WAL lets readers and the writer proceed without blocking each other."""
+    pragmas = [
+        # First, so that switching the journal mode also waits for other processes
+        f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+        # Negative: KiB rather than pages
+        f"PRAGMA cache_size = -{int(settings.sqlite_cache_size_kib)}",
+        f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size_mib) * 1024 * 1024}",
+    ]
+    if settings.sqlite_wal_enabled:
+        pragmas.insert(1, "PRAGMA journal_mode = WAL")
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    return pragmas
+
+
+def configure_sqlite(engine: Engine, *, read_only: bool = False, immediate_transactions: bool = False) -> None:
+    """
+    Apply ``sqlite_pragmas`` to every new connection of ``engine`` (the sync engine
+    of an AsyncEngine). ``immediate_transactions`` starts transactions with BEGIN
+    IMMEDIATE, so a writer waits for the write lock up front (honouring the busy
+    timeout) instead of failing when it upgrades a read to a write.
+    """
+    pragmas = sqlite_pragmas(read_only=read_only)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        if immediate_transactions:
+            # The driver would otherwise emit its own deferred BEGIN
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    if immediate_transactions:
+
+        @event.listens_for(engine, "begin")
+        def _on_begin(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+_is_sqlite = settings.database_url.startswith("sqlite")
+_connect_args = {"check_same_thread": False} if _is_sqlite else {}
+
+# Startup migrations and CLI commands
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
+    connect_args=_connect_args,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if _is_sqlite:
+    # SQLite allows one writer at a time: a single connection serializes this process's
+    # writes (group commit, worker updates) while reads use their own read-only pool
+    async_engine: AsyncEngine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        connect_args=_connect_args,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    async_read_engine: AsyncEngine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        connect_args=_connect_args,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=max(1, settings.db_read_pool_size),
+        max_overflow=0,
+    )
+    configure_sqlite(engine)
+    configure_sqlite(async_engine.sync_engine, immediate_transactions=True)
+    configure_sqlite(async_read_engine.sync_engine, read_only=True)
+else:
+    async_engine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        connect_args=_connect_args,
+    )
+    async_read_engine = async_engine
+
+# expire_on_commit=False: attributes stay readable after commit without lazy IO
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+)
+
 Base = declarative_base()
 
 
@@ -23,3 +125,14 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_write_db():
+    """Session on the writer connection, for requests that write directly."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Session on the read-only pool; never waits for the writer."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
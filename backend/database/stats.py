@@ -0,0 +1,232 @@
+"""
+Dashboard statistics kept as counters in ``ticket_stats``.
+
+Every write path turns the tickets / logs it touches into (dimension, value)
+deltas and upserts them in the same transaction, so ``GET /tickets/stats`` reads
+a handful of rows instead of scanning ``tickets``. ``rebuild_ticket_stats``
+recomputes everything from the base tables (``python -m backend.cli rebuild-stats``).
+"""
+import logging
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import models
+
+
+logger = logging.getLogger(__name__)
+
+# Ticket columns counted per distinct value
+GROUPED_DIMENSIONS = ("status", "urgency", "category", "routing_decision")
+
+TICKETS = "tickets"
+ANALYSES = "analyses"
+GEMINI_ERRORS = "gemini_errors"
+# Analyses answered by the local classifier instead of Gemini
+LOCAL_ANALYSES = "local_analyses"
+CONFIDENCE = "confidence"
+PRIORITY = "priority"
+# Counted per analysis with reported usage; ``total`` is the token sum
+PROMPT_TOKENS = "prompt_tokens"
+OUTPUT_TOKENS = "output_tokens"
+TOTAL_TOKENS = "total_tokens"
+TOKEN_DIMENSIONS = (PROMPT_TOKENS, OUTPUT_TOKENS, TOTAL_TOKENS)
+
+StatKey = Tuple[str, str]
+
+
+class StatDeltas:
+    """Accumulates counter changes for one transaction."""
+
+    def __init__(self) -> None:
+        self._deltas: DefaultDict[StatKey, List[float]] = defaultdict(lambda: [0, 0.0])
+
+    def __bool__(self) -> bool:
+        return any(count or total for count, total in self._deltas.values())
+
+    def _add(self, dimension: str, value: str, count: int, total: float = 0.0) -> None:
+        delta = self._deltas[(dimension, value)]
+        delta[0] += count
+        delta[1] += total
+
+    def add_ticket(self, ticket: models.Ticket, sign: int = 1) -> None:
+        """Count (sign=1) or uncount (sign=-1) a ticket's current column values."""
+        self._add(TICKETS, "", sign)
+        for dimension in GROUPED_DIMENSIONS:
+            value = getattr(ticket, dimension)
+            if value:
+                self._add(dimension, value, sign)
+        if ticket.confidence_score is not None:
+            self._add(CONFIDENCE, "", sign, sign * ticket.confidence_score)
+        if ticket.priority_score is not None:
+            self._add(PRIORITY, "", sign, sign * ticket.priority_score)
+
+    def replace_value(self, dimension: str, old: Optional[str], new: Optional[str]) -> None:
+        """Move one ticket from ``old`` to ``new`` in a grouped dimension."""
+        if old == new:
+            return
+        if old:
+            self._add(dimension, old, -1)
+        if new:
+            self._add(dimension, new, 1)
+
+    def add_log(self, log: models.TicketLog, sign: int = 1) -> None:
+        """Count (sign=1) or uncount (sign=-1) an analysis logged in ``ticket_logs``."""
+        self._add(ANALYSES, "", sign)
+        if log.gemini_error:
+            self._add(GEMINI_ERRORS, "", sign)
+        if log.classifier == "local":
+            self._add(LOCAL_ANALYSES, "", sign)
+        for dimension in TOKEN_DIMENSIONS:
+            tokens = getattr(log, dimension)
+            if tokens is not None:
+                self._add(dimension, "", sign, sign * tokens)
+
+    def rows(self) -> List[Dict]:
+        # Sorted so concurrent transactions lock counter rows in the same order
+        return [
+            {"dimension": dimension, "value": value, "count": count, "total": total}
+            for (dimension, value), (count, total) in sorted(self._deltas.items())
+            if count or total
+        ]
+
+
+def _upsert(dialect: Dialect, rows: List[Dict]):
+    """One INSERT ... ON CONFLICT statement, or None where the dialect has none."""
+    table = models.TicketStat.__table__
+    if dialect.name in ("sqlite", "postgresql"):
+        module = sqlite if dialect.name == "sqlite" else postgresql
+        stmt = module.insert(table).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.dimension, table.c.value],
+            set_={
+                "count": table.c["count"] + stmt.excluded["count"],
+                "total": table.c.total + stmt.excluded.total,
+            },
+        )
+    if dialect.name in ("mysql", "mariadb"):
+        stmt = mysql.insert(table).values(rows)
+        return stmt.on_duplicate_key_update(
+            count=table.c["count"] + stmt.inserted["count"],
+            total=table.c.total + stmt.inserted.total,
+        )
+    return None
+
+
+# Portable fallback: add to the existing row, insert it when there is none
+_table = models.TicketStat.__table__
+_INCREMENT = (
+    update(_table)
+    .where(_table.c.dimension == bindparam("b_dimension"), _table.c.value == bindparam("b_value"))
+    .values(count=_table.c["count"] + bindparam("b_count"), total=_table.c.total + bindparam("b_total"))
+)
+
+
+def _increment_params(row: Dict) -> Dict:
+    return {"b_dimension": row["dimension"], "b_value": row["value"], "b_count": row["count"], "b_total": row["total"]}
+
+
+def apply_deltas(db: Session, deltas: StatDeltas) -> None:
+    """Upsert ``deltas`` inside the caller's transaction (not committed here)."""
+    if not deltas:
+        return
+    rows = deltas.rows()
+    stmt = _upsert(db.get_bind().dialect, rows)
+    if stmt is not None:
+        db.execute(stmt)
+        return
+    for row in rows:
+        if db.execute(_INCREMENT, _increment_params(row)).rowcount == 0:
+            db.execute(insert(_table).values(row))
+
+
+async def apply_deltas_async(db: AsyncSession, deltas: StatDeltas) -> None:
+    if not deltas:
+        return
+    rows = deltas.rows()
+    stmt = _upsert(db.get_bind().dialect, rows)
+    if stmt is not None:
+        await db.execute(stmt)
+        return
+    for row in rows:
+        if (await db.execute(_INCREMENT, _increment_params(row))).rowcount == 0:
+            await db.execute(insert(_table).values(row))
+
+
+async def read_ticket_stats(db: AsyncSession) -> Dict[StatKey, Tuple[int, float]]:
+    result = await db.execute(
+        select(models.TicketStat.dimension, models.TicketStat.value, models.TicketStat.count, models.TicketStat.total)
+    )
+    return {(row.dimension, row.value): (row.count, row.total) for row in result}
+
+
+def rebuild_ticket_stats(engine: Engine) -> int:
+    """
+    Recompute all counters from ``tickets`` / ``ticket_logs`` in one transaction
+    and return the number of counter rows written. Gemini errors are counted from
+    ``ticket_logs.gemini_error`` (run ``compress-logs`` first on databases created
+    before that column existed).
+    """
+    tickets = models.Ticket.__table__
+    logs = models.TicketLog.__table__
+    stats = models.TicketStat.__table__
+
+    with engine.begin() as conn:
+        # Deleting first takes the write lock, so concurrent ticket writes wait
+        # instead of being counted twice or lost
+        conn.execute(delete(stats))
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("LOCK TABLE tickets, ticket_logs IN SHARE MODE")
+
+        rows: List[Dict] = []
+
+        def add(dimension: str, value: str, count: int, total: float = 0.0) -> None:
+            if count:
+                rows.append({"dimension": dimension, "value": value, "count": count, "total": total or 0.0})
+
+        add(TICKETS, "", conn.execute(select(func.count()).select_from(tickets)).scalar_one())
+        for dimension in GROUPED_DIMENSIONS:
+            column = tickets.c[dimension]
+            for value, count in conn.execute(
+                select(column, func.count()).where(column.is_not(None), column != "").group_by(column)
+            ):
+                add(dimension, value, count)
+        for dimension, column in ((CONFIDENCE, tickets.c.confidence_score), (PRIORITY, tickets.c.priority_score)):
+            count, total = conn.execute(select(func.count(column), func.sum(column))).one()
+            add(dimension, "", count, float(total or 0.0))
+        add(ANALYSES, "", conn.execute(select(func.count()).select_from(logs)).scalar_one())
+        add(
+            GEMINI_ERRORS,
+            "",
+            conn.execute(
+                select(func.count()).select_from(logs).where(logs.c.gemini_error.is_not(None))
+            ).scalar_one(),
+        )
+        add(
+            LOCAL_ANALYSES,
+            "",
+            conn.execute(select(func.count()).select_from(logs).where(logs.c.classifier == "local")).scalar_one(),
+        )
+        for dimension in TOKEN_DIMENSIONS:
+            column = logs.c[dimension]
+            count, total = conn.execute(select(func.count(column), func.sum(column))).one()
+            add(dimension, "", count, float(total or 0.0))
+
+        if rows:
+            conn.execute(insert(stats), rows)
+    logger.info("Rebuilt ticket stats (%s counters).", len(rows))
+    return len(rows)
+
+
+def ensure_ticket_stats(engine: Engine) -> None:
+    """Build the counters once for databases that predate ``ticket_stats``."""
+    with engine.connect() as conn:
+        has_stats = conn.execute(select(models.TicketStat.dimension).limit(1)).first() is not None
+        has_tickets = conn.execute(select(models.Ticket.id).limit(1)).first() is not None
+    if has_tickets and not has_stats:
+        rebuild_ticket_stats(engine)
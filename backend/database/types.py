@@ -0,0 +1,51 @@
+import zlib
+from typing import Optional, Union
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+
+class CompressedText(TypeDecorator):
+    """
+    Text stored as zlib-compressed bytes.
+
+    Stored format: ``b"z:" + zlib data``, or ``b"r:" + utf-8`` for values too short
+    to benefit. Rows written before compression was introduced still hold plain
+    TEXT and are returned unchanged, so old and new rows can coexist until
+    ``python -m backend.cli compress-logs`` rewrites them.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    COMPRESSED = b"z:"
+    RAW = b"r:"
+
+    def __init__(self, level: int = 6, min_size: int = 64) -> None:
+        super().__init__()
+        self.level = level
+        self.min_size = min_size
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        data = value.encode("utf-8")
+        if len(data) >= self.min_size:
+            compressed = zlib.compress(data, self.level)
+            if len(compressed) < len(data):
+                return self.COMPRESSED + compressed
+        return self.RAW + data
+
+    def process_result_value(self, value: Union[bytes, str, None], dialect) -> Optional[str]:
+        return decode_compressed_text(value)
+
+
+def decode_compressed_text(value: Union[bytes, memoryview, str, None]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value.startswith(CompressedText.COMPRESSED):
+        return zlib.decompress(value[2:]).decode("utf-8")
+    if value.startswith(CompressedText.RAW):
+        return value[2:].decode("utf-8")
+    return value.decode("utf-8")
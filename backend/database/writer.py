@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.config import get_settings
+from backend.utils.timing import stage
+
+from . import async_crud, models
+from .session import AsyncSessionLocal
+from .stats import StatDeltas, apply_deltas_async
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_PendingWrite = Tuple[Dict[str, Any], Optional[Dict[str, Any]], "asyncio.Future[models.Ticket]"]
+
+
+def _new_log(log_values: Optional[Dict[str, Any]]) -> Optional[models.TicketLog]:
+    return models.TicketLog(**log_values) if log_values is not None else None
+
+
+class TicketWriter:
+    """
+    Group-commit writer for tickets and their logs.
+
+    Requests hand over column values and await the persisted ticket; a single
+    background task drains the queue and commits everything that arrived within
+    ``max_delay_ms`` (up to ``max_batch_size`` tickets) in one transaction.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        *,
+        max_batch_size: int,
+        max_delay_ms: float,
+    ) -> None:
+        self._session_factory = session_factory
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_delay = max(0.0, max_delay_ms) / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="ticket-writer")
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the background task."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(
+        self, ticket_values: Dict[str, Any], log_values: Optional[Dict[str, Any]]
+    ) -> models.Ticket:
+        """Persist a ticket and its log (if any); returns the ticket with its assigned id."""
+        if not self.running:
+            async with self._session_factory() as db:
+                return await async_crud.create_ticket_with_log(
+                    db, models.Ticket(**ticket_values), _new_log(log_values)
+                )
+
+        future: "asyncio.Future[models.Ticket]" = asyncio.get_running_loop().create_future()
+        await self._queue.put((ticket_values, log_values, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch: List[_PendingWrite] = [item]
+            deadline = loop.time() + self._max_delay
+
+            while len(batch) < self._max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[_PendingWrite]) -> None:
+        tickets: List[models.Ticket] = []
+        try:
+            # Time spent writing the batch (the "db" request stage also includes queueing)
+            with stage("db_commit"):
+                async with self._session_factory() as db:
+                    logs: List[models.TicketLog] = []
+                    for ticket_values, log_values, _ in batch:
+                        ticket = models.Ticket(**ticket_values)
+                        db.add(ticket)
+                        if log_values is not None:
+                            log = models.TicketLog(**log_values)
+                            log.ticket = ticket
+                            db.add(log)
+                            logs.append(log)
+                        tickets.append(ticket)
+                    await db.flush()
+                    # One counter upsert for the whole batch
+                    deltas = StatDeltas()
+                    for ticket in tickets:
+                        deltas.add_ticket(ticket)
+                    for log in logs:
+                        deltas.add_log(log)
+                    await apply_deltas_async(db, deltas)
+                    await db.commit()
+        except Exception:  # noqa: BLE001
+            logger.exception("Group commit of %s tickets failed; retrying individually", len(batch))
+            await self._flush_individually(batch)
+            return
+
+        for ticket, (_, _, future) in zip(tickets, batch):
+            if not future.done():
+                future.set_result(ticket)
+
+    async def _flush_individually(self, batch: List[_PendingWrite]) -> None:
+        # One bad row must not fail the other requests that shared its batch
+        for ticket_values, log_values, future in batch:
+            try:
+                async with self._session_factory() as db:
+                    ticket = await async_crud.create_ticket_with_log(
+                        db, models.Ticket(**ticket_values), _new_log(log_values)
+                    )
+            except Exception as exc:  # noqa: BLE001
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(ticket)
+
+
+ticket_writer = TicketWriter(
+    AsyncSessionLocal,
+    max_batch_size=settings.db_write_batch_max_size,
+    max_delay_ms=settings.db_write_batch_max_delay_ms,
+)
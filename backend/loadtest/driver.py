@@ -0,0 +1,199 @@
+"""
+Open-loop load generator for the ticket API.
+
+Sends POST /tickets and GET /tickets at a target rate and prints p50/p95/p99
+latency, throughput and the per-stage breakdown reported by the server's
+Server-Timing header. With --spawn-server it starts its own uvicorn using the
+fake Gemini provider and a throwaway database, so no quota is used:
+
+    python -m backend.loadtest.driver --spawn-server --rps 50 --duration 30
+    python -m backend.loadtest.driver --base-url http://localhost:8000 --rps 20 \\
+        --json-out report.json --baseline previous.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    sys.exit("The load-test driver requires httpx (pip install httpx).")
+
+from backend.loadtest.report import (
+    Sample,
+    build_report,
+    format_report,
+    parse_server_timing,
+    regressions,
+)
+
+SUBJECTS = ["Cannot log in", "Double charge on invoice", "App crashes on start", "Question about plans"]
+MESSAGES = [
+    "I forgot my password and the reset email never arrives.",
+    "I was charged twice for my subscription this month, please help.",
+    "The mobile app crashes immediately after the splash screen.",
+    "Could you explain the difference between the Pro and Team plans?",
+    "Our whole team is locked out and this is urgent, production is down.",
+]
+
+
+def _ticket(rng: random.Random, seq: int, duplicate_ratio: float) -> dict:
+    message = rng.choice(MESSAGES)
+    if rng.random() >= duplicate_ratio:
+        message = f"{message} Reference number {seq}-{rng.randrange(10**9)}."
+    return {
+        "name": f"Load Test {seq}",
+        "email": f"loadtest{seq}@example.com",
+        "subject": rng.choice(SUBJECTS),
+        "message": message,
+    }
+
+
+async def run_load(
+    base_url: str,
+    *,
+    rps: float,
+    duration: float,
+    read_ratio: float,
+    duplicate_ratio: float,
+    max_in_flight: int,
+    seed: int,
+) -> tuple:
+    rng = random.Random(seed)
+    samples: List[Sample] = []
+    in_flight = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+
+        async def one(seq: int) -> None:
+            is_read = rng.random() < read_ratio
+            kind = "list" if is_read else "create"
+            started = time.perf_counter()
+            try:
+                if is_read:
+                    response = await client.get("/tickets")
+                else:
+                    response = await client.post("/tickets", json=_ticket(rng, seq, duplicate_ratio))
+                status = response.status_code
+                stages = parse_server_timing(response.headers.get("server-timing"))
+            except httpx.HTTPError:
+                status, stages = 0, {}
+            finally:
+                in_flight.release()
+            samples.append(Sample(kind, status, (time.perf_counter() - started) * 1000.0, stages))
+
+        tasks = []
+        started = time.perf_counter()
+        total = int(rps * duration)
+        for seq in range(total):
+            # Open loop: requests are issued on schedule regardless of response times
+            delay = started + seq / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await in_flight.acquire()
+            tasks.append(asyncio.create_task(one(seq)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return samples, elapsed
+
+
+def _spawn_server(port: int, workdir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        GEMINI_API_KEY=os.environ.get("GEMINI_API_KEY", "loadtest"),
+        GEMINI_PROVIDER="fake",
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        AI_CACHE_PATH=os.path.join(workdir, "ai_cache.db"),
+        # Measure capacity, not the quota / per-IP limits, unless the caller sets them
+        RATE_LIMIT_REQUESTS_PER_MINUTE=os.environ.get("RATE_LIMIT_REQUESTS_PER_MINUTE", "1000000"),
+        GEMINI_REQUESTS_PER_MINUTE=os.environ.get("GEMINI_REQUESTS_PER_MINUTE", "0"),
+    )
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [project_root, env.get("PYTHONPATH")]))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir,
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None:
+            break
+        time.sleep(0.2)
+    server.terminate()
+    sys.exit("The load-test server did not start.")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn-server", action="store_true", help="start uvicorn with GEMINI_PROVIDER=fake")
+    parser.add_argument("--port", type=int, default=8765, help="port for --spawn-server")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--read-ratio", type=float, default=0.2, help="share of GET /tickets requests")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1, help="share of exact duplicate tickets")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json-out", help="write the report as JSON")
+    parser.add_argument("--baseline", help="JSON report to compare p95 latencies against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p95 growth (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    server = None
+    workdir = tempfile.mkdtemp(prefix="flowgen-loadtest-") if args.spawn_server else None
+    base_url = args.base_url
+    if args.spawn_server:
+        server = _spawn_server(args.port, workdir)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        samples, elapsed = asyncio.run(
+            run_load(
+                base_url,
+                rps=args.rps,
+                duration=args.duration,
+                read_ratio=args.read_ratio,
+                duplicate_ratio=args.duplicate_ratio,
+                max_in_flight=args.max_in_flight,
+                seed=args.seed,
+            )
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = build_report(samples, elapsed, args.rps)
+    print(format_report(report))
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            problems = regressions(report, json.load(fh), args.max_regression)
+        if problems:
+            print("\nRegressions over baseline:")
+            print("\n".join(f"  {p}" for p in problems))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
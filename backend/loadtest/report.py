@@ -0,0 +1,104 @@
+import math
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+STAGES = ("validation", "dedupe", "llm", "guardrails", "db")
+
+
+class Sample(NamedTuple):
+    kind: str  # "create" or "list"
+    status: int  # HTTP status, 0 for transport errors
+    latency_ms: float
+    stages: Dict[str, float]
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(q / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _summary(values: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+    }
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    stages: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.startswith("dur="):
+            try:
+                stages[name] = float(params[4:])
+            except ValueError:
+                continue
+    return stages
+
+
+def build_report(samples: List[Sample], elapsed_s: float, target_rps: float) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "target_rps": target_rps,
+        "elapsed_s": elapsed_s,
+        "requests": len(samples),
+        "throughput_rps": len(samples) / elapsed_s if elapsed_s else 0.0,
+        "routes": {},
+        "stages": {},
+    }
+    for kind in sorted({s.kind for s in samples}):
+        kind_samples = [s for s in samples if s.kind == kind]
+        statuses: Dict[str, int] = {}
+        for s in kind_samples:
+            statuses[str(s.status)] = statuses.get(str(s.status), 0) + 1
+        ok = [s.latency_ms for s in kind_samples if 200 <= s.status < 300]
+        report["routes"][kind] = dict(_summary(ok), statuses=statuses)
+
+    for name in STAGES:
+        values = [s.stages[name] for s in samples if name in s.stages]
+        if values:
+            report["stages"][name] = _summary(values)
+    return report
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"requests: {report['requests']}  elapsed: {report['elapsed_s']:.1f}s  "
+        f"throughput: {report['throughput_rps']:.1f} req/s (target {report['target_rps']:.1f})",
+        "",
+        f"{'route':<12}{'ok':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses",
+    ]
+    for kind, summary in report["routes"].items():
+        lines.append(
+            f"{kind:<12}{summary['count']:>7}{_fmt(summary['p50'])}{_fmt(summary['p95'])}"
+            f"{_fmt(summary['p99'])}  {summary['statuses']}"
+        )
+    if report["stages"]:
+        lines += ["", f"{'stage':<12}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"]
+        for name, summary in report["stages"].items():
+            lines.append(
+                f"{name:<12}{_fmt(summary['mean'])}{_fmt(summary['p50'])}"
+                f"{_fmt(summary['p95'])}{_fmt(summary['p99'])}"
+            )
+    return "\n".join(lines)
+
+
+def regressions(report: Dict[str, Any], baseline: Dict[str, Any], max_ratio: float) -> List[str]:
+    """p95 latencies (routes and stages) that grew by more than ``max_ratio`` over the baseline."""
+    problems: List[str] = []
+    for section in ("routes", "stages"):
+        for name, summary in report.get(section, {}).items():
+            before = baseline.get(section, {}).get(name, {}).get("p95")
+            after = summary.get("p95")
+            if before and after and after > before * (1 + max_ratio):
+                problems.append(f"{section}/{name} p95 {before:.1f}ms -> {after:.1f}ms")
+    return problems
@@ -1,17 +1,34 @@
 import logging
+import re
+import time
+import uuid
 from typing import Any, Dict
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from starlette import status
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from backend.config import get_settings
-from backend.database.session import Base, engine
+from backend.database.migrations import run_migrations
+from backend.database import crud
+from backend.database.session import Base, SessionLocal, async_engine, async_read_engine, engine
+from backend.database.stats import ensure_ticket_stats
+from backend.database.writer import ticket_writer
 from backend.routers import tickets
-from backend.utils.logging_config import setup_logging
+from backend.services.change_feed import change_feed
+from backend.services.gemini_batcher import gemini_batcher
+from backend.services.gemini_executor import gemini_executor
+from backend.services.local_classifier import local_classifier
+from backend.services.near_duplicates import near_duplicate_index
+from backend.services.reevaluation import reevaluation_runner
+from backend.services.result_cache import ai_result_cache
+from backend.services.ticket_worker import ticket_worker_pool
+from backend.utils.logging_config import request_id_var, setup_logging
+from backend.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REQUEST_DURATION, registry
+from backend.utils.timing import server_timing_header, start_request_timing
 
 
 settings = get_settings()
@@ -26,10 +43,39 @@ app = FastAPI(
 )
 
 
+def _ticket_messages_after(after_id: int):
+    with SessionLocal() as db:
+        return crud.list_ticket_messages_after(db, after_id)
+
+
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    ensure_ticket_stats(engine)
     logger.info("Database tables created or verified.")
+    if settings.near_duplicate_enabled:
+        near_duplicate_index.start(_ticket_messages_after)
+    if settings.local_classifier_enabled:
+        local_classifier.load()
+    change_feed.start()
+    await ticket_writer.start()
+    await ticket_worker_pool.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await reevaluation_runner.stop()
+    await ticket_worker_pool.stop()
+    await gemini_batcher.stop()
+    await ticket_writer.stop()
+    await change_feed.stop()
+    await async_engine.dispose()
+    await async_read_engine.dispose()
+    ai_result_cache.close()
+    if settings.near_duplicate_enabled:
+        near_duplicate_index.save_snapshot()
+    gemini_executor.shutdown()
 
 
 origins = settings.get_allowed_origins_list() or ["http://localhost:5173", "http://127.0.0.1:5173"]
@@ -45,11 +91,55 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def server_timing_middleware(request: Request, call_next):
+    # Per-stage durations (validation, dedupe, llm, guardrails, db) for load tests / browsers
+    stages = start_request_timing()
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Route template, not the raw path, to keep label cardinality bounded
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    REQUEST_DURATION.observe(time.perf_counter() - started, request.method, route, str(response.status_code))
+    if stages:
+        response.headers["Server-Timing"] = server_timing_header(stages)
+    return response
+
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+# Registered last so it runs first: every log line of the request, including
+# those from the other middleware, carries the request ID
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID", "")
+    if not _REQUEST_ID.match(request_id):
+        request_id = uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 @app.get("/health", tags=["system"])
 async def health_check() -> Dict[str, Any]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["system"], include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus text format; values are per process."""
+    if not settings.metrics_enabled:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"code": "not_found", "message": "Metrics are disabled."},
+        )
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     logger.warning("HTTP error %s: %s", exc.status_code, exc.detail)
@@ -60,6 +150,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content=detail,
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
@@ -59,6 +59,11 @@ class TicketResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TicketAccepted(BaseModel):
+    id: int
+    status: str
+
+
 class TicketListItem(BaseModel):
     id: int
     name: str
@@ -74,19 +79,67 @@ class TicketListItem(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class TicketLogEntry(BaseModel):
+class TicketLogSummary(BaseModel):
     id: int
     timestamp: datetime
-    raw_input: str
-    ai_output: Optional[str]
     guardrail_flags: Optional[str]
     routing_decision: Optional[str]
+    gemini_error: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    # "gemini" or "local"; null for entries written before the local classifier existed
+    classifier: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class TicketLogEntry(TicketLogSummary):
+    raw_input: str
+    ai_output: Optional[str]
+
+
 class TicketListResponse(BaseModel):
     items: List[TicketListItem]
+    # Pass as ``cursor`` to fetch the next page; null on the last page
+    next_cursor: Optional[str] = None
+
+
+class TicketSearchHit(BaseModel):
+    id: int
+    subject: str
+    category: Optional[str]
+    urgency: Optional[str]
+    status: str
+    created_at: datetime
+    # BM25 relevance; lower is a better match
+    score: float
+    # HTML-escaped excerpt with matches wrapped in <mark>...</mark>
+    snippet: str
+
+
+class TicketSearchResponse(BaseModel):
+    items: List[TicketSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class TicketStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_urgency: Dict[str, int]
+    by_category: Dict[str, int]
+    by_routing_decision: Dict[str, int]
+    # Share of AI analyses (ticket log entries) that hit a Gemini error
+    gemini_error_rate: Optional[float]
+    # Share of AI analyses answered by the local classifier (Gemini calls saved)
+    local_classification_rate: Optional[float] = None
+    avg_confidence: Optional[float]
+    avg_priority: Optional[float]
+    # Gemini tokens summed over analyses that made a call (cache hits spend none)
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    avg_total_tokens: Optional[float] = None
 
 
 class ErrorResponse(BaseModel):
@@ -94,3 +147,42 @@ class ErrorResponse(BaseModel):
     message: str
     details: Optional[dict] = None
 
+
+class BulkTicketResult(BaseModel):
+    index: int
+    ok: bool
+    ticket_id: Optional[int] = None
+    status: Optional[str] = None
+    routing_decision: Optional[str] = None
+    is_duplicate: Optional[bool] = None
+    error: Optional[ErrorResponse] = None
+
+
+
+class ReevaluationChange(BaseModel):
+    ticket_id: int
+    status: str
+    new_status: str
+    guardrail_flags: List[str]
+    new_guardrail_flags: List[str]
+    routing_decision: Optional[str]
+    new_routing_decision: str
+
+
+class ReevaluationStatus(BaseModel):
+    state: str  # running | finished | failed | cancelled
+    dry_run: bool
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    # Tickets with an AI result when the job started (estimate for progress)
+    total: int
+    scanned: int
+    changed: int
+    # Changed tickets written (0 in a dry run); skipped = modified by something else meanwhile
+    updated: int
+    skipped: int
+    # (previous status, new status) -> tickets, e.g. "Auto-Resolved -> Needs Human Review"
+    transitions: Dict[str, int]
+    # First changes found (up to the diff limit)
+    changes: List[ReevaluationChange]
+    error: Optional[str] = None
@@ -1,42 +1,92 @@
-from typing import List, Optional
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import Receive, Scope, Send
 
-from backend.database import crud, models as db_models
-from backend.database.session import get_db
+from backend.config import get_settings
+from backend.database import async_crud as crud
+from backend.database import export as ticket_export, search as ticket_search, stats as ticket_stats
+from backend.database.session import AsyncReadSessionLocal, get_async_read_db
 from backend.models.schemas import (
     ErrorResponse,
+    ReevaluationStatus,
+    TicketAccepted,
     TicketCreate,
-    TicketListItem,
     TicketListResponse,
     TicketLogEntry,
+    TicketLogSummary,
     TicketResponse,
+    TicketSearchResponse,
+    TicketStats,
+)
+from backend.services.bulk_ingest import ingest_stream
+from backend.services.change_feed import change_feed, sse_frame
+from backend.services.gemini_service import call_gemini_stream
+from backend.services.reevaluation import reevaluation_runner
+from backend.services.ticket_pipeline import (
+    STATUS_PROCESSING,
+    prepare_ticket,
+    process_ticket,
+    store_ticket,
+    ticket_response,
+)
+from backend.services.ticket_worker import ticket_worker_pool
+from backend.utils.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    decode_search_cursor,
+    encode_cursor,
+    encode_search_cursor,
 )
-from backend.services.gemini_service import call_gemini
-from backend.services.guardrail_service import apply_guardrails
 from backend.utils.rate_limiter import rate_limiter
-from backend.utils.security import hash_message, validate_content_safety
+from backend.utils.json_stream import IncrementalObjectParser
+from backend.utils.security import validate_content_safety
+from backend.utils.timing import stage
 
 
+settings = get_settings()
+
 router = APIRouter(prefix="/tickets", tags=["tickets"])
+logger = logging.getLogger(__name__)
 
+# Each running export holds a read connection for its whole duration
+_export_slots = asyncio.Semaphore(max(1, settings.export_max_concurrency))
 
-@router.post(
-    "",
-    response_model=TicketResponse,
-    responses={400: {"model": ErrorResponse}, 429: {"model": ErrorResponse}},
-)
-async def create_ticket(
-    ticket_in: TicketCreate,
-    request: Request,
-    db: Session = Depends(get_db),
-    _: None = Depends(rate_limiter),
-):
+# GeminiResult fields sent as `field` events by POST /tickets/stream
+STREAMED_CLASSIFICATION_FIELDS = {
+    "category",
+    "urgency",
+    "priority_score",
+    "confidence_score",
+    "reasoning_summary",
+}
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for bodies produced while the request body is still being read.
+    The stock class consumes ``receive`` to watch for disconnects, which would steal
+    request body chunks; here ``request.stream()`` detects the disconnect instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _check_content_safety(ticket_in: TicketCreate) -> None:
     # Additional security validation
-    security_errors = validate_content_safety(
-        ticket_in.name, ticket_in.subject, ticket_in.message
-    )
+    with stage("validation"):
+        security_errors = validate_content_safety(
+            ticket_in.name, ticket_in.subject, ticket_in.message
+        )
     if security_errors:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,124 +97,480 @@ async def create_ticket(
             },
         )
 
-    message_hash = hash_message(ticket_in.message)
-    existing = crud.get_ticket_by_hash(db, message_hash)
-
-    is_duplicate = existing is not None
-    original_ticket_id = existing.id if existing else None
-
-    # Call Gemini
-    gemini_result, raw_json, gemini_error = await call_gemini(ticket_in)
-    guardrail = apply_guardrails(gemini_result)
-
-    if guardrail.needs_human_review:
-        routing_decision = "Human Review"
-    else:
-        routing_decision = "Auto-Resolve"
-
-    # Persist ticket
-    ticket = db_models.Ticket(
-        name=ticket_in.name,
-        email=ticket_in.email,
-        subject=ticket_in.subject,
-        message=ticket_in.message,
-        message_hash=message_hash,
-        is_duplicate=is_duplicate,
-        original_ticket_id=original_ticket_id,
-        category=(gemini_result.category or None),
-        urgency=(gemini_result.urgency or None),
-        priority_score=gemini_result.priority_score,
-        confidence_score=gemini_result.confidence_score,
-        draft_reply=gemini_result.draft_reply,
-        reasoning_summary=gemini_result.reasoning_summary,
-        status=guardrail.status,
-        guardrail_flags=",".join(guardrail.flags),
-        routing_decision=routing_decision,
-    )
 
-    ticket = crud.create_ticket(db, ticket)
+def _json_rows(columns: Sequence[Any], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Projected rows as plain dicts for ORJSONResponse. Read endpoints return these
+    directly instead of building a Pydantic model per row; their ``response_model``
+    still documents the schema, and the columns are selected in its field order.
+    """
+    keys = [column.key for column in columns]
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
+
+@router.post(
+    "",
+    response_model=TicketResponse,
+    responses={
+        202: {"model": TicketAccepted},
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+async def create_ticket(
+    ticket_in: TicketCreate,
+    request: Request,
+    mode: Literal["sync", "async"] = "sync",
+    db: AsyncSession = Depends(get_async_read_db),
+    _: None = Depends(rate_limiter),
+):
+    _check_content_safety(ticket_in)
+
+    if mode == "async":
+        # The queue slot is claimed before the ticket is stored: when the queue is
+        # full the request fails with 503 and no ticket is created
+        if not ticket_worker_pool.reserve():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail={
+                    "code": "queue_full",
+                    "message": "Too many tickets are waiting to be processed. Please try again later.",
+                },
+            )
+        try:
+            _, ticket_values = await prepare_ticket(db, ticket_in)
+            # Persist now; the worker pool fills in the AI result and the log entry
+            with stage("db"):
+                ticket = await store_ticket(dict(ticket_values, status=STATUS_PROCESSING), None)
+        except BaseException:
+            ticket_worker_pool.release()
+            raise
+        ticket_worker_pool.enqueue(ticket.id)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=TicketAccepted(id=ticket.id, status=ticket.status).model_dump(),
+        )
+
+    message_hash, ticket_values = await prepare_ticket(db, ticket_in)
+    ticket = await process_ticket(ticket_in, message_hash, ticket_values)
+    return ticket_response(ticket)
+
+
+@router.post(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": (
+                "Server-Sent Events: `field` ({name, value}) for each classification field as soon "
+                "as Gemini has produced it, `draft_delta` ({text}) for each piece of the draft reply, "
+                "then `ticket` (TicketResponse) once guardrails have run and the ticket is stored, "
+                "or `error` (ErrorResponse)."
+            ),
+        },
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+    },
+)
+async def create_ticket_stream(
+    ticket_in: TicketCreate,
+    db: AsyncSession = Depends(get_async_read_db),
+    _: None = Depends(rate_limiter),
+):
+    """
+    Same pipeline and persistence as ``POST /tickets``, with Gemini called in
+    streaming mode so the first fields arrive after the model's first-token latency.
+    The final `ticket` event is authoritative: on a cache hit or when the local
+    classifier answers only that event is sent, and if the stream fails midway the
+    retried result may differ from earlier events.
+    """
+    _check_content_safety(ticket_in)
+    message_hash, ticket_values = await prepare_ticket(db, ticket_in)
 
-    # Log
-    raw_input_str = (
-        f"name={ticket_in.name}; email={ticket_in.email}; "
-        f"subject={ticket_in.subject}; message={ticket_in.message}"
+    chunks: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(
+        process_ticket(
+            ticket_in,
+            message_hash,
+            ticket_values,
+            classify=lambda: call_gemini_stream(ticket_in, chunks.put_nowait),
+        )
     )
+    # Signals the end of the stream; the ticket is stored even if the client disconnects
+    task.add_done_callback(lambda _: chunks.put_nowait(None))
+
+    async def events():
+        parser = IncrementalObjectParser(stream_fields={"draft_reply"})
+        parse_failed = False
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                break
+            if parse_failed:
+                continue
+            try:
+                parsed = parser.feed(chunk)
+            except ValueError:
+                # Malformed output: the retried result arrives in the final event
+                parse_failed = True
+                continue
+            for kind, name, value in parsed:
+                if kind == "delta":
+                    yield _sse("draft_delta", {"text": value})
+                elif name in STREAMED_CLASSIFICATION_FIELDS:
+                    yield _sse("field", {"name": name, "value": value})
+
+        try:
+            ticket = task.result()
+        except Exception:  # noqa: BLE001
+            logger.exception("Streaming ticket submission failed")
+            yield _sse("error", {"code": "internal_error", "message": "An unexpected error occurred."})
+            return
+        yield _sse("ticket", ticket_response(ticket).model_dump(mode="json"))
 
-    ai_output_str = raw_json or ""
-    if gemini_error:
-        ai_output_str += f"\nERROR: {gemini_error}"
-
-    crud.create_ticket_log(
-        db,
-        ticket_id=ticket.id,
-        raw_input=raw_input_str,
-        ai_output=ai_output_str,
-        guardrail_flags=",".join(guardrail.flags),
-        routing_decision=routing_decision,
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    flags_list = ticket.guardrail_flags.split(",") if ticket.guardrail_flags else []
-
-    return TicketResponse(
-        id=ticket.id,
-        name=ticket.name,
-        email=ticket.email,
-        subject=ticket.subject,
-        message=ticket.message,
-        category=ticket.category,
-        urgency=ticket.urgency,
-        priority_score=ticket.priority_score,
-        confidence_score=ticket.confidence_score,
-        draft_reply=ticket.draft_reply,
-        reasoning_summary=ticket.reasoning_summary,
-        status=ticket.status,
-        guardrail_flags=flags_list,
-        routing_decision=ticket.routing_decision,
-        is_duplicate=ticket.is_duplicate,
-        original_ticket_id=ticket.original_ticket_id,
-        created_at=ticket.created_at,
+
+@router.post(
+    "/bulk",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One BulkTicketResult JSON object per line, in completion order.",
+        },
+        429: {"model": ErrorResponse},
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def bulk_create_tickets(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    _: None = Depends(rate_limiter),
+):
+    """
+    Stream-ingest many tickets. The body is NDJSON (one TicketCreate object per line)
+    or CSV with a name,email,subject,message header; the format is taken from
+    ``format`` or the Content-Type header.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if content_type.startswith("text/csv") else "ndjson"
+
+    return _DuplexStreamingResponse(
+        ingest_stream(request.stream(), format),
+        media_type="application/x-ndjson",
     )
 
 
-@router.get("", response_model=TicketListResponse)
+@router.get(
+    "",
+    response_model=TicketListResponse,
+    responses={400: {"model": ErrorResponse}},
+)
 async def list_tickets(
-    status: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    urgency: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "invalid_cursor", "message": str(exc)},
+        )
+
+    with stage("db"):
+        # One extra row tells us whether another page exists
+        rows = await crud.list_tickets(db, status=status_filter, urgency=urgency, limit=limit + 1, after=after)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return ORJSONResponse({"items": _json_rows(crud.TICKET_LIST_COLUMNS, rows), "next_cursor": next_cursor})
+
+
+@router.get(
+    "/search",
+    response_model=TicketSearchResponse,
+    responses={400: {"model": ErrorResponse}, 501: {"model": ErrorResponse}},
+)
+async def search_tickets(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to match (`word*` for prefixes)."),
+    status_filter: Optional[str] = Query(None, alias="status"),
     urgency: Optional[str] = None,
-    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    tickets = crud.list_tickets(db, status=status, urgency=urgency)
-    items: List[TicketListItem] = []
-    for t in tickets:
-        items.append(
-            TicketListItem(
-                id=t.id,
-                name=t.name,
-                email=t.email,
-                subject=t.subject,
-                category=t.category,
-                urgency=t.urgency,
-                priority_score=t.priority_score,
-                confidence_score=t.confidence_score,
-                status=t.status,
-                created_at=t.created_at,
+    if not ticket_search.supports_search(db.get_bind().dialect.name):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail={"code": "search_unavailable", "message": "Full-text search requires the SQLite backend."},
+        )
+    try:
+        after = decode_search_cursor(cursor) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "invalid_cursor", "message": str(exc)},
+        )
+
+    try:
+        with stage("db"):
+            hits = await ticket_search.search_tickets(
+                db, q, status=status_filter, urgency=urgency, limit=limit + 1, after=after
             )
+    except ticket_search.InvalidSearchQuery as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "invalid_query", "message": str(exc)},
+        )
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_search_cursor(hits[-1].score, hits[-1].id)
+
+    return ORJSONResponse({"items": [hit._asdict() for hit in hits], "next_cursor": next_cursor})
+
+
+@router.get("/stats", response_model=TicketStats)
+async def get_ticket_stats(db: AsyncSession = Depends(get_async_read_db)):
+    """Dashboard counters; reads the maintained ``ticket_stats`` rows, never ``tickets``."""
+    with stage("db"):
+        counters = await ticket_stats.read_ticket_stats(db)
+
+    def grouped(dimension: str) -> Dict[str, int]:
+        return {
+            value: count
+            for (dim, value), (count, _) in sorted(counters.items())
+            if dim == dimension and count > 0
+        }
+
+    def ratio(numerator: float, denominator: int) -> Optional[float]:
+        return round(numerator / denominator, 4) if denominator else None
+
+    analyses = counters.get((ticket_stats.ANALYSES, ""), (0, 0.0))[0]
+    gemini_errors = counters.get((ticket_stats.GEMINI_ERRORS, ""), (0, 0.0))[0]
+    local_analyses = counters.get((ticket_stats.LOCAL_ANALYSES, ""), (0, 0.0))[0]
+    confidence_count, confidence_total = counters.get((ticket_stats.CONFIDENCE, ""), (0, 0.0))
+    priority_count, priority_total = counters.get((ticket_stats.PRIORITY, ""), (0, 0.0))
+    tokens = {dimension: counters.get((dimension, ""), (0, 0.0)) for dimension in ticket_stats.TOKEN_DIMENSIONS}
+    token_calls, total_tokens = tokens[ticket_stats.TOTAL_TOKENS]
+
+    return TicketStats(
+        total=counters.get((ticket_stats.TICKETS, ""), (0, 0.0))[0],
+        by_status=grouped("status"),
+        by_urgency=grouped("urgency"),
+        by_category=grouped("category"),
+        by_routing_decision=grouped("routing_decision"),
+        gemini_error_rate=ratio(gemini_errors, analyses),
+        local_classification_rate=ratio(local_analyses, analyses),
+        avg_confidence=ratio(confidence_total, confidence_count),
+        avg_priority=ratio(priority_total, priority_count),
+        prompt_tokens=int(tokens[ticket_stats.PROMPT_TOKENS][1]),
+        output_tokens=int(tokens[ticket_stats.OUTPUT_TOKENS][1]),
+        total_tokens=int(total_tokens),
+        avg_total_tokens=ratio(total_tokens, token_calls),
+    )
+
+
+@router.get(
+    "/changes",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": (
+                "Server-Sent Events, each with an `id`: `ready` once subscribed, then `created` / `updated` "
+                "(TicketListItem fields plus `routing_decision`; updates also carry `previous_status` and "
+                "`previous_urgency`) whenever a ticket is stored or its status or routing changes. `reset` "
+                "means the `Last-Event-ID` could not be resumed and the list should be reloaded; `overflow` "
+                "means the client fell too far behind and should reconnect."
+            ),
+        },
+        503: {"model": ErrorResponse},
+    },
+)
+async def ticket_changes(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    urgency: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None, description="Resume after this event (sent by EventSource)."),
+):
+    """
+    Live feed of ticket changes for the dashboard instead of polling ``GET /tickets``.
+    ``status`` / ``urgency`` filter on the server; an update that moves a ticket out
+    of the filter is still sent so the client can remove it.
+    """
+    if change_feed.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"code": "too_many_subscribers", "message": "Too many open change feeds. Please try again later."},
+        )
+
+    async def events():
+        subscription, replay, reset = change_feed.subscribe(
+            status=status_filter, urgency=urgency, last_event_id=last_event_id
         )
-    return TicketListResponse(items=items)
-
-
-@router.get("/{ticket_id}/logs", response_model=List[TicketLogEntry])
-async def get_ticket_logs(ticket_id: int, db: Session = Depends(get_db)):
-    logs = crud.list_ticket_logs(db, ticket_id=ticket_id)
-    # Avoid Pydantic v2 from_orm requirements by constructing manually
-    return [
-        TicketLogEntry(
-            id=log.id,
-            timestamp=log.timestamp,
-            raw_input=log.raw_input,
-            ai_output=log.ai_output,
-            guardrail_flags=log.guardrail_flags,
-            routing_decision=log.routing_decision,
+        try:
+            if reset:
+                yield sse_frame("reset", {})
+            for event in replay:
+                yield event.frame
+            yield sse_frame("ready", {}, change_feed.event_id(subscription.after))
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), settings.change_feed_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield b": keep-alive\n\n"
+                    continue
+                if event is None:
+                    yield sse_frame("overflow", {})
+                    return
+                yield event.frame
+        finally:
+            change_feed.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}, "text/csv": {}},
+            "description": "Every column of each matching row, in id order: one JSON object per line, or CSV "
+            "with a header line.",
+        },
+    },
+)
+async def export_tickets(
+    resource: Literal["tickets", "logs"] = "tickets",
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status_filter: Optional[str] = Query(None, alias="status"),
+    urgency: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Created at or after (ticket `created_at`, log `timestamp`)."),
+    until: Optional[datetime] = Query(None, description="Created before."),
+):
+    """
+    Stream all matching tickets or log entries. Rows are fetched from a server-side
+    cursor in chunks of ``EXPORT_CHUNK_SIZE``, so memory use is the same for any
+    number of rows. ``status`` / ``urgency`` filter logs by their ticket.
+    """
+    query = ticket_export.export_query(resource, status=status_filter, urgency=urgency, since=since, until=until)
+    encoder = ticket_export.make_encoder(format, resource)
+
+    async def body():
+        # Own session: the request's dependencies are closed before the body is streamed
+        async with _export_slots, AsyncReadSessionLocal() as db:
+            header = encoder.header()
+            if header:
+                yield header.encode("utf-8")
+            async for rows in ticket_export.stream_rows(db, query, settings.export_chunk_size):
+                yield encoder.encode(rows).encode("utf-8")
+
+    return StreamingResponse(
+        body(),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{encoder.extension}"'},
+    )
+
+
+@router.post(
+    "/reevaluate",
+    response_model=ReevaluationStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={409: {"model": ErrorResponse}},
+)
+async def start_reevaluation(
+    dry_run: bool = Query(False, description="Only report what would change."),
+    diff_limit: int = Query(100, ge=0, le=1000, description="Changes listed in the status."),
+):
+    """
+    Re-apply the current guardrails and routing to every stored ticket in the
+    background (no Gemini calls) and update the tickets whose result changed.
+    Progress and the diff are returned by ``GET /tickets/reevaluate``.
+    """
+    if reevaluation_runner.running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"code": "reevaluation_running", "message": "A re-evaluation is already running."},
+        )
+    return reevaluation_runner.start(dry_run=dry_run, diff_limit=diff_limit).status()
+
+
+@router.get(
+    "/reevaluate",
+    response_model=ReevaluationStatus,
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_reevaluation():
+    """Progress of the running re-evaluation, or the result of the last one."""
+    if reevaluation_runner.job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "not_found", "message": "No re-evaluation has been started."},
         )
-        for log in logs
-    ]
+    return reevaluation_runner.job.status()
 
+
+@router.get(
+    "/{ticket_id}",
+    response_model=TicketResponse,
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_ticket(ticket_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    ticket = await crud.get_ticket(db, ticket_id)
+    if ticket is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "not_found", "message": f"Ticket {ticket_id} not found."},
+        )
+    return ticket_response(ticket)
+
+
+@router.get(
+    "/{ticket_id}/logs",
+    response_model=Union[List[TicketLogEntry], List[TicketLogSummary]],
+)
+async def get_ticket_logs(
+    ticket_id: int,
+    view: Literal["full", "summary"] = Query(
+        "full", description="`summary` omits the raw input and AI output payloads."
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    include_payload = view == "full"
+    logs = await crud.list_ticket_logs(db, ticket_id=ticket_id, include_payload=include_payload)
+    columns = crud.TICKET_LOG_SUMMARY_COLUMNS + (crud.TICKET_LOG_PAYLOAD_COLUMNS if include_payload else ())
+    return ORJSONResponse(_json_rows(columns, logs))
@@ -0,0 +1,218 @@
+import asyncio
+import codecs
+import csv
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from backend.config import get_settings
+from backend.database.session import AsyncReadSessionLocal
+from backend.models.schemas import BulkTicketResult, ErrorResponse, TicketCreate
+from backend.services.ticket_pipeline import prepare_ticket, process_ticket
+from backend.utils.security import validate_content_safety
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# A parsed record, or an ErrorResponse for input that could not be parsed
+_Record = Tuple[int, Union[Dict[str, Any], ErrorResponse]]
+
+
+class RecordTooLarge(Exception):
+    pass
+
+
+def _check_size(text: str, max_bytes: int) -> None:
+    # Characters can take up to 4 bytes; only encode when the length alone does not decide
+    if len(text) > max_bytes or (len(text) * 4 > max_bytes and len(text.encode("utf-8")) > max_bytes):
+        raise RecordTooLarge()
+
+
+async def _lines(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            _check_size(line, max_bytes)
+            yield line.rstrip("\r")
+        # An unterminated line that is already too long
+        _check_size(buffer, max_bytes)
+    buffer += decoder.decode(b"", final=True)
+    _check_size(buffer, max_bytes)
+    if buffer.strip():
+        yield buffer.rstrip("\r")
+
+
+async def _ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[_Record]:
+    index = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield index, ErrorResponse(code="invalid_record", message=f"Invalid JSON: {exc.msg}.")
+        else:
+            if isinstance(record, dict):
+                yield index, record
+            else:
+                yield index, ErrorResponse(code="invalid_record", message="Record must be a JSON object.")
+        index += 1
+
+
+async def _csv_records(lines: AsyncIterator[str], max_bytes: int) -> AsyncIterator[_Record]:
+    header: Optional[list] = None
+    pending = ""
+    index = 0
+    async for line in lines:
+        pending = f"{pending}\n{line}" if pending else line
+        # An odd number of quotes means a quoted field continues on the next line
+        if pending.count('"') % 2:
+            _check_size(pending, max_bytes)
+            continue
+        row = next(csv.reader([pending]), [])
+        pending = ""
+        if header is None:
+            header = [column.strip().lower() for column in row]
+            continue
+        if not any(cell.strip() for cell in row):
+            continue
+        yield index, dict(zip(header, row))
+        index += 1
+
+
+async def _process_record(index: int, record: Union[Dict[str, Any], ErrorResponse]) -> BulkTicketResult:
+    if isinstance(record, ErrorResponse):
+        return BulkTicketResult(index=index, ok=False, error=record)
+
+    try:
+        ticket_in = TicketCreate(**record)
+    except ValidationError as exc:
+        return BulkTicketResult(
+            index=index,
+            ok=False,
+            error=ErrorResponse(
+                code="validation_error",
+                message="Request validation failed.",
+                details={"errors": json.loads(exc.json(include_url=False))},
+            ),
+        )
+
+    security_errors = validate_content_safety(ticket_in.name, ticket_in.subject, ticket_in.message)
+    if security_errors:
+        return BulkTicketResult(
+            index=index,
+            ok=False,
+            error=ErrorResponse(
+                code="validation_error",
+                message="Input failed security validation.",
+                details={"issues": security_errors},
+            ),
+        )
+
+    async with AsyncReadSessionLocal() as db:
+        message_hash, ticket_values = await prepare_ticket(db, ticket_in)
+    ticket = await process_ticket(ticket_in, message_hash, ticket_values)
+
+    return BulkTicketResult(
+        index=index,
+        ok=True,
+        ticket_id=ticket.id,
+        status=ticket.status,
+        routing_decision=ticket.routing_decision,
+        is_duplicate=ticket.is_duplicate,
+    )
+
+
+async def ingest_stream(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[bytes]:
+    """
+    Parse an NDJSON or CSV upload incrementally, run each record through the ticket
+    pipeline with bounded concurrency and yield one NDJSON result line per record
+    as soon as it finishes. Results may arrive out of order; ``index`` identifies
+    the record. Reading pauses while the client is not consuming results.
+    """
+    concurrency = max(1, settings.bulk_max_concurrency)
+    max_bytes = settings.bulk_max_record_bytes
+    slots = asyncio.Semaphore(concurrency)
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    done = object()
+
+    async def run_one(index: int, record: Union[Dict[str, Any], ErrorResponse]) -> None:
+        # The slot is held until the result is queued, so slots bound both records in
+        # flight and results the client has not read yet
+        try:
+            try:
+                result = await _process_record(index, record)
+            except Exception:  # noqa: BLE001
+                logger.exception("Bulk ingestion failed for record %s", index)
+                result = BulkTicketResult(
+                    index=index,
+                    ok=False,
+                    error=ErrorResponse(code="internal_error", message="Failed to process this record."),
+                )
+            await results.put(result)
+        finally:
+            slots.release()
+
+    async def produce() -> None:
+        tasks = set()
+        lines = _lines(chunks, max_bytes)
+        records = _csv_records(lines, max_bytes) if fmt == "csv" else _ndjson_records(lines)
+        try:
+            try:
+                async for index, record in records:
+                    await slots.acquire()
+                    task = asyncio.create_task(run_one(index, record))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            except RecordTooLarge:
+                await results.put(
+                    BulkTicketResult(
+                        index=-1,
+                        ok=False,
+                        error=ErrorResponse(
+                            code="record_too_large",
+                            message=f"A record exceeds {max_bytes} bytes; the rest of the upload was skipped.",
+                        ),
+                    )
+                )
+            except Exception:  # noqa: BLE001
+                # e.g. the client disconnected mid-upload
+                logger.exception("Reading the bulk upload failed")
+                for task in tasks:
+                    task.cancel()
+                await results.put(
+                    BulkTicketResult(
+                        index=-1,
+                        ok=False,
+                        error=ErrorResponse(
+                            code="upload_failed",
+                            message="Reading the upload failed; the rest of it was skipped.",
+                        ),
+                    )
+                )
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await results.put(done)
+        except asyncio.CancelledError:
+            # The client went away: nobody will read the results still being produced
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            result = await results.get()
+            if result is done:
+                break
+            yield (result.model_dump_json(exclude_none=True) + "\n").encode("utf-8")
+    finally:
+        if not producer.done():
+            producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,213 @@
+"""
+In-process feed of ticket changes for the admin dashboard (``GET /tickets/changes``).
+
+``publish`` only encodes the event once, appends it to a bounded history and wakes
+the dispatcher task, so the ingest path pays the same small cost whatever the
+number of subscribers. The dispatcher copies each event into the bounded queue of
+every subscriber whose filters match; a subscriber that falls ``max_queue_size``
+events behind is dropped with an ``overflow`` event and resumes from the history
+when it reconnects with ``Last-Event-ID``. Event ids are ``<boot>-<seq>``: an id
+from an earlier process, or older than the history, gets a ``reset`` event (reload
+the list) instead of a replay.
+
+Events live in this process only; with several worker processes each serves the
+changes it persisted itself.
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Deque, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import orjson
+
+from backend.config import get_settings
+from backend.database import models as db_models
+from backend.utils.metrics import CHANGE_FEED_EVENTS, CHANGE_FEED_OVERFLOWS
+
+
+settings = get_settings()
+
+CHANGE_CREATED = "created"
+CHANGE_UPDATED = "updated"
+
+# Ticket columns sent with every event (the TicketListItem fields plus routing_decision)
+EVENT_COLUMNS = (
+    "id",
+    "name",
+    "email",
+    "subject",
+    "category",
+    "urgency",
+    "priority_score",
+    "confidence_score",
+    "status",
+    "routing_decision",
+    "created_at",
+)
+
+
+class ChangeEvent(NamedTuple):
+    seq: int
+    status: Optional[str]
+    urgency: Optional[str]
+    previous_status: Optional[str]
+    previous_urgency: Optional[str]
+    # Complete SSE frame, encoded once for all subscribers
+    frame: bytes
+
+
+def sse_frame(event: str, data: Any, event_id: Optional[str] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode("utf-8") + orjson.dumps(data) + b"\n\n"
+
+
+class Subscription:
+    """One connected client: its filters and the events waiting to be sent to it."""
+
+    def __init__(self, status: Optional[str], urgency: Optional[str], max_queue_size: int) -> None:
+        self.status = status
+        self.urgency = urgency
+        # ChangeEvents, then None once the subscriber has been dropped for falling behind
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size + 1)
+        self.max_queue_size = max_queue_size
+        # Last seq delivered or replayed
+        self.after = 0
+
+    def matches(self, event: ChangeEvent) -> bool:
+        # An update that moves a ticket out of the filter is sent too, so the client can drop it
+        if self.status and self.status not in (event.status, event.previous_status):
+            return False
+        if self.urgency and self.urgency not in (event.urgency, event.previous_urgency):
+            return False
+        return True
+
+
+class ChangeFeed:
+    def __init__(self, *, history_size: int, max_queue_size: int, max_subscribers: int) -> None:
+        self._boot = format(int(time.time()), "x")
+        self._seq = 0
+        self._history: Deque[ChangeEvent] = deque(maxlen=max(1, history_size))
+        self._max_queue_size = max(1, max_queue_size)
+        self._max_subscribers = max(1, max_subscribers)
+        self._subscribers: Set[Subscription] = set()
+        self._dispatched = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self._max_subscribers
+
+    def event_id(self, seq: int) -> str:
+        return f"{self._boot}-{seq}"
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._dispatch(), name="change-feed")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._wakeup = None
+
+    def publish(
+        self,
+        change: str,
+        ticket: db_models.Ticket,
+        *,
+        previous_status: Optional[str] = None,
+        previous_urgency: Optional[str] = None,
+    ) -> None:
+        """Record a change to ``ticket``; never waits. Call from the event loop thread."""
+        self._seq += 1
+        data = {column: getattr(ticket, column) for column in EVENT_COLUMNS}
+        if change == CHANGE_UPDATED:
+            data["previous_status"] = previous_status
+            data["previous_urgency"] = previous_urgency
+        self._history.append(
+            ChangeEvent(
+                self._seq,
+                ticket.status,
+                ticket.urgency,
+                previous_status,
+                previous_urgency,
+                sse_frame(change, data, self.event_id(self._seq)),
+            )
+        )
+        CHANGE_FEED_EVENTS.inc(change)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _since(self, seq: int) -> Iterable[ChangeEvent]:
+        if not self._history:
+            return ()
+        return itertools.islice(self._history, max(0, seq - self._history[0].seq + 1), None)
+
+    def subscribe(
+        self, *, status: Optional[str], urgency: Optional[str], last_event_id: Optional[str]
+    ) -> Tuple[Subscription, List[ChangeEvent], bool]:
+        """
+        Register a subscriber. Returns it with the events to replay after
+        ``last_event_id`` and whether the client must reload instead (the id is
+        unknown or older than the history).
+        """
+        subscription = Subscription(status, urgency, self._max_queue_size)
+        replay: List[ChangeEvent] = []
+        reset = False
+        if last_event_id is not None:
+            boot, _, seq_text = last_event_id.partition("-")
+            seq = int(seq_text) if seq_text.isdigit() else -1
+            oldest = self._history[0].seq if self._history else self._seq + 1
+            if boot != self._boot or seq < oldest - 1 or seq > self._seq:
+                reset = True
+            else:
+                replay = [event for event in self._since(seq) if subscription.matches(event)]
+        # Everything published so far is covered by the replay (or the reload)
+        subscription.after = self._seq
+        self._subscribers.add(subscription)
+        return subscription, replay, reset
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def _dispatch(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._history and self._dispatched < self._history[0].seq - 1:
+                # Events were evicted before being dispatched: every subscriber missed some
+                for subscription in list(self._subscribers):
+                    self._drop(subscription)
+            for event in list(self._since(self._dispatched)):
+                for subscription in list(self._subscribers):
+                    if event.seq > subscription.after and subscription.matches(event):
+                        self._deliver(subscription, event)
+                self._dispatched = event.seq
+                # Let request handlers run between events during a burst
+                await asyncio.sleep(0)
+
+    def _deliver(self, subscription: Subscription, event: ChangeEvent) -> None:
+        if subscription.queue.qsize() >= subscription.max_queue_size:
+            self._drop(subscription)
+            return
+        subscription.queue.put_nowait(event)
+        subscription.after = event.seq
+
+    def _drop(self, subscription: Subscription) -> None:
+        # The client reconnects with its Last-Event-ID and replays from the history
+        self._subscribers.discard(subscription)
+        subscription.queue.put_nowait(None)
+        CHANGE_FEED_OVERFLOWS.inc()
+
+
+change_feed = ChangeFeed(
+    history_size=settings.change_feed_history_size,
+    max_queue_size=settings.change_feed_subscriber_queue_size,
+    max_subscribers=settings.change_feed_max_subscribers,
+)
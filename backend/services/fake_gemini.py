@@ -0,0 +1,136 @@
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Iterator, Optional
+
+
+_BATCH_TICKET = re.compile(r"^Ticket (\d+):", re.MULTILINE)
+
+_CATEGORY_HINTS = [
+    ("billing", ("invoice", "charge", "refund", "payment", "billing")),
+    ("account", ("password", "login", "account", "sign in", "locked")),
+    ("technical", ("error", "bug", "crash", "down", "not working")),
+]
+
+
+# Rough token estimate for usage_metadata
+_CHARS_PER_TOKEN = 4
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt_tokens: int, output_tokens: int) -> None:
+        self.text = text
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+
+
+class FakeGenerativeModel:
+    """
+    Local stand-in for ``genai.GenerativeModel`` used for load testing.
+
+    ``generate_content`` sleeps for a log-normal latency and then either raises a
+    server error, raises a 429 quota error, returns truncated JSON, or returns a
+    plausible result (a JSON array for multi-ticket batch prompts). With
+    ``stream=True`` the same text is yielded in small chunks over the same latency.
+    Token counts are estimated from the prompt, system instruction and output length.
+    """
+
+    FIRST_TOKEN_SHARE = 0.2
+    STREAM_CHUNK_CHARS = 16
+
+    def __init__(
+        self,
+        *,
+        latency_median_ms: float,
+        latency_sigma: float,
+        error_rate: float,
+        quota_error_rate: float,
+        malformed_json_rate: float,
+        seed: Optional[int] = None,
+        system_instruction: Optional[str] = None,
+    ) -> None:
+        self._latency_median = max(0.0, latency_median_ms) / 1000.0
+        self._latency_sigma = max(0.0, latency_sigma)
+        self._error_rate = error_rate
+        self._quota_error_rate = quota_error_rate
+        self._malformed_json_rate = malformed_json_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._system_instruction = system_instruction or ""
+
+    def generate_content(self, prompt: str, *, stream: bool = False, **kwargs: Any):
+        with self._lock:
+            latency = self._latency_median * self._random.lognormvariate(0.0, self._latency_sigma)
+            roll = self._random.random()
+        if stream:
+            return self._stream(prompt, latency, roll)
+        time.sleep(latency)
+        text = self._respond(prompt, roll)
+        return FakeResponse(text, self._prompt_tokens(prompt), _tokens(text))
+
+    def _prompt_tokens(self, prompt: str) -> int:
+        return _tokens(self._system_instruction) + _tokens(prompt)
+
+    def _stream(self, prompt: str, latency: float, roll: float) -> Iterator[FakeResponse]:
+        # First chunk after a fifth of the total latency, the rest spread evenly
+        time.sleep(latency * self.FIRST_TOKEN_SHARE)
+        text = self._respond(prompt, roll)
+        chunks = [text[i : i + self.STREAM_CHUNK_CHARS] for i in range(0, len(text), self.STREAM_CHUNK_CHARS)]
+        prompt_tokens = self._prompt_tokens(prompt)
+        sent = 0
+        for index, chunk in enumerate(chunks):
+            if index:
+                time.sleep(latency * (1 - self.FIRST_TOKEN_SHARE) / max(1, len(chunks) - 1))
+            sent += len(chunk)
+            yield FakeResponse(chunk, prompt_tokens, _tokens(text[:sent]))
+
+    def _respond(self, prompt: str, roll: float) -> str:
+        if roll < self._error_rate:
+            raise RuntimeError("500 Internal error from fake Gemini")
+        roll -= self._error_rate
+        if roll < self._quota_error_rate:
+            raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+        roll -= self._quota_error_rate
+
+        batch_indexes = [int(i) for i in _BATCH_TICKET.findall(prompt)]
+        if batch_indexes:
+            sections = re.split(r"^Ticket \d+:", prompt, flags=re.MULTILINE)[1:]
+            text = json.dumps(
+                [dict(_fake_result(section), index=i) for i, section in zip(batch_indexes, sections)]
+            )
+        else:
+            text = json.dumps(_fake_result(prompt.rsplit("Now analyze the following support ticket:", 1)[-1]))
+
+        if roll < self._malformed_json_rate:
+            text = text[: len(text) // 2]
+        return text
+
+
+def _tokens(text: str) -> int:
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def _fake_result(ticket_text: str) -> dict:
+    lowered = ticket_text.lower()
+    category = next(
+        (name for name, words in _CATEGORY_HINTS if any(word in lowered for word in words)), "general"
+    )
+    urgent = any(word in lowered for word in ("urgent", "asap", "down", "outage"))
+    return {
+        "category": category,
+        "urgency": "high" if urgent else "low",
+        "priority_score": 85 if urgent else 30,
+        "confidence_score": 0.9,
+        "draft_reply": (
+            "Hi, thanks for contacting us. We have received your request and a member of our "
+            "team is looking into it now. We will follow up as soon as we have an update.\n\n"
+            "Best regards,\nSufiyan Ali"
+        ),
+        "reasoning_summary": f"Keyword-based {category} classification from the fake provider.",
+    }
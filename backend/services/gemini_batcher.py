@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+from backend.config import get_settings
+from backend.models.schemas import TicketCreate
+from backend.services.gemini_service import GeminiOutcome, call_gemini, call_gemini_batch
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class GeminiBatcher:
+    """
+    Gathers tickets arriving within ``window_ms`` (up to ``max_size``) into a single
+    multi-ticket Gemini request and hands each waiting caller its own result.
+    Items the batch response does not answer fall back to a single-ticket call.
+    """
+
+    def __init__(self, *, window_ms: float, max_size: int, enabled: bool = True) -> None:
+        self._window = max(0.0, window_ms) / 1000.0
+        self._max_size = max(1, max_size)
+        self._enabled = enabled
+        self._pending: List[Tuple[TicketCreate, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Batches in flight; a reference keeps each task alive until it finishes
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def classify(self, ticket: TicketCreate) -> GeminiOutcome:
+        if not self._enabled or self._max_size == 1:
+            return await call_gemini(ticket)
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((ticket, future))
+
+        if len(self._pending) >= self._max_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._dispatch)
+
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def stop(self) -> None:
+        """Send what is pending and wait for the batches in flight."""
+        self._dispatch()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run_batch(self, batch: List[Tuple[TicketCreate, asyncio.Future]]) -> None:
+        tickets = [ticket for ticket, _ in batch]
+        try:
+            if len(tickets) == 1:
+                outcomes: List[Optional[GeminiOutcome]] = [None]
+            else:
+                outcomes = await call_gemini_batch(tickets)
+        except Exception:  # noqa: BLE001
+            logger.exception("Gemini batch of %s tickets failed", len(tickets))
+            outcomes = [None] * len(tickets)
+
+        missing = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        if missing and len(tickets) > 1:
+            logger.warning(
+                "Gemini batch answered %s/%s tickets; retrying the rest individually",
+                len(tickets) - len(missing),
+                len(tickets),
+            )
+
+        async def _single(index: int) -> None:
+            outcomes[index] = await call_gemini(tickets[index])
+
+        await asyncio.gather(*(_single(i) for i in missing), return_exceptions=True)
+
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if outcome is None:
+                future.set_exception(RuntimeError("Gemini classification failed"))
+            else:
+                future.set_result(outcome)
+
+
+gemini_batcher = GeminiBatcher(
+    window_ms=settings.gemini_batch_window_ms,
+    max_size=settings.gemini_batch_max_size,
+    enabled=settings.gemini_batch_enabled,
+)
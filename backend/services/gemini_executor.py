@@ -0,0 +1,158 @@
+import asyncio
+import heapq
+import itertools
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from backend.config import get_settings
+
+
+settings = get_settings()
+
+# Cheap keyword pre-estimate of urgency used to order queued Gemini calls
+_URGENCY_HINTS: List[Tuple[re.Pattern, int]] = [
+    (re.compile(r"\b(urgent|asap|immediately|emergency|critical)\b", re.IGNORECASE), 40),
+    (re.compile(r"\b(outage|down|breach|hacked|fraud|security)\b", re.IGNORECASE), 30),
+    (re.compile(r"\b(charged twice|double charged|overcharged|production)\b", re.IGNORECASE), 20),
+    (re.compile(r"\b(cannot|can't|unable|locked out|not working|error)\b", re.IGNORECASE), 10),
+]
+
+
+def urgency_hint(*texts: str) -> int:
+    """Score 0-100; higher is served first when Gemini calls queue up."""
+    combined = " ".join(texts)
+    return min(100, sum(weight for pattern, weight in _URGENCY_HINTS if pattern.search(combined)))
+
+
+class GeminiOverloaded(Exception):
+    """The call could not start before its deadline."""
+
+
+class GeminiExecutor:
+    """
+    Runs blocking Gemini calls on a dedicated thread pool.
+
+    - At most ``max_concurrency`` calls are outstanding.
+    - A token bucket (``requests_per_minute``, ``burst``) keeps us inside the quota.
+    - Waiting calls are served highest priority first (FIFO within a priority).
+    - Admission control raises GeminiOverloaded right away when the estimated
+      queue wait already exceeds the caller's deadline, and drops queued calls
+      whose deadline passes before they start.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        requests_per_minute: float,
+        burst: int,
+        expected_latency: float,
+    ) -> None:
+        self._max_concurrency = max(1, max_concurrency)
+        self._rate = requests_per_minute / 60.0 if requests_per_minute > 0 else 0.0
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._refilled_at = time.monotonic()
+        self._latency = max(0.001, expected_latency)
+
+        self._threads = ThreadPoolExecutor(
+            max_workers=self._max_concurrency, thread_name_prefix="gemini"
+        )
+        self._running = 0
+        self._queue: List[Tuple[int, int, float, asyncio.Future, Callable, tuple]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, priority: int = 0, deadline: float) -> Any:
+        """Run ``fn(*args)`` in the Gemini pool; ``deadline`` is a ``time.monotonic()`` value."""
+        now = time.monotonic()
+        wait = self.estimate_wait(priority, now)
+        if now + wait > deadline:
+            raise GeminiOverloaded(f"estimated queue wait {wait:.1f}s exceeds deadline")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (-priority, next(self._sequence), deadline, future, fn, args))
+        self._dispatch()
+        return await future
+
+    def estimate_wait(self, priority: int, now: float) -> float:
+        ahead = sum(1 for item in self._queue if -item[0] >= priority)
+        free = self._max_concurrency - self._running
+        slot_wait = 0.0
+        if ahead >= free:
+            rounds = (ahead - free) // self._max_concurrency + 1
+            slot_wait = rounds * self._latency
+        token_wait = 0.0
+        if self._rate:
+            self._refill(now)
+            missing = ahead + 1 - self._tokens
+            if missing > 0:
+                token_wait = missing / self._rate
+        return max(slot_wait, token_wait)
+
+    def shutdown(self) -> None:
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._burst, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._queue and self._running < self._max_concurrency:
+            now = time.monotonic()
+            if self._rate:
+                self._refill(now)
+                if self._tokens < 1:
+                    if self._wakeup is None:
+                        delay = (1 - self._tokens) / self._rate
+                        self._wakeup = loop.call_later(delay, self._on_wakeup)
+                    return
+
+            _, _, deadline, future, fn, args = heapq.heappop(self._queue)
+            if future.done():
+                # Caller timed out or was cancelled while queued
+                continue
+            if now > deadline:
+                future.set_exception(GeminiOverloaded("deadline passed while queued"))
+                continue
+
+            if self._rate:
+                self._tokens -= 1
+            self._running += 1
+            started = now
+            call = loop.run_in_executor(self._threads, fn, *args)
+            call.add_done_callback(
+                lambda done, future=future, started=started: self._on_done(done, future, started)
+            )
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._dispatch()
+
+    def _on_done(self, call: asyncio.Future, future: asyncio.Future, started: float) -> None:
+        self._running -= 1
+        # Exponentially weighted service time feeds the admission estimate
+        self._latency = 0.8 * self._latency + 0.2 * (time.monotonic() - started)
+        if not future.done():
+            if call.cancelled():
+                future.cancel()
+            elif call.exception() is not None:
+                future.set_exception(call.exception())
+            else:
+                future.set_result(call.result())
+        self._dispatch()
+
+
+gemini_executor = GeminiExecutor(
+    max_concurrency=settings.gemini_max_concurrency,
+    requests_per_minute=settings.gemini_requests_per_minute,
+    burst=settings.gemini_burst,
+    expected_latency=settings.gemini_expected_latency_seconds,
+)
@@ -1,24 +1,38 @@
 import asyncio
 import json
 import logging
-from typing import Optional, Tuple
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import google.generativeai as genai
 
 from backend.config import get_settings
 from backend.models.schemas import GeminiResult, TicketCreate
+from backend.services.gemini_executor import GeminiOverloaded, gemini_executor, urgency_hint
+from backend.utils.metrics import GEMINI_ATTEMPT_DURATION, GEMINI_ATTEMPTS
 
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-genai.configure(api_key=settings.gemini_api_key)
 
-_model = genai.GenerativeModel(settings.gemini_model)
+class TokenUsage(NamedTuple):
+    """Token counts from Gemini's ``usage_metadata``, summed over the calls made for one ticket."""
 
+    prompt_tokens: int
+    output_tokens: int
+    total_tokens: int
 
-SYSTEM_PROMPT = """
+
+# (GeminiResult, raw_json, error_message, token usage or None when no call was made)
+GeminiOutcome = Tuple[GeminiResult, Optional[str], Optional[str], Optional[TokenUsage]]
+
+_ROLE = """
 You are an AI assistant helping a customer support workflow automation system.
+"""
+
+_OUTPUT_FORMAT = """
 You MUST respond ONLY with a single JSON object and NOTHING else.
 Do not include markdown, code fences, commentary, or explanations.
 
@@ -31,7 +45,9 @@ The expected JSON schema is:
   "draft_reply": "string",
   "reasoning_summary": "string"
 }
+"""
 
+_RULES = """
 Rules:
 - Always choose one of the allowed enum values for category and urgency.
 - priority_score: higher means more urgent/important.
@@ -44,78 +60,267 @@ Draft reply style rules:
 - Always sign off as "Sufiyan Ali" in the closing of the draft reply.
 """
 
+# Sent with every request when structured output is off
+SYSTEM_PROMPT = _ROLE + _OUTPUT_FORMAT.lstrip("\n") + _RULES
+
+# Structured output: set once as the model's system instruction; the response
+# schema below replaces the prose JSON format
+SYSTEM_INSTRUCTION = _ROLE + _RULES
+
+_RESULT_PROPERTIES: Dict[str, Any] = {
+    "category": {"type": "string", "enum": ["billing", "technical", "account", "general"]},
+    "urgency": {"type": "string", "enum": ["low", "medium", "high"]},
+    "priority_score": {"type": "integer"},
+    "confidence_score": {"type": "number"},
+    "draft_reply": {"type": "string"},
+    "reasoning_summary": {"type": "string"},
+}
+
+RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": _RESULT_PROPERTIES,
+    "required": list(_RESULT_PROPERTIES),
+}
+
+BATCH_RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": dict(_RESULT_PROPERTIES, index={"type": "integer"}),
+        "required": ["index", *_RESULT_PROPERTIES],
+    },
+}
+
 
 def _build_ticket_prompt(ticket: TicketCreate) -> str:
-    return (
-        f"{SYSTEM_PROMPT.strip()}\n\n"
+    ticket_text = (
         "Now analyze the following support ticket:\n"
         f"Name: {ticket.name}\n"
         f"Email: {ticket.email}\n"
         f"Subject: {ticket.subject}\n"
         f"Message: {ticket.message}\n"
     )
+    if settings.gemini_structured_output:
+        return ticket_text
+    return f"{SYSTEM_PROMPT.strip()}\n\n{ticket_text}"
+
+
+BATCH_INSTRUCTIONS = """
+You will receive several support tickets, each introduced by "Ticket <index>".
+Respond ONLY with a JSON array containing exactly one object per ticket.
+Each object MUST include an "index" field with the ticket's index, plus every field
+of the expected schema, and must be based only on that ticket.
+"""
+
+
+def _build_batch_prompt(tickets: List[TicketCreate]) -> str:
+    parts = [BATCH_INSTRUCTIONS.strip(), ""]
+    if not settings.gemini_structured_output:
+        parts.insert(0, SYSTEM_PROMPT.strip())
+    for index, ticket in enumerate(tickets):
+        parts.append(
+            f"Ticket {index}:\n"
+            f"Name: {ticket.name}\n"
+            f"Email: {ticket.email}\n"
+            f"Subject: {ticket.subject}\n"
+            f"Message: {ticket.message}\n"
+        )
+    return "\n".join(parts)
+
+
+if settings.gemini_provider == "fake":
+    from backend.services.fake_gemini import FakeGenerativeModel
+
+    _model = FakeGenerativeModel(
+        latency_median_ms=settings.fake_gemini_latency_median_ms,
+        latency_sigma=settings.fake_gemini_latency_sigma,
+        error_rate=settings.fake_gemini_error_rate,
+        quota_error_rate=settings.fake_gemini_quota_error_rate,
+        malformed_json_rate=settings.fake_gemini_malformed_json_rate,
+        seed=settings.fake_gemini_seed,
+        system_instruction=SYSTEM_INSTRUCTION if settings.gemini_structured_output else None,
+    )
+else:
+    genai.configure(api_key=settings.gemini_api_key)
+
+    _model = genai.GenerativeModel(
+        settings.gemini_model,
+        system_instruction=SYSTEM_INSTRUCTION if settings.gemini_structured_output else None,
+    )
+
+
+def _result_from_data(data: Dict[str, Any]) -> GeminiResult:
+    return GeminiResult(
+        category=data.get("category"),
+        urgency=data.get("urgency"),
+        priority_score=data.get("priority_score"),
+        confidence_score=data.get("confidence_score"),
+        draft_reply=data.get("draft_reply"),
+        reasoning_summary=data.get("reasoning_summary"),
+    )
+
+
+def _usage(response: Any) -> Optional[TokenUsage]:
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is None:
+        return None
+    return TokenUsage(
+        prompt_tokens=metadata.prompt_token_count or 0,
+        output_tokens=metadata.candidates_token_count or 0,
+        total_tokens=metadata.total_token_count or 0,
+    )
+
+
+def add_usage(a: Optional[TokenUsage], b: Optional[TokenUsage]) -> Optional[TokenUsage]:
+    if a is None or b is None:
+        return a or b
+    return TokenUsage(*(x + y for x, y in zip(a, b)))
+
+
+def _split_usage(usage: Optional[TokenUsage], parts: int) -> List[Optional[TokenUsage]]:
+    """Even shares of a multi-ticket call; the remainder goes to the first shares so totals add up."""
+    if usage is None or parts <= 0:
+        return [None] * parts
+    shares = [[value // parts + (1 if i < value % parts else 0) for value in usage] for i in range(parts)]
+    return [TokenUsage(*share) for share in shares]
+
 
+def _record_attempt(kind: str, outcome: str, started: float) -> None:
+    GEMINI_ATTEMPTS.inc(kind, outcome)
+    GEMINI_ATTEMPT_DURATION.observe(time.perf_counter() - started, kind, outcome)
 
-def _call_gemini_sync(prompt: str) -> str:
+
+def _is_quota_error(exc: Exception) -> bool:
+    msg = str(exc).lower()
+    return "429" in msg or "quota" in msg or "rate" in msg
+
+
+def _generation_config(response_schema: Dict[str, Any]) -> Dict[str, Any]:
+    config: Dict[str, Any] = {
+        "temperature": 0.3,
+        "response_mime_type": "application/json",
+    }
+    if settings.gemini_structured_output:
+        config["response_schema"] = response_schema
+    return config
+
+
+def _call_gemini_sync(
+    prompt: str, response_schema: Dict[str, Any] = RESPONSE_SCHEMA
+) -> Tuple[str, Optional[TokenUsage]]:
+    response = _model.generate_content(prompt, generation_config=_generation_config(response_schema))
+    # google-generativeai returns a `GenerativeModel.Response` with `.text`
+    return response.text, _usage(response)
+
+
+def _stream_gemini_sync(
+    prompt: str, on_text: Callable[[str], None], cancelled: threading.Event
+) -> Tuple[str, Optional[TokenUsage]]:
+    """
+    Streaming variant of ``_call_gemini_sync``: hands each chunk to ``on_text`` as it
+    arrives. Stops reading the stream once ``cancelled`` is set.
+    """
     response = _model.generate_content(
         prompt,
-        generation_config={
-            "temperature": 0.3,
-            "response_mime_type": "application/json",
-        },
+        generation_config=_generation_config(RESPONSE_SCHEMA),
+        stream=True,
     )
-    # google-generativeai returns a `GenerativeModel.Response` with `.text`
-    return response.text
+    parts: List[str] = []
+    usage: Optional[TokenUsage] = None
+    for chunk in response:
+        if cancelled.is_set():
+            break
+        text = chunk.text
+        if text:
+            parts.append(text)
+            on_text(text)
+        # Counts are cumulative; the last chunk has the totals
+        usage = _usage(chunk) or usage
+    return "".join(parts), usage
 
 
-async def call_gemini(ticket: TicketCreate) -> Tuple[GeminiResult, Optional[str], Optional[str]]:
+async def _run_prompt(
+    prompt: str,
+    *,
+    priority: int,
+    deadline: float,
+    response_schema: Dict[str, Any] = RESPONSE_SCHEMA,
+) -> Tuple[str, Optional[TokenUsage]]:
+    """Run one prompt on the Gemini executor, bounded by the 20s attempt timeout."""
+    timeout = 20.0
+    attempt_deadline = min(deadline, time.monotonic() + timeout)
+    return await asyncio.wait_for(
+        gemini_executor.run(
+            _call_gemini_sync, prompt, response_schema, priority=priority, deadline=attempt_deadline
+        ),
+        timeout=timeout,
+    )
+
+
+async def call_gemini(ticket: TicketCreate, deadline: Optional[float] = None) -> GeminiOutcome:
     """
-    Call Gemini and return (GeminiResult, raw_json, error_message).
+    Call Gemini and return (GeminiResult, raw_json, error_message, token usage).
     If an error occurs or JSON is invalid twice, returns a fallback GeminiResult and error_message.
+    Token usage covers every attempt that got a response, including invalid JSON.
+    ``deadline`` (time.monotonic()) bounds queueing; when the Gemini queue cannot start
+    the call in time the fallback is returned immediately.
     """
     prompt = _build_ticket_prompt(ticket)
+    priority = urgency_hint(ticket.subject, ticket.message)
+    if deadline is None:
+        deadline = time.monotonic() + settings.gemini_request_deadline_seconds
 
-    async def _attempt() -> str:
-        return await asyncio.to_thread(_call_gemini_sync, prompt)
+    async def _attempt() -> Tuple[str, Optional[TokenUsage]]:
+        return await _run_prompt(prompt, priority=priority, deadline=deadline)
 
     last_error: Optional[str] = None
     raw_json: Optional[str] = None
+    usage: Optional[TokenUsage] = None
 
     for attempt in range(2):
+        started = time.perf_counter()
+        outcome = "error"
         try:
-            raw_json = await asyncio.wait_for(_attempt(), timeout=20.0)
+            raw_json, attempt_usage = await _attempt()
+            usage = add_usage(usage, attempt_usage)
             data = json.loads(raw_json)
 
-            result = GeminiResult(
-                category=data.get("category"),
-                urgency=data.get("urgency"),
-                priority_score=data.get("priority_score"),
-                confidence_score=data.get("confidence_score"),
-                draft_reply=data.get("draft_reply"),
-                reasoning_summary=data.get("reasoning_summary"),
-            )
-            return result, raw_json, None
+            result = _result_from_data(data)
+            outcome = "ok"
+            return result, raw_json, None, usage
+        except GeminiOverloaded as exc:
+            outcome = "overloaded"
+            last_error = "Gemini queue saturated"
+            logger.warning("Gemini call rejected on attempt %s: %s", attempt + 1, exc)
+            break
         except asyncio.TimeoutError:
+            outcome = "timeout"
             last_error = "Gemini timeout"
             logger.exception("Gemini timeout on attempt %s", attempt + 1)
         except json.JSONDecodeError:
+            outcome = "invalid_json"
             last_error = "Invalid JSON from Gemini"
             logger.exception("Invalid JSON from Gemini on attempt %s", attempt + 1)
         except Exception as exc:  # noqa: BLE001
-            msg = str(exc).lower()
-            if "429" in msg or "quota" in msg or "rate" in msg:
+            if _is_quota_error(exc):
+                outcome = "quota"
                 last_error = "Gemini quota or rate limit error"
             else:
                 last_error = "Gemini API error"
             logger.exception("Gemini error on attempt %s: %s", attempt + 1, exc)
             break
+        finally:
+            _record_attempt("single", outcome, started)
+
+    return fallback_result(), raw_json, last_error, usage
+
 
-    # Fallback
+def fallback_result() -> GeminiResult:
     fallback_reply = (
         "We are unable to auto-process this ticket at the moment. "
         "It has been forwarded to human support."
     )
-    fallback = GeminiResult(
+    return GeminiResult(
         category=None,
         urgency=None,
         priority_score=None,
@@ -123,5 +328,133 @@ async def call_gemini(ticket: TicketCreate) -> Tuple[GeminiResult, Optional[str]
         draft_reply=fallback_reply,
         reasoning_summary="Fallback response due to Gemini error or invalid output.",
     )
-    return fallback, raw_json, last_error
 
+
+async def call_gemini_stream(
+    ticket: TicketCreate, on_text: Callable[[str], None], deadline: Optional[float] = None
+) -> GeminiOutcome:
+    """
+    Like ``call_gemini``, but requests a streamed response and passes each raw JSON
+    chunk to ``on_text`` (on the event loop) as soon as it arrives.
+    A failed stream is retried through ``call_gemini``, so chunks already passed
+    on may be superseded by the returned result.
+    """
+    prompt = _build_ticket_prompt(ticket)
+    priority = urgency_hint(ticket.subject, ticket.message)
+    if deadline is None:
+        deadline = time.monotonic() + settings.gemini_request_deadline_seconds
+    loop = asyncio.get_running_loop()
+    # Set once the stream is abandoned: late chunks must not reach on_text
+    cancelled = threading.Event()
+
+    def deliver(text: str) -> None:
+        if not cancelled.is_set():
+            on_text(text)
+
+    def forward(text: str) -> None:
+        if not cancelled.is_set():
+            loop.call_soon_threadsafe(deliver, text)
+
+    timeout = 20.0
+    stream_usage: Optional[TokenUsage] = None
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        raw_json, stream_usage = await asyncio.wait_for(
+            gemini_executor.run(
+                _stream_gemini_sync,
+                prompt,
+                forward,
+                cancelled,
+                priority=priority,
+                deadline=min(deadline, time.monotonic() + timeout),
+            ),
+            timeout=timeout,
+        )
+        result = _result_from_data(json.loads(raw_json))
+        outcome = "ok"
+        return result, raw_json, None, stream_usage
+    except GeminiOverloaded as exc:
+        outcome = "overloaded"
+        logger.warning("Gemini streaming call rejected: %s", exc)
+        return fallback_result(), None, "Gemini queue saturated", None
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        logger.warning("Gemini streaming call timed out; retrying without streaming")
+    except json.JSONDecodeError:
+        outcome = "invalid_json"
+        logger.warning("Invalid JSON from Gemini stream; retrying without streaming")
+    except Exception as exc:  # noqa: BLE001
+        outcome = "quota" if _is_quota_error(exc) else "error"
+        logger.warning("Gemini streaming call failed (%s); retrying without streaming", exc)
+    finally:
+        # Chunks delivered before the result have already run; anything later is stale
+        cancelled.set()
+        _record_attempt("stream", outcome, started)
+    result, raw_json, error, usage = await call_gemini(ticket, deadline)
+    return result, raw_json, error, add_usage(stream_usage, usage)
+
+
+
+async def call_gemini_batch(tickets: List[TicketCreate]) -> List[Optional[GeminiOutcome]]:
+    """
+    Classify several tickets with one Gemini request.
+    Returns one entry per ticket (same order); None marks items the batch response
+    did not answer validly, which callers should retry with call_gemini.
+    The request's token usage is split evenly across the answered tickets.
+    """
+    prompt = _build_batch_prompt(tickets)
+    outcomes: List[Optional[GeminiOutcome]] = [None] * len(tickets)
+    priority = max(urgency_hint(t.subject, t.message) for t in tickets)
+    deadline = time.monotonic() + settings.gemini_request_deadline_seconds
+
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        raw_json, usage = await _run_prompt(
+            prompt, priority=priority, deadline=deadline, response_schema=BATCH_RESPONSE_SCHEMA
+        )
+        items = json.loads(raw_json)
+        outcome = "ok"
+    except GeminiOverloaded as exc:
+        outcome = "overloaded"
+        logger.warning("Gemini batch rejected (%s tickets): %s", len(tickets), exc)
+        return outcomes
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        logger.exception("Gemini batch timeout (%s tickets)", len(tickets))
+        return outcomes
+    except json.JSONDecodeError:
+        outcome = "invalid_json"
+        logger.exception("Invalid JSON from Gemini batch (%s tickets)", len(tickets))
+        return outcomes
+    except Exception as exc:  # noqa: BLE001
+        outcome = "quota" if _is_quota_error(exc) else "error"
+        logger.exception("Gemini batch error (%s tickets): %s", len(tickets), exc)
+        return outcomes
+    finally:
+        _record_attempt("batch", outcome, started)
+
+    if not isinstance(items, list):
+        logger.warning("Gemini batch response is not a JSON array")
+        return outcomes
+
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index = item.get("index")
+        if not isinstance(index, int) or not 0 <= index < len(tickets) or outcomes[index] is not None:
+            continue
+        data = {k: v for k, v in item.items() if k != "index"}
+        try:
+            result = _result_from_data(data)
+        except ValueError:
+            logger.warning("Invalid Gemini batch item for index %s", index)
+            continue
+        outcomes[index] = (result, json.dumps(data), None, None)
+
+    answered = [i for i, outcome in enumerate(outcomes) if outcome is not None]
+    for index, share in zip(answered, _split_usage(usage, len(answered))):
+        result, raw_item, _, _ = outcomes[index]
+        outcomes[index] = (result, raw_item, None, share)
+    return outcomes
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Pattern, Tuple, Union
+
+from backend.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "guardrail_rules.json")
+
+_FlagSpec = Union[str, List[str]]
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton mapping (lower-case) phrases to guardrail flags."""
+
+    def __init__(self, phrases: Dict[str, Iterable[str]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        outputs: List[set] = [set()]
+
+        for phrase, flags in phrases.items():
+            node = 0
+            for ch in phrase:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                node = nxt
+            outputs[node].update(flags)
+
+        # Breadth-first fail links; each node also inherits its fail node's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                outputs[child] |= outputs[self._fail[child]]
+
+        self._outputs: List[FrozenSet[str]] = [frozenset(out) for out in outputs]
+        self.all_flags: FrozenSet[str] = frozenset().union(*self._outputs)
+
+    def search(self, text: str) -> set:
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found: set = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if outputs[node]:
+                found |= outputs[node]
+                if len(found) == len(self.all_flags):
+                    break
+        return found
+
+
+class CompiledRules:
+    """
+    Phrases in one automaton (matched on the lower-cased text) plus each regex
+    pattern compiled on its own, case-insensitively, and searched once.
+    """
+
+    def __init__(self, phrases: Dict[str, _FlagSpec], patterns: Dict[str, _FlagSpec]) -> None:
+        self.automaton = PhraseAutomaton(
+            {phrase.lower(): _as_list(flags) for phrase, flags in phrases.items()}
+        )
+        self._patterns: List[Tuple[Pattern[str], FrozenSet[str]]] = [
+            (re.compile(pattern, re.IGNORECASE), frozenset(_as_list(flags))) for pattern, flags in patterns.items()
+        ]
+
+    def scan(self, text: str) -> List[str]:
+        flags = self.automaton.search(text.lower())
+        for pattern, pattern_flags in self._patterns:
+            # A pattern only adds flags that are not set yet
+            if not pattern_flags <= flags and pattern.search(text):
+                flags |= pattern_flags
+        return sorted(flags)
+
+
+def _as_list(flags: _FlagSpec) -> List[str]:
+    return [flags] if isinstance(flags, str) else list(flags)
+
+
+def compile_rules_file(path: str) -> CompiledRules:
+    with open(path, encoding="utf-8") as fh:
+        rules = json.load(fh)
+    return CompiledRules(rules.get("phrases", {}), rules.get("patterns", {}))
+
+
+class GuardrailEngine:
+    """
+    Guardrail rules compiled from a JSON file that maps each phrase / regex to its flag.
+    The file's mtime is checked at most every ``reload_interval`` seconds; changes are
+    recompiled on a background thread while the previous rules keep serving, and a
+    broken file keeps the previous rules in place.
+    """
+
+    def __init__(self, path: str, *, reload_interval: float) -> None:
+        self._path = path
+        self._reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._checked_at = time.monotonic()
+        self._mtime = os.stat(path).st_mtime
+        self._rules = compile_rules_file(path)
+
+    def reload(self) -> bool:
+        """Recompile if the rules file changed; returns True when new rules were loaded."""
+        try:
+            mtime = os.stat(self._path).st_mtime
+        except OSError:
+            logger.exception("Guardrail rules file %s is not readable; keeping previous rules", self._path)
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            rules = compile_rules_file(self._path)
+        except (OSError, ValueError, re.error):
+            # Remember the broken version so it is not retried until the file changes again
+            self._mtime = mtime
+            logger.exception("Failed to reload guardrail rules from %s; keeping previous rules", self._path)
+            return False
+        self._rules, self._mtime = rules, mtime
+        logger.info("Reloaded guardrail rules from %s", self._path)
+        return True
+
+    @property
+    def rules(self) -> CompiledRules:
+        if self._reload_interval >= 0 and time.monotonic() - self._checked_at >= self._reload_interval:
+            self._check_for_changes()
+        return self._rules
+
+    def scan(self, draft: str) -> List[str]:
+        return self.rules.scan(draft)
+
+    def scan_many(self, drafts: Iterable[str]) -> List[List[str]]:
+        rules = self.rules
+        return [rules.scan(draft) for draft in drafts]
+
+    def _check_for_changes(self) -> None:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if self._reloading:
+                return
+            try:
+                changed = os.stat(self._path).st_mtime != self._mtime
+            except OSError:
+                return
+            if not changed:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload_in_background, name="guardrail-reload", daemon=True).start()
+
+    def _reload_in_background(self) -> None:
+        try:
+            self.reload()
+        finally:
+            self._reloading = False
+
+
+guardrail_engine = GuardrailEngine(
+    settings.guardrail_rules_path or DEFAULT_RULES_PATH,
+    reload_interval=settings.guardrail_reload_interval_seconds,
+)
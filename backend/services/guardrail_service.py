@@ -1,68 +1,72 @@
-import re
-from typing import List
+from typing import Iterable, List, Optional, Sequence, Tuple
 
 from backend.models.schemas import GeminiResult, GuardrailResult
+from backend.services.guardrail_engine import guardrail_engine
 
 
-HIGH_RISK_PHRASES = [
-    "money-back guarantee",
-    "full refund",
-    "we guarantee a refund",
-    "we will refund",
-    "legal advice",
-    "this is legal advice",
-    "we are not liable",
-    "we are not responsible",
-    "compliant with all regulations",
-    "fully compliant",
-    "pci compliant",
-    "hipaa compliant",
-    "gdpr compliant",
-    "policy",
-    "terms and conditions",
-]
+STATUS_NEEDS_REVIEW = "Needs Human Review"
+STATUS_AUTO_RESOLVED = "Auto-Resolved"
+
+ROUTE_HUMAN_REVIEW = "Human Review"
+ROUTE_AUTO_RESOLVE = "Auto-Resolve"
+
+LOW_CONFIDENCE_THRESHOLD = 0.65
+
+# (confidence_score, urgency, draft_reply) of a stored ticket
+StoredAnalysis = Tuple[Optional[float], Optional[str], Optional[str]]
+# (guardrail_flags as stored, status, routing_decision)
+StoredVerdict = Tuple[str, str, str]
 
 
 def scan_draft_for_risks(draft: str) -> List[str]:
-    flags: List[str] = []
-    text = draft.lower()
-
-    for phrase in HIGH_RISK_PHRASES:
-        if phrase in text:
-            if "refund" in phrase:
-                flags.append("refund_or_financial_commitment")
-            elif "legal" in phrase:
-                flags.append("legal_advice_or_liability")
-            elif "compliant" in phrase:
-                flags.append("compliance_claim")
-            elif "policy" in phrase or "terms" in phrase:
-                flags.append("fabricated_or_risky_policy")
-
-    # Simple financial commitment pattern
-    if re.search(r"\b(refund|reimburse|compensate|credit)\b", text):
-        if "refund_or_financial_commitment" not in flags:
-            flags.append("refund_or_financial_commitment")
+    """Flags for risky phrases/patterns from the rules file (see guardrail_rules.json)."""
+    return guardrail_engine.scan(draft)
 
-    return list(sorted(set(flags)))
 
+def scan_drafts_for_risks(drafts: Iterable[str]) -> List[List[str]]:
+    return guardrail_engine.scan_many(drafts)
 
-def apply_guardrails(result: GeminiResult) -> GuardrailResult:
+
+def guardrail_flags(
+    confidence_score: Optional[float], urgency: Optional[str], draft_reply: Optional[str]
+) -> List[str]:
     flags: List[str] = []
 
-    if result.confidence_score is not None and result.confidence_score < 0.65:
+    if confidence_score is not None and confidence_score < LOW_CONFIDENCE_THRESHOLD:
         flags.append("low_confidence")
 
-    urgency = (result.urgency or "").lower()
-    if urgency == "high":
+    if (urgency or "").lower() == "high":
         flags.append("high_urgency")
 
-    if result.draft_reply:
-        flags.extend(scan_draft_for_risks(result.draft_reply))
+    if draft_reply:
+        flags.extend(scan_draft_for_risks(draft_reply))
 
-    flags = list(sorted(set(flags)))
+    return list(sorted(set(flags)))
+
+
+def apply_guardrails(result: GeminiResult) -> GuardrailResult:
+    flags = guardrail_flags(result.confidence_score, result.urgency, result.draft_reply)
 
     needs_human_review = len(flags) > 0
-    status = "Needs Human Review" if needs_human_review else "Auto-Resolved"
+    status = STATUS_NEEDS_REVIEW if needs_human_review else STATUS_AUTO_RESOLVED
 
     return GuardrailResult(flags=flags, status=status, needs_human_review=needs_human_review)
 
+
+def routing_for(guardrail: GuardrailResult) -> str:
+    return ROUTE_HUMAN_REVIEW if guardrail.needs_human_review else ROUTE_AUTO_RESOLVE
+
+
+def evaluate_stored(analyses: Sequence[StoredAnalysis]) -> List[StoredVerdict]:
+    """
+    Guardrails and routing under the current rules for stored tickets' analyses,
+    without calling Gemini. Runs in the re-evaluation job's worker processes.
+    """
+    verdicts: List[StoredVerdict] = []
+    for confidence_score, urgency, draft_reply in analyses:
+        flags = guardrail_flags(confidence_score, urgency, draft_reply)
+        if flags:
+            verdicts.append((",".join(flags), STATUS_NEEDS_REVIEW, ROUTE_HUMAN_REVIEW))
+        else:
+            verdicts.append(("", STATUS_AUTO_RESOLVED, ROUTE_AUTO_RESOLVE))
+    return verdicts
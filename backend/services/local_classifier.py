@@ -0,0 +1,440 @@
+"""
+Local first-tier classifier: routine tickets (password resets, invoice copies, ...)
+are answered from a reply template without a Gemini call.
+
+Two softmax regressions, for category and urgency, over hashed word unigrams and
+bigrams of the subject and message. They are trained offline on the tickets Gemini
+has labelled (``python -m backend.cli train-classifier``) and loaded at startup.
+A ticket is handled locally only when both predictions reach
+``LOCAL_CLASSIFIER_MIN_CONFIDENCE`` and a template in ``reply_templates.json``
+matches the predicted category and urgency and one of its keywords; everything
+else goes to Gemini as before. Local results still go through the guardrails.
+"""
+import json
+import logging
+import os
+import re
+import zlib
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.config import get_settings
+from backend.models.schemas import GeminiResult, TicketCreate
+from backend.services.gemini_service import GeminiOutcome
+from backend.utils.metrics import LOCAL_CLASSIFIER_DECISIONS
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DEFAULT_TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), "reply_templates.json")
+
+MODEL_VERSION = 1
+# Hashed feature space; index 0 is a constant bias feature
+N_FEATURES = 1 << 16
+HEADS = ("category", "urgency")
+
+_DIGITS = re.compile(r"\d+")
+_WORD = re.compile(r"[a-z0]+(?:'[a-z]+)?")
+
+# (indices, values) of one ticket's feature vector
+SparseRow = Tuple[np.ndarray, np.ndarray]
+
+
+class TrainingExample(NamedTuple):
+    ticket_id: int
+    subject: str
+    message: str
+    category: str
+    urgency: str
+    priority_score: Optional[int]
+
+
+def tokens(subject: str, message: str) -> List[str]:
+    """Lower-cased words (digits folded to 0) and word bigrams."""
+    words = _WORD.findall(_DIGITS.sub("0", f"{subject}\n{message}".lower()))
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def featurize(subject: str, message: str) -> SparseRow:
+    """Hashed, L2-normalised term counts plus the bias feature."""
+    terms = tokens(subject, message)
+    hashed = np.fromiter(
+        (zlib.crc32(term.encode("utf-8")) % (N_FEATURES - 1) + 1 for term in terms), dtype=np.int64, count=len(terms)
+    )
+    indices, counts = np.unique(hashed, return_counts=True)
+    values = counts.astype(np.float64)
+    if len(values):
+        values /= np.linalg.norm(values)
+    return np.concatenate(([0], indices)), np.concatenate(([1.0], values))
+
+
+def _pack(rows: Sequence[SparseRow]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR-style (indptr, indices, values) of several rows."""
+    lengths = np.fromiter((len(indices) for indices, _ in rows), dtype=np.int64, count=len(rows))
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    return indptr, np.concatenate([r[0] for r in rows]), np.concatenate([r[1] for r in rows])
+
+
+def _probabilities(weights: np.ndarray, indptr: np.ndarray, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """(classes, rows) softmax probabilities. Every row has the bias feature, so none is empty."""
+    scores = np.add.reduceat(weights[:, indices] * values, indptr[:-1], axis=1)
+    scores -= scores.max(axis=0)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=0)
+    return scores
+
+
+def _fit_head(
+    rows: Sequence[SparseRow],
+    labels: np.ndarray,
+    n_classes: int,
+    *,
+    epochs: int,
+    learning_rate: float,
+    l2: float,
+    batch_size: int,
+    seed: int,
+) -> np.ndarray:
+    """Mini-batch AdaGrad on the L2-regularised softmax cross-entropy."""
+    weights = np.zeros((n_classes, N_FEATURES))
+    squared_gradients = np.full_like(weights, 1e-8)
+    rng = np.random.default_rng(seed)
+    n = len(rows)
+    for _ in range(epochs):
+        for batch in np.array_split(rng.permutation(n), max(1, n // batch_size)):
+            indptr, indices, values = _pack([rows[i] for i in batch])
+            errors = _probabilities(weights, indptr, indices, values)
+            errors[labels[batch], np.arange(len(batch))] -= 1.0
+            row_of = np.repeat(np.arange(len(batch)), np.diff(indptr))
+            gradient = np.empty_like(weights)
+            for c in range(n_classes):
+                gradient[c] = np.bincount(indices, weights=errors[c, row_of] * values, minlength=N_FEATURES)
+            gradient /= len(batch)
+            gradient += l2 * weights
+            squared_gradients += gradient * gradient
+            weights -= learning_rate * gradient / np.sqrt(squared_gradients)
+    return weights
+
+
+class LocalModel:
+    """Trained weights per head, the class names and the mean Gemini priority per (category, urgency)."""
+
+    def __init__(
+        self,
+        classes: Dict[str, List[str]],
+        weights: Dict[str, np.ndarray],
+        priorities: Dict[str, int],
+        meta: Dict[str, object],
+    ) -> None:
+        self.classes = classes
+        self.weights = weights
+        self.priorities = priorities
+        self.meta = meta
+
+    def predict(self, subject: str, message: str) -> Dict[str, Tuple[str, float]]:
+        """(label, probability) per head for one ticket."""
+        indices, values = featurize(subject, message)
+        predictions = {}
+        for head in HEADS:
+            scores = self.weights[head][:, indices] @ values
+            probs = np.exp(scores - scores.max())
+            probs /= probs.sum()
+            best = int(probs.argmax())
+            predictions[head] = (self.classes[head][best], float(probs[best]))
+        return predictions
+
+    def predict_many(self, rows: Sequence[SparseRow]) -> Dict[str, Tuple[List[str], np.ndarray]]:
+        """(labels, probabilities) per head for many featurized tickets."""
+        packed = _pack(rows)
+        predictions = {}
+        for head in HEADS:
+            probs = _probabilities(self.weights[head], *packed)
+            best = probs.argmax(axis=0)
+            predictions[head] = ([self.classes[head][i] for i in best], probs[best, np.arange(len(rows))])
+        return predictions
+
+    def priority_for(self, category: str, urgency: str) -> Optional[int]:
+        return self.priorities.get(f"{category}/{urgency}", self.priorities.get("*"))
+
+    def save(self, path: str) -> None:
+        meta = dict(
+            self.meta, version=MODEL_VERSION, n_features=N_FEATURES, classes=self.classes, priorities=self.priorities
+        )
+        arrays = {"meta": np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)}
+        for head in HEADS:
+            arrays[f"weights_{head}"] = self.weights[head].astype(np.float32)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as fh:
+            np.savez_compressed(fh, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalModel":
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            if meta.get("version") != MODEL_VERSION or meta.get("n_features") != N_FEATURES:
+                raise ValueError(f"{path} was trained with an incompatible version; retrain the classifier")
+            weights = {head: data[f"weights_{head}"].astype(np.float64) for head in HEADS}
+        classes = meta.pop("classes")
+        priorities = meta.pop("priorities")
+        return cls(classes, weights, priorities, meta)
+
+
+def train(
+    examples: Sequence[TrainingExample],
+    *,
+    epochs: int = 15,
+    learning_rate: float = 0.5,
+    l2: float = 1e-5,
+    batch_size: int = 256,
+    seed: int = 1,
+) -> LocalModel:
+    rows = [featurize(example.subject, example.message) for example in examples]
+    classes: Dict[str, List[str]] = {}
+    weights: Dict[str, np.ndarray] = {}
+    for head in HEADS:
+        values = [getattr(example, head) for example in examples]
+        classes[head] = sorted(set(values))
+        position = {label: i for i, label in enumerate(classes[head])}
+        labels = np.fromiter((position[value] for value in values), dtype=np.int64, count=len(values))
+        weights[head] = _fit_head(
+            rows,
+            labels,
+            len(classes[head]),
+            epochs=epochs,
+            learning_rate=learning_rate,
+            l2=l2,
+            batch_size=batch_size,
+            seed=seed,
+        )
+
+    scored: Dict[str, List[int]] = {}
+    for example in examples:
+        if example.priority_score is not None:
+            scored.setdefault(f"{example.category}/{example.urgency}", []).append(example.priority_score)
+            scored.setdefault("*", []).append(example.priority_score)
+    priorities = {key: int(round(float(np.mean(scores)))) for key, scores in scored.items()}
+
+    meta = {"examples": len(examples), "max_ticket_id": max((e.ticket_id for e in examples), default=0)}
+    return LocalModel(classes, weights, priorities, meta)
+
+
+def load_examples(fetch_after: Callable[[int], List[Tuple]]) -> List[TrainingExample]:
+    """
+    Gemini-labelled tickets in id order, one per distinct message. ``fetch_after(ticket_id)``
+    returns the next chunk of (id, subject, message, message_hash, category, urgency,
+    priority_score) rows with a larger id; an empty chunk ends the scan.
+    """
+    examples: List[TrainingExample] = []
+    seen = set()
+    after = 0
+    while True:
+        rows = fetch_after(after)
+        if not rows:
+            return examples
+        for ticket_id, subject, message, message_hash, category, urgency, priority_score in rows:
+            # Exact duplicates would make the held-out evaluation look better than it is
+            if message_hash not in seen:
+                seen.add(message_hash)
+                examples.append(TrainingExample(ticket_id, subject, message, category, urgency, priority_score))
+        after = rows[-1][0]
+
+
+# Templates
+
+
+class ReplyTemplate(NamedTuple):
+    name: str
+    category: str
+    urgency: FrozenSet[str]
+    keywords: Optional["re.Pattern[str]"]
+    draft_reply: str
+
+
+def load_templates(path: str) -> List[ReplyTemplate]:
+    with open(path, encoding="utf-8") as fh:
+        entries = json.load(fh).get("templates", [])
+    templates = []
+    for entry in entries:
+        keywords = entry.get("keywords") or []
+        pattern = (
+            re.compile(r"\b(?:" + "|".join(re.escape(k.lower()) for k in keywords) + r")\b") if keywords else None
+        )
+        templates.append(
+            ReplyTemplate(
+                name=entry["name"],
+                category=entry["category"],
+                urgency=frozenset(entry.get("urgency") or ()),
+                keywords=pattern,
+                draft_reply=entry["draft_reply"],
+            )
+        )
+    return templates
+
+
+def match_template(
+    templates: Iterable[ReplyTemplate], category: str, urgency: str, subject: str, message: str
+) -> Optional[ReplyTemplate]:
+    """First template for the category whose urgency list and keywords (if any) match."""
+    text = f"{subject}\n{message}".lower()
+    for template in templates:
+        if template.category != category or (template.urgency and urgency not in template.urgency):
+            continue
+        if template.keywords is None or template.keywords.search(text):
+            return template
+    return None
+
+
+# Evaluation
+
+
+class ThresholdReport(NamedTuple):
+    min_confidence: float
+    # Share of tickets that would skip Gemini
+    handled_locally: float
+    # Agreement with Gemini on the tickets handled locally (None when there are none)
+    category_agreement: Optional[float]
+    urgency_agreement: Optional[float]
+    both_agreement: Optional[float]
+
+
+class EvaluationReport(NamedTuple):
+    tickets: int
+    # Agreement with Gemini over all tickets, ignoring confidence and templates
+    category_agreement: float
+    urgency_agreement: float
+    thresholds: List[ThresholdReport]
+
+
+def evaluate(
+    model: LocalModel,
+    templates: Sequence[ReplyTemplate],
+    examples: Sequence[TrainingExample],
+    thresholds: Sequence[float],
+) -> EvaluationReport:
+    """Agreement with Gemini's labels against the share of Gemini calls saved, per confidence threshold."""
+    predictions = model.predict_many([featurize(e.subject, e.message) for e in examples])
+    categories, category_probs = predictions["category"]
+    urgencies, urgency_probs = predictions["urgency"]
+    category_ok = np.array([p == e.category for p, e in zip(categories, examples)])
+    urgency_ok = np.array([p == e.urgency for p, e in zip(urgencies, examples)])
+    has_template = np.array(
+        [
+            match_template(templates, category, urgency, e.subject, e.message) is not None
+            for category, urgency, e in zip(categories, urgencies, examples)
+        ]
+    )
+    confidence = np.minimum(category_probs, urgency_probs)
+
+    def share(mask: np.ndarray) -> Optional[float]:
+        return float(mask.mean()) if len(mask) else None
+
+    reports = []
+    for threshold in thresholds:
+        local = has_template & (confidence >= threshold)
+        reports.append(
+            ThresholdReport(
+                min_confidence=threshold,
+                handled_locally=float(local.mean()),
+                category_agreement=share(category_ok[local]),
+                urgency_agreement=share(urgency_ok[local]),
+                both_agreement=share((category_ok & urgency_ok)[local]),
+            )
+        )
+    return EvaluationReport(len(examples), float(category_ok.mean()), float(urgency_ok.mean()), reports)
+
+
+def format_report(report: EvaluationReport) -> str:
+    def pct(value: Optional[float]) -> str:
+        return f"{value * 100:.1f}%" if value is not None else "-"
+
+    lines = [
+        f"Evaluated on {report.tickets} tickets labelled by Gemini.",
+        f"All tickets: category agreement {pct(report.category_agreement)}, "
+        f"urgency agreement {pct(report.urgency_agreement)}.",
+        "",
+        f"{'min confidence':>14} {'Gemini calls saved':>19} {'category':>9} {'urgency':>8} {'both':>7}",
+    ]
+    for row in report.thresholds:
+        lines.append(
+            f"{row.min_confidence:>14.2f} {pct(row.handled_locally):>19} {pct(row.category_agreement):>9} "
+            f"{pct(row.urgency_agreement):>8} {pct(row.both_agreement):>7}"
+        )
+    lines.append("(agreement columns: on the tickets that would be handled locally)")
+    return "\n".join(lines)
+
+
+# Runtime
+
+
+class LocalClassifier:
+    """The model and templates used by the ticket pipeline; see the module docstring."""
+
+    def __init__(self, *, model_path: str, templates_path: str, min_confidence: float) -> None:
+        self._model_path = model_path
+        self._templates_path = templates_path
+        self.min_confidence = min_confidence
+        self._model: Optional[LocalModel] = None
+        self._templates: List[ReplyTemplate] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None and bool(self._templates)
+
+    def load(self) -> bool:
+        """Load the model and templates; without a usable model every ticket goes to Gemini."""
+        if not os.path.exists(self._model_path):
+            logger.info("No local classifier at %s; all tickets go to Gemini", self._model_path)
+            return False
+        try:
+            model = LocalModel.load(self._model_path)
+            templates = load_templates(self._templates_path)
+        except (OSError, ValueError, KeyError, re.error):
+            logger.exception("Could not load the local classifier; all tickets go to Gemini")
+            return False
+        self._model, self._templates = model, templates
+        logger.info(
+            "Loaded local classifier (%s training tickets, %s reply templates)",
+            model.meta.get("examples"),
+            len(templates),
+        )
+        return True
+
+    def classify(self, ticket: TicketCreate) -> Optional[GeminiOutcome]:
+        """A templated outcome when the model is confident and a template matches, else None."""
+        model = self._model
+        if model is None:
+            return None
+        predictions = model.predict(ticket.subject, ticket.message)
+        (category, category_prob), (urgency, urgency_prob) = predictions["category"], predictions["urgency"]
+        confidence = min(category_prob, urgency_prob)
+        if confidence < self.min_confidence:
+            LOCAL_CLASSIFIER_DECISIONS.inc("low_confidence")
+            return None
+        template = match_template(self._templates, category, urgency, ticket.subject, ticket.message)
+        if template is None:
+            LOCAL_CLASSIFIER_DECISIONS.inc("no_template")
+            return None
+        LOCAL_CLASSIFIER_DECISIONS.inc("local")
+
+        result = GeminiResult(
+            category=category,
+            urgency=urgency,
+            priority_score=model.priority_for(category, urgency),
+            confidence_score=round(confidence, 4),
+            draft_reply=template.draft_reply.replace("{name}", ticket.name),
+            reasoning_summary=(
+                f"Local classifier: {category} ({category_prob:.2f}), {urgency} urgency ({urgency_prob:.2f}); "
+                f"reply template '{template.name}'."
+            ),
+        )
+        return result, json.dumps(result.model_dump()), None, None
+
+
+local_classifier = LocalClassifier(
+    model_path=settings.local_classifier_path,
+    templates_path=settings.local_classifier_templates_path or DEFAULT_TEMPLATES_PATH,
+    min_confidence=settings.local_classifier_min_confidence,
+)
@@ -0,0 +1,314 @@
+"""
+Near-duplicate detection for ticket messages (MinHash + LSH).
+
+Messages are reduced to character 5-gram shingles after normalisation (case,
+whitespace, digits), MinHash-signed and split into LSH bands. Each band is a
+sorted NumPy array of (bucket key, ticket id) plus a small dict of recent inserts
+that is merged in periodically, so lookups are O(bands * log n) and memory stays
+at ~12 bytes per ticket per band. Candidates are verified with the exact Jaccard
+similarity of their messages before a ticket is marked as a duplicate.
+
+The index is snapshotted to an ``.npz`` file on shutdown; at startup the
+snapshot is loaded and tickets created after it are indexed from the database
+on a background thread (a missing or incompatible snapshot triggers a full
+rebuild the same way). Each process keeps its own index: with several workers,
+tickets created by the others are only picked up at the next startup.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SHINGLE_SIZE = 5
+SNAPSHOT_VERSION = 1
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_DIGITS = re.compile(r"\d+")
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+# np.trapz was renamed in NumPy 2.0
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+# Cap on verified candidates per lookup (most band hits first)
+MAX_CANDIDATES = 32
+
+
+def shingles(message: str) -> Set[str]:
+    """Character shingles of the normalised message; order numbers and spacing do not matter."""
+    text = _NON_WORD.sub(" ", _DIGITS.sub("0", message.lower())).strip()
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    (bands, rows per band) minimising the equally weighted false-positive and
+    false-negative probability mass around ``threshold``.
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    below, above = grid[grid < threshold], grid[grid >= threshold]
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positive = _trapezoid(1 - (1 - below**rows) ** bands, below) if len(below) > 1 else 0.0
+        false_negative = _trapezoid((1 - above**rows) ** bands, above) if len(above) > 1 else 0.0
+        error = false_positive + false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class _Band:
+    """One LSH band: sorted base arrays plus a dict of recent inserts."""
+
+    def __init__(self, keys: Optional[np.ndarray] = None, ids: Optional[np.ndarray] = None) -> None:
+        self.keys = keys if keys is not None else np.empty(0, dtype=np.uint32)
+        self.ids = ids if ids is not None else np.empty(0, dtype=np.int64)
+        self.recent: Dict[int, List[int]] = {}
+        self.recent_size = 0
+
+    def add(self, key: int, ticket_id: int) -> None:
+        self.recent.setdefault(key, []).append(ticket_id)
+        self.recent_size += 1
+        if self.recent_size >= max(4096, len(self.keys) // 8):
+            self.merge()
+
+    def merge(self) -> None:
+        if not self.recent_size:
+            return
+        new_keys = np.fromiter(
+            (key for key, ids in self.recent.items() for _ in ids), dtype=np.uint32, count=self.recent_size
+        )
+        new_ids = np.fromiter(
+            (ticket_id for ids in self.recent.values() for ticket_id in ids), dtype=np.int64, count=self.recent_size
+        )
+        order = np.argsort(new_keys, kind="stable")
+        new_keys, new_ids = new_keys[order], new_ids[order]
+        # Sorted insert: O(n) copy instead of re-sorting the whole band
+        positions = np.searchsorted(self.keys, new_keys, side="right")
+        self.keys = np.insert(self.keys, positions, new_keys)
+        self.ids = np.insert(self.ids, positions, new_ids)
+        self.recent, self.recent_size = {}, 0
+
+    def lookup(self, key: int) -> Iterable[int]:
+        # A Python int would make NumPy cast the whole band to int64 on every call
+        needle = np.uint32(key)
+        start = np.searchsorted(self.keys, needle, side="left")
+        end = np.searchsorted(self.keys, needle, side="right")
+        yield from self.ids[start:end].tolist()
+        yield from self.recent.get(key, ())
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of ticket messages; see the module docstring."""
+
+    def __init__(
+        self,
+        *,
+        threshold: float,
+        num_perm: int,
+        snapshot_path: str = "",
+        seed: int = 1,
+    ) -> None:
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._snapshot_path = snapshot_path
+        self._seed = seed
+        rng = np.random.RandomState(seed)
+        # Universal hashing (a * x + b) mod p over 32-bit shingle hashes; no uint64 overflow
+        self._a = rng.randint(1, 1 << 32, size=self.bands * self.rows, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=self.bands * self.rows, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._band_tables = [_Band() for _ in range(self.bands)]
+        self._max_id = 0
+        self._size = 0
+        # False until the index covers every ticket in the database
+        self._complete = False
+        # Ids added live while a catch-up runs; the catch-up skips them
+        self._added_live: Optional[Set[int]] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def max_indexed_id(self) -> int:
+        return self._max_id
+
+    # Hashing
+
+    def band_keys(self, shingle_set: Set[str]) -> List[int]:
+        if not shingle_set:
+            return []
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set)
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        signature = permuted.min(axis=0).astype(np.uint32)
+        return [
+            zlib.crc32(signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    # Index updates and lookups
+
+    def add(self, ticket_id: int, message: str) -> None:
+        keys = self.band_keys(shingles(message))
+        with self._lock:
+            if self._added_live is not None:
+                self._added_live.add(ticket_id)
+            self._add_keys(ticket_id, keys)
+
+    def _add_keys(self, ticket_id: int, keys: List[int]) -> None:
+        for band, key in zip(self._band_tables, keys):
+            band.add(key, ticket_id)
+        self._max_id = max(self._max_id, ticket_id)
+        self._size += 1
+
+    def candidates(self, message: str) -> List[int]:
+        """Ticket ids sharing at least one LSH bucket with ``message``, most band hits first."""
+        keys = self.band_keys(shingles(message))
+        hits: Counter = Counter()
+        with self._lock:
+            for band, key in zip(self._band_tables, keys):
+                hits.update(set(band.lookup(key)))
+        return [ticket_id for ticket_id, _ in hits.most_common(MAX_CANDIDATES)]
+
+    def best_match(self, message: str, candidate_messages: Dict[int, str]) -> Optional[int]:
+        """Id of the most similar candidate at or above the threshold (oldest on ties)."""
+        target = shingles(message)
+        best_id, best_score = None, self.threshold
+        for ticket_id in sorted(candidate_messages):
+            score = jaccard(target, shingles(candidate_messages[ticket_id]))
+            if score > best_score or (score == best_score and best_id is None):
+                best_id, best_score = ticket_id, score
+        return best_id
+
+    # Snapshot and catch-up
+
+    def _signature_meta(self) -> Dict[str, object]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "rows": self.rows,
+            "seed": self._seed,
+            "shingle_size": SHINGLE_SIZE,
+        }
+
+    def save_snapshot(self) -> bool:
+        if not self._snapshot_path or not self._complete:
+            # A partial index must not be persisted as if it were complete
+            return False
+        with self._lock:
+            for band in self._band_tables:
+                band.merge()
+            meta = dict(self._signature_meta(), max_id=self._max_id, size=self._size)
+            arrays = {"meta": np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)}
+            for i, band in enumerate(self._band_tables):
+                arrays[f"keys_{i}"] = band.keys
+                arrays[f"ids_{i}"] = band.ids
+            tmp_path = f"{self._snapshot_path}.tmp"
+            with open(tmp_path, "wb") as fh:
+                np.savez(fh, **arrays)
+            os.replace(tmp_path, self._snapshot_path)
+        logger.info("Saved near-duplicate index snapshot (%s tickets) to %s", self._size, self._snapshot_path)
+        return True
+
+    def load_snapshot(self) -> bool:
+        """Replace the index with the snapshot if it exists and matches the current parameters."""
+        if not self._snapshot_path or not os.path.exists(self._snapshot_path):
+            return False
+        try:
+            with np.load(self._snapshot_path) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                if {k: meta.get(k) for k in self._signature_meta()} != self._signature_meta():
+                    logger.info("Near-duplicate snapshot parameters changed; rebuilding the index")
+                    return False
+                tables = [_Band(data[f"keys_{i}"], data[f"ids_{i}"]) for i in range(self.bands)]
+        except (OSError, ValueError, KeyError):
+            logger.exception("Could not read near-duplicate snapshot %s; rebuilding the index", self._snapshot_path)
+            return False
+        with self._lock:
+            self._band_tables = tables
+            self._max_id = int(meta["max_id"])
+            self._size = int(meta["size"])
+        logger.info("Loaded near-duplicate index snapshot (%s tickets)", self._size)
+        return True
+
+    def catch_up(self, fetch_after: Callable[[int], List[Tuple[int, str]]]) -> int:
+        """
+        Index tickets newer than the snapshot. ``fetch_after(ticket_id)`` returns the
+        next chunk of (id, message) rows with a larger id, in id order; an empty
+        chunk ends the catch-up. Tickets ``add``-ed meanwhile are not indexed twice.
+        Returns the number of tickets indexed.
+        """
+        indexed = 0
+        with self._lock:
+            after = self._max_id
+            self._added_live = set()
+        try:
+            while True:
+                rows = fetch_after(after)
+                if not rows:
+                    break
+                for ticket_id, message in rows:
+                    keys = self.band_keys(shingles(message))
+                    with self._lock:
+                        if ticket_id in self._added_live:
+                            continue
+                        self._add_keys(ticket_id, keys)
+                    indexed += 1
+                after = rows[-1][0]
+        finally:
+            with self._lock:
+                self._added_live = None
+        return indexed
+
+    def start(self, fetch_after: Callable[[int], List[Tuple[int, str]]]) -> None:
+        """
+        Load the snapshot (before any ticket is added), then index newer tickets on a
+        background thread. Lookups meanwhile only see what is indexed so far.
+        """
+        self._complete = False
+        self.load_snapshot()
+        threading.Thread(
+            target=self._catch_up_in_background, args=(fetch_after,), name="near-duplicate-catch-up", daemon=True
+        ).start()
+
+    def _catch_up_in_background(self, fetch_after: Callable[[int], List[Tuple[int, str]]]) -> None:
+        try:
+            indexed = self.catch_up(fetch_after)
+        except Exception:  # noqa: BLE001
+            logger.exception("Near-duplicate catch-up failed; the index stays partial until restart")
+            return
+        self._complete = True
+        logger.info("Near-duplicate index ready: %s tickets (%s indexed from the database)", self._size, indexed)
+        self.save_snapshot()
+
+
+near_duplicate_index = NearDuplicateIndex(
+    threshold=settings.near_duplicate_threshold,
+    num_perm=settings.near_duplicate_num_perm,
+    snapshot_path=settings.near_duplicate_snapshot_path,
+)
@@ -0,0 +1,283 @@
+"""
+Re-evaluation of stored tickets under the current guardrails (``POST /tickets/reevaluate``
+and ``python -m backend.cli reevaluate``), e.g. after the rules file changed.
+
+Tickets are read from the read-only pool in id order, ``chunk_size`` at a time,
+the next chunk being read while the current one is evaluated. Their stored
+confidence, urgency and draft reply go through ``evaluate_stored`` in a process
+pool; Gemini is never called. Only tickets whose flags, status or routing
+decision change are written: one batched UPDATE per chunk on the writer
+connection, with the dashboard counters adjusted in the same transaction. A
+ticket modified by something else since it was read is skipped (the next run
+picks it up). Log entries keep the decision made when the ticket was analysed.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.config import get_settings
+from backend.database import models as db_models
+from backend.database.session import AsyncReadSessionLocal, AsyncSessionLocal
+from backend.database.stats import StatDeltas, apply_deltas_async
+from backend.models.schemas import ReevaluationChange, ReevaluationStatus
+from backend.services.change_feed import CHANGE_UPDATED, EVENT_COLUMNS, change_feed
+from backend.services.guardrail_service import StoredVerdict, evaluate_stored
+from backend.services.ticket_pipeline import STATUS_PROCESSING
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_tickets = db_models.Ticket.__table__
+# The change feed fields plus the analysis and the stored verdict
+_READ_COLUMNS = [_tickets.c[name] for name in dict.fromkeys(EVENT_COLUMNS + ("draft_reply", "guardrail_flags"))]
+# Compared again under the write lock before a ticket is updated
+_CHECKED_COLUMNS = ("status", "guardrail_flags", "routing_decision", "confidence_score", "urgency")
+
+
+def _flag_list(flags: Optional[str]) -> List[str]:
+    return flags.split(",") if flags else []
+
+
+class ReevaluationJob:
+    """Progress and result of one run."""
+
+    def __init__(self, *, dry_run: bool, diff_limit: int) -> None:
+        self.dry_run = dry_run
+        self.diff_limit = diff_limit
+        self.state = RUNNING
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.total = 0
+        self.scanned = 0
+        self.changed = 0
+        self.updated = 0
+        self.skipped = 0
+        self.transitions: Counter = Counter()
+        self.changes: List[ReevaluationChange] = []
+        self.error: Optional[str] = None
+
+    def record_change(self, row: Row, verdict: StoredVerdict) -> None:
+        flags, status, routing_decision = verdict
+        self.changed += 1
+        self.transitions[f"{row.status} -> {status}"] += 1
+        if len(self.changes) < self.diff_limit:
+            self.changes.append(
+                ReevaluationChange(
+                    ticket_id=row.id,
+                    status=row.status,
+                    new_status=status,
+                    guardrail_flags=_flag_list(row.guardrail_flags),
+                    new_guardrail_flags=_flag_list(flags),
+                    routing_decision=row.routing_decision,
+                    new_routing_decision=routing_decision,
+                )
+            )
+
+    def finish(self, state: str, error: Optional[str] = None) -> None:
+        self.state = state
+        self.error = error
+        self.finished_at = datetime.utcnow()
+
+    def status(self) -> ReevaluationStatus:
+        return ReevaluationStatus(
+            state=self.state,
+            dry_run=self.dry_run,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            total=self.total,
+            scanned=self.scanned,
+            changed=self.changed,
+            updated=self.updated,
+            skipped=self.skipped,
+            transitions=dict(self.transitions),
+            changes=self.changes,
+            error=self.error,
+        )
+
+
+async def _read_chunk(read_sessions: async_sessionmaker, after: int, chunk_size: int) -> Sequence[Row]:
+    async with read_sessions() as db:
+        result = await db.execute(
+            select(*_READ_COLUMNS)
+            .where(_tickets.c.id > after, _tickets.c.status != STATUS_PROCESSING)
+            .order_by(_tickets.c.id)
+            .limit(chunk_size)
+        )
+        return result.all()
+
+
+async def _evaluate(pool: ProcessPoolExecutor, workers: int, rows: Sequence[Row]) -> List[StoredVerdict]:
+    loop = asyncio.get_running_loop()
+    analyses = [(row.confidence_score, row.urgency, row.draft_reply) for row in rows]
+    size = -(-len(analyses) // workers)
+    parts = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, evaluate_stored, analyses[start : start + size])
+            for start in range(0, len(analyses), size)
+        )
+    )
+    return [verdict for part in parts for verdict in part]
+
+
+async def _write(
+    write_sessions: async_sessionmaker, changed: List[Tuple[Row, StoredVerdict]], job: ReevaluationJob
+) -> List[Tuple[Row, StoredVerdict]]:
+    """Update the changed tickets that still hold the values they were evaluated on."""
+    async with write_sessions() as db:
+        result = await db.execute(
+            select(_tickets.c.id, *(_tickets.c[name] for name in _CHECKED_COLUMNS)).where(
+                _tickets.c.id.in_([row.id for row, _ in changed])
+            )
+        )
+        current = {row.id: tuple(row[1:]) for row in result}
+        applied = []
+        params = []
+        deltas = StatDeltas()
+        for row, verdict in changed:
+            if current.get(row.id) != tuple(getattr(row, name) for name in _CHECKED_COLUMNS):
+                job.skipped += 1
+                continue
+            flags, status, routing_decision = verdict
+            params.append(
+                {"ticket_id": row.id, "new_flags": flags, "new_status": status, "new_routing": routing_decision}
+            )
+            deltas.replace_value("status", row.status, status)
+            deltas.replace_value("routing_decision", row.routing_decision, routing_decision)
+            applied.append((row, verdict))
+        if params:
+            await db.execute(
+                update(_tickets)
+                .where(_tickets.c.id == bindparam("ticket_id"))
+                .values(
+                    guardrail_flags=bindparam("new_flags"),
+                    status=bindparam("new_status"),
+                    routing_decision=bindparam("new_routing"),
+                ),
+                params,
+            )
+            await apply_deltas_async(db, deltas)
+        await db.commit()
+    job.updated += len(applied)
+    return applied
+
+
+def _publish(applied: List[Tuple[Row, StoredVerdict]]) -> None:
+    for row, (_, status, routing_decision) in applied:
+        values = {name: getattr(row, name) for name in EVENT_COLUMNS}
+        values.update(status=status, routing_decision=routing_decision)
+        change_feed.publish(
+            CHANGE_UPDATED, db_models.Ticket(**values), previous_status=row.status, previous_urgency=row.urgency
+        )
+
+
+async def reevaluate_tickets(
+    job: ReevaluationJob,
+    *,
+    read_sessions: async_sessionmaker = AsyncReadSessionLocal,
+    write_sessions: async_sessionmaker = AsyncSessionLocal,
+    chunk_size: int = 1000,
+    workers: int = 0,
+    publish: bool = False,
+) -> ReevaluationJob:
+    """
+    Run ``job`` over every ticket with an AI result (``Processing`` tickets are
+    skipped). ``workers`` guardrail processes, 0 for one per CPU; ``publish``
+    announces updated tickets on this process's change feed.
+    """
+    workers = workers or os.cpu_count() or 1
+    # spawn: workers must not inherit the event loop, threads or database connections
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    next_rows: Optional[asyncio.Task] = None
+    try:
+        async with read_sessions() as db:
+            job.total = (
+                await db.execute(select(func.count()).where(_tickets.c.status != STATUS_PROCESSING))
+            ).scalar_one()
+
+        rows = await _read_chunk(read_sessions, 0, chunk_size)
+        while rows:
+            next_rows = asyncio.create_task(_read_chunk(read_sessions, rows[-1].id, chunk_size))
+            changed = []
+            for row, verdict in zip(rows, await _evaluate(pool, workers, rows)):
+                if verdict != (row.guardrail_flags or "", row.status, row.routing_decision):
+                    job.record_change(row, verdict)
+                    changed.append((row, verdict))
+            if changed and not job.dry_run:
+                applied = await _write(write_sessions, changed, job)
+                if publish:
+                    _publish(applied)
+            job.scanned += len(rows)
+            logger.info(
+                "Re-evaluated tickets: scanned=%s/%s changed=%s updated=%s skipped=%s",
+                job.scanned,
+                job.total,
+                job.changed,
+                job.updated,
+                job.skipped,
+            )
+            rows = await next_rows
+    except asyncio.CancelledError:
+        job.finish(CANCELLED)
+        raise
+    except Exception as exc:
+        job.finish(FAILED, str(exc))
+        raise
+    finally:
+        if next_rows is not None and not next_rows.done():
+            next_rows.cancel()
+        pool.shutdown(wait=True, cancel_futures=True)
+    job.finish(FINISHED)
+    return job
+
+
+class ReevaluationRunner:
+    """Runs one job at a time in the background for the admin endpoint and keeps the last one."""
+
+    def __init__(self) -> None:
+        self.job: Optional[ReevaluationJob] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, *, dry_run: bool, diff_limit: int) -> ReevaluationJob:
+        self.job = ReevaluationJob(dry_run=dry_run, diff_limit=diff_limit)
+        self._task = asyncio.create_task(self._run(self.job), name="guardrail-reevaluation")
+        return self.job
+
+    async def _run(self, job: ReevaluationJob) -> None:
+        try:
+            await reevaluate_tickets(
+                job,
+                chunk_size=settings.reevaluation_chunk_size,
+                workers=settings.reevaluation_workers,
+                publish=True,
+            )
+        except Exception:
+            logger.exception("Guardrail re-evaluation failed")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+reevaluation_runner = ReevaluationRunner()
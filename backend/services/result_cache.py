@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from backend.config import get_settings
+from backend.models.schemas import GeminiResult
+from backend.services.gemini_service import GeminiOutcome
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class AIResultCache:
+    """
+    Two-tier cache for Gemini results with single-flight coalescing.
+
+    - Memory tier: LRU with TTL, bounded by ``max_entries``.
+    - Persistent tier: SQLite file that survives restarts (optional).
+    - Concurrent lookups for the same key share one in-flight computation.
+
+    Only successful results (no error message) are cached; fallbacks are
+    shared with coalesced waiters but never stored. Token usage is only returned
+    to the caller whose lookup made the Gemini call, so it is accounted once.
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        max_entries: int,
+        ttl_seconds: float,
+        db_path: Optional[str],
+        enabled: bool = True,
+    ) -> None:
+        self._model = model
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl_seconds
+        self._db_path = db_path or None
+        self._enabled = enabled
+
+        self._memory: "OrderedDict[str, Tuple[float, GeminiResult, Optional[str]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+
+    def key_for(self, message_hash: str, subject: str, name: str) -> str:
+        # The draft greets the customer by name, so it is only reused for the same name
+        subject_hash = hashlib.sha256(subject.strip().lower().encode("utf-8")).hexdigest()
+        name_hash = hashlib.sha256(name.strip().encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{message_hash}:{subject_hash}:{name_hash}:{self._model}".encode("utf-8")
+        ).hexdigest()
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[GeminiOutcome]]
+    ) -> GeminiOutcome:
+        if not self._enabled:
+            return await compute()
+
+        cached = self._get_memory(key)
+        if cached is not None:
+            return cached
+
+        # The shared lookup runs as its own task so a disconnecting caller
+        # does not cancel the work other waiters depend on
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            result, raw_json, error, _ = await asyncio.shield(inflight)
+            return result, raw_json, error, None
+        inflight = asyncio.ensure_future(self._fill(key, compute))
+        self._inflight[key] = inflight
+        inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(inflight)
+
+    async def _fill(self, key: str, compute: Callable[[], Awaitable[GeminiOutcome]]) -> GeminiOutcome:
+        outcome = await self._get_persistent(key)
+        if outcome is not None:
+            return outcome
+        outcome = await compute()
+        if outcome[2] is None:
+            self._put_memory(key, outcome)
+            await self._put_persistent(key, outcome)
+        return outcome
+
+    def close(self) -> None:
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # Memory tier
+
+    def _get_memory(self, key: str) -> Optional[GeminiOutcome]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, result, raw_json = entry
+        if expires_at < time.time():
+            self._memory.pop(key, None)
+            return None
+        self._memory.move_to_end(key)
+        return result, raw_json, None, None
+
+    def _put_memory(self, key: str, outcome: GeminiOutcome, expires_at: Optional[float] = None) -> None:
+        result, raw_json = outcome[:2]
+        self._memory[key] = (expires_at or time.time() + self._ttl, result, raw_json)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    # Persistent tier (blocking sqlite3 calls run in a worker thread)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_result_cache ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, raw_json TEXT, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM ai_result_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+        return self._conn
+
+    def _read_sync(self, key: str) -> Optional[Tuple[str, Optional[str], float]]:
+        with self._conn_lock:
+            row = self._connection().execute(
+                "SELECT result, raw_json, expires_at FROM ai_result_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[2] < time.time():
+            return None
+        return row
+
+    def _write_sync(self, key: str, result_json: str, raw_json: Optional[str], expires_at: float) -> None:
+        with self._conn_lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_result_cache (key, result, raw_json, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, result_json, raw_json, expires_at),
+            )
+            conn.commit()
+
+    async def _get_persistent(self, key: str) -> Optional[GeminiOutcome]:
+        if not self._db_path:
+            return None
+        try:
+            row = await asyncio.to_thread(self._read_sync, key)
+        except sqlite3.Error:
+            logger.exception("AI result cache read failed")
+            return None
+        if row is None:
+            return None
+        result_json, raw_json, expires_at = row
+        outcome = (GeminiResult(**json.loads(result_json)), raw_json, None, None)
+        self._put_memory(key, outcome, expires_at)
+        return outcome
+
+    async def _put_persistent(self, key: str, outcome: GeminiOutcome) -> None:
+        if not self._db_path:
+            return
+        result, raw_json = outcome[:2]
+        try:
+            await asyncio.to_thread(
+                self._write_sync, key, result.model_dump_json(), raw_json, time.time() + self._ttl
+            )
+        except sqlite3.Error:
+            logger.exception("AI result cache write failed")
+
+
+ai_result_cache = AIResultCache(
+    model=settings.gemini_model,
+    max_entries=settings.ai_cache_max_entries,
+    ttl_seconds=settings.ai_cache_ttl_seconds,
+    db_path=settings.ai_cache_path,
+    enabled=settings.ai_cache_enabled,
+)
@@ -0,0 +1,212 @@
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import async_crud as crud, models as db_models
+from backend.config import get_settings
+from backend.database.writer import ticket_writer
+from backend.models.schemas import GeminiResult, GuardrailResult, TicketCreate, TicketResponse
+from backend.services.change_feed import CHANGE_CREATED, change_feed
+from backend.services.gemini_batcher import gemini_batcher
+from backend.services.gemini_service import GeminiOutcome, TokenUsage, fallback_result
+from backend.services.guardrail_service import apply_guardrails, routing_for
+from backend.services.local_classifier import local_classifier
+from backend.services.near_duplicates import near_duplicate_index
+from backend.services.result_cache import ai_result_cache
+from backend.utils.logging_config import ticket_id_var
+from backend.utils.metrics import GUARDRAIL_FLAGS, ROUTING_DECISIONS
+from backend.utils.security import hash_message
+from backend.utils.timing import stage
+
+
+settings = get_settings()
+
+# Status of tickets accepted for asynchronous processing that have no AI result yet
+STATUS_PROCESSING = "Processing"
+
+# ticket_logs.classifier: which tier produced the classification and draft
+CLASSIFIER_GEMINI = "gemini"
+CLASSIFIER_LOCAL = "local"
+
+
+class TicketAnalysis(NamedTuple):
+    gemini_result: GeminiResult
+    guardrail: GuardrailResult
+    routing_decision: str
+    raw_json: Optional[str]
+    gemini_error: Optional[str]
+    # None when the result came from the cache or the local classifier
+    usage: Optional[TokenUsage]
+    classifier: str = CLASSIFIER_GEMINI
+
+
+# Produces the outcome for one ticket, like call_gemini
+Classifier = Callable[[], Awaitable[GeminiOutcome]]
+
+
+async def analyze_ticket(
+    ticket_in: TicketCreate, message_hash: str, classify: Optional[Classifier] = None
+) -> TicketAnalysis:
+    """
+    Local classification when it is confident and has a reply template, otherwise
+    Gemini (cached / batched); then guardrails and routing.
+    ``classify`` replaces the batched Gemini call on a cache miss (e.g. a streaming call).
+    """
+    local = None
+    if local_classifier.ready:
+        with stage("local_model"):
+            local = local_classifier.classify(ticket_in)
+    if local is not None:
+        gemini_result, raw_json, gemini_error, usage = local
+        classifier = CLASSIFIER_LOCAL
+    else:
+        cache_key = ai_result_cache.key_for(message_hash, ticket_in.subject, ticket_in.name)
+        compute = classify or (lambda: gemini_batcher.classify(ticket_in))
+        with stage("llm"):
+            gemini_result, raw_json, gemini_error, usage = await ai_result_cache.get_or_compute(cache_key, compute)
+        classifier = CLASSIFIER_GEMINI
+    with stage("guardrails"):
+        guardrail = apply_guardrails(gemini_result)
+
+    routing_decision = routing_for(guardrail)
+    for flag in guardrail.flags:
+        GUARDRAIL_FLAGS.inc(flag)
+    ROUTING_DECISIONS.inc(routing_decision)
+
+    return TicketAnalysis(gemini_result, guardrail, routing_decision, raw_json, gemini_error, usage, classifier)
+
+
+def fallback_analysis(error: str) -> TicketAnalysis:
+    """The result of a ticket whose analysis failed outright: the same fallback as a Gemini error."""
+    gemini_result = fallback_result()
+    guardrail = apply_guardrails(gemini_result)
+    return TicketAnalysis(gemini_result, guardrail, routing_for(guardrail), None, error[:255], None)
+
+
+async def prepare_ticket(db: AsyncSession, ticket_in: TicketCreate) -> Tuple[str, Dict[str, Any]]:
+    """
+    Hash the message, look up exact and near duplicates and return
+    (message_hash, base column values). Releases ``db``'s connection afterwards,
+    so it is not held while the ticket is analysed.
+    """
+    message_hash = hash_message(ticket_in.message)
+    with stage("dedupe"):
+        existing = await crud.get_ticket_by_hash(db, message_hash)
+        original_ticket_id = existing.id if existing else None
+        if original_ticket_id is None and settings.near_duplicate_enabled:
+            original_ticket_id = await find_near_duplicate(db, ticket_in.message)
+    await db.close()
+
+    return message_hash, dict(
+        name=ticket_in.name,
+        email=ticket_in.email,
+        subject=ticket_in.subject,
+        message=ticket_in.message,
+        message_hash=message_hash,
+        is_duplicate=original_ticket_id is not None,
+        original_ticket_id=original_ticket_id,
+    )
+
+
+async def find_near_duplicate(db: AsyncSession, message: str) -> Optional[int]:
+    """Id of an earlier ticket whose message is at least ``near_duplicate_threshold`` similar."""
+    candidates = near_duplicate_index.candidates(message)
+    if not candidates:
+        return None
+    return near_duplicate_index.best_match(message, await crud.get_ticket_messages(db, candidates))
+
+
+async def store_ticket(
+    ticket_values: Dict[str, Any], log_values: Optional[Dict[str, Any]]
+) -> db_models.Ticket:
+    """
+    Persist through the group-commit writer, make the message findable as a near
+    duplicate and announce the ticket on the change feed.
+    """
+    ticket = await ticket_writer.submit(ticket_values, log_values)
+    # Later log lines of this request refer to the stored ticket
+    ticket_id_var.set(ticket.id)
+    change_feed.publish(CHANGE_CREATED, ticket)
+    if settings.near_duplicate_enabled:
+        near_duplicate_index.add(ticket.id, ticket.message)
+    return ticket
+
+
+async def process_ticket(
+    ticket_in: TicketCreate,
+    message_hash: str,
+    ticket_values: Dict[str, Any],
+    classify: Optional[Classifier] = None,
+) -> db_models.Ticket:
+    """Run the AI pipeline and persist the ticket + log in one unit of work."""
+    analysis = await analyze_ticket(ticket_in, message_hash, classify)
+
+    # Group-committed with concurrent requests
+    with stage("db"):
+        return await store_ticket(
+            dict(ticket_values, **analysis_columns(analysis)),
+            log_columns(ticket_in, analysis),
+        )
+
+
+def analysis_columns(analysis: TicketAnalysis) -> Dict[str, Any]:
+    """Ticket column values produced by the AI pipeline."""
+    gemini_result = analysis.gemini_result
+    return dict(
+        category=(gemini_result.category or None),
+        urgency=(gemini_result.urgency or None),
+        priority_score=gemini_result.priority_score,
+        confidence_score=gemini_result.confidence_score,
+        draft_reply=gemini_result.draft_reply,
+        reasoning_summary=gemini_result.reasoning_summary,
+        status=analysis.guardrail.status,
+        guardrail_flags=",".join(analysis.guardrail.flags),
+        routing_decision=analysis.routing_decision,
+    )
+
+
+def log_columns(ticket_in: TicketCreate, analysis: TicketAnalysis) -> Dict[str, Any]:
+    raw_input_str = (
+        f"name={ticket_in.name}; email={ticket_in.email}; "
+        f"subject={ticket_in.subject}; message={ticket_in.message}"
+    )
+
+    ai_output_str = analysis.raw_json or ""
+    if analysis.gemini_error:
+        ai_output_str += f"\nERROR: {analysis.gemini_error}"
+
+    return dict(
+        raw_input=raw_input_str,
+        ai_output=ai_output_str,
+        guardrail_flags=",".join(analysis.guardrail.flags),
+        routing_decision=analysis.routing_decision,
+        gemini_error=analysis.gemini_error[:255] if analysis.gemini_error else None,
+        prompt_tokens=analysis.usage.prompt_tokens if analysis.usage else None,
+        output_tokens=analysis.usage.output_tokens if analysis.usage else None,
+        total_tokens=analysis.usage.total_tokens if analysis.usage else None,
+        classifier=analysis.classifier,
+    )
+
+
+def ticket_response(ticket: db_models.Ticket) -> TicketResponse:
+    flags_list = ticket.guardrail_flags.split(",") if ticket.guardrail_flags else []
+
+    return TicketResponse(
+        id=ticket.id,
+        name=ticket.name,
+        email=ticket.email,
+        subject=ticket.subject,
+        message=ticket.message,
+        category=ticket.category,
+        urgency=ticket.urgency,
+        priority_score=ticket.priority_score,
+        confidence_score=ticket.confidence_score,
+        draft_reply=ticket.draft_reply,
+        reasoning_summary=ticket.reasoning_summary,
+        status=ticket.status,
+        guardrail_flags=flags_list,
+        routing_decision=ticket.routing_decision,
+        is_duplicate=ticket.is_duplicate,
+        original_ticket_id=ticket.original_ticket_id,
+        created_at=ticket.created_at,
+    )
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from backend.config import get_settings
+from backend.database import async_crud as crud
+from backend.database.session import AsyncReadSessionLocal, AsyncSessionLocal
+from backend.models.schemas import TicketCreate
+from backend.services.change_feed import CHANGE_UPDATED, change_feed
+from backend.services.ticket_pipeline import (
+    STATUS_PROCESSING,
+    analysis_columns,
+    analyze_ticket,
+    fallback_analysis,
+    log_columns,
+)
+from backend.utils.logging_config import ticket_id_var
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class TicketWorkerPool:
+    """
+    Bounded in-process pool that runs the AI pipeline for tickets accepted with
+    ``mode=async`` and writes the results back to their rows.
+
+    A submission ``reserve``s its queue slot before the ticket row is created, so a
+    full queue is reported (503) before anything is stored and ``enqueue`` never waits.
+    """
+
+    def __init__(self, *, workers: int, max_queue_size: int) -> None:
+        self._workers = max(1, workers)
+        self._max_queue_size = max(1, max_queue_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Slots claimed by submissions whose ticket is not stored yet
+        self._reserved = 0
+
+    @property
+    def full(self) -> bool:
+        return self._queue is None or self._queue.qsize() + self._reserved >= self._max_queue_size
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        # Bounded by ``full``/``reserve``; tickets re-queued at startup may exceed the limit
+        self._queue = asyncio.Queue()
+        self._reserved = 0
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"ticket-worker-{i}") for i in range(self._workers)
+        ]
+
+        # Read pending rows before requests are served so new submissions are not queued twice
+        async with AsyncReadSessionLocal() as db:
+            pending = await crud.list_ticket_ids_by_status(db, STATUS_PROCESSING)
+        if pending:
+            logger.info("Re-queueing %s tickets still in %s", len(pending), STATUS_PROCESSING)
+            for ticket_id in pending:
+                self._queue.put_nowait(ticket_id)
+
+    async def stop(self) -> None:
+        # Unfinished tickets keep their Processing status and are re-queued on next start
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def reserve(self) -> bool:
+        """Claim a queue slot for a ticket about to be stored; False when the queue is full."""
+        if self.full:
+            return False
+        self._reserved += 1
+        return True
+
+    def release(self) -> None:
+        """Give back a reserved slot whose ticket was not stored."""
+        self._reserved -= 1
+
+    def enqueue(self, ticket_id: int) -> None:
+        """Queue a stored ticket in the slot reserved for it."""
+        self._reserved -= 1
+        if self._queue is not None:
+            # Otherwise the pool stopped meanwhile; the ticket is re-queued on next start
+            self._queue.put_nowait(ticket_id)
+
+    async def _work(self) -> None:
+        while True:
+            ticket_id = await self._queue.get()
+            token = ticket_id_var.set(ticket_id)
+            try:
+                await self._process(ticket_id)
+            except Exception:  # noqa: BLE001
+                logger.exception("Async processing failed for ticket %s", ticket_id)
+            finally:
+                ticket_id_var.reset(token)
+                self._queue.task_done()
+
+    async def _process(self, ticket_id: int) -> None:
+        async with AsyncReadSessionLocal() as db:
+            ticket = await crud.get_ticket(db, ticket_id)
+        if ticket is None or ticket.status != STATUS_PROCESSING:
+            return
+
+        # Already validated at submission time
+        ticket_in = TicketCreate.model_construct(
+            name=ticket.name, email=ticket.email, subject=ticket.subject, message=ticket.message
+        )
+        try:
+            analysis = await analyze_ticket(ticket_in, ticket.message_hash)
+        except Exception as exc:  # noqa: BLE001
+            # Do not leave the ticket in Processing until the next restart
+            logger.exception("Analysis failed for ticket %s; storing the fallback result", ticket_id)
+            analysis = fallback_analysis(f"Processing failed: {exc}")
+
+        async with AsyncSessionLocal() as db:
+            completed = await crud.complete_ticket(
+                db,
+                ticket_id,
+                analysis_columns(analysis),
+                log_columns(ticket_in, analysis),
+                pending_status=STATUS_PROCESSING,
+            )
+        if completed is not None:
+            change_feed.publish(
+                CHANGE_UPDATED, completed, previous_status=ticket.status, previous_urgency=ticket.urgency
+            )
+
+
+ticket_worker_pool = TicketWorkerPool(
+    workers=settings.ticket_workers,
+    max_queue_size=settings.ticket_queue_max_size,
+)
@@ -0,0 +1,150 @@
+import json
+from typing import Any, List, Optional, Set, Tuple
+
+
+# ("field", name, value) once a top-level value is complete;
+# ("delta", name, text) for newly decoded characters of a streamed string field
+StreamEvent = Tuple[str, str, Any]
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalObjectParser:
+    """
+    Incremental parser for a single JSON object arriving in arbitrary chunks.
+
+    Each top-level value is reported as soon as it is complete; string values of
+    ``stream_fields`` are also reported character-by-character as they arrive.
+    Only event extraction happens here: the complete text should still be parsed
+    with ``json.loads`` once the stream has ended.
+    """
+
+    def __init__(self, stream_fields: Set[str] = frozenset()) -> None:
+        self._stream_fields = stream_fields
+        self._state = "start"
+        self._key: List[str] = []
+        self._value: List[str] = []
+        self._current_key = ""
+        self._escape: Optional[str] = None
+        self._pending_high_surrogate: Optional[str] = None
+        self._delta: List[str] = []
+        self._raw: List[str] = []
+        self._raw_depth = 0
+        self._raw_in_string = False
+        self._raw_escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, text: str) -> List[StreamEvent]:
+        events: List[StreamEvent] = []
+        for char in text:
+            if self._state == "done":
+                break
+            self._step(char, events)
+        if self._delta:
+            events.append(("delta", self._current_key, "".join(self._delta)))
+            self._delta = []
+        return events
+
+    def _step(self, char: str, events: List[StreamEvent]) -> None:
+        state = self._state
+        if state == "start":
+            if char == "{":
+                self._state = "key_or_end"
+        elif state == "key_or_end":
+            if char == '"':
+                self._key = []
+                self._escape = None
+                self._state = "key"
+            elif char == "}":
+                self._state = "done"
+        elif state == "key":
+            decoded = self._string_char(char)
+            if decoded is None:
+                self._current_key = "".join(self._key)
+                self._state = "colon"
+            else:
+                self._key.append(decoded)
+        elif state == "colon":
+            if char == ":":
+                self._state = "value"
+        elif state == "value":
+            if char in _WHITESPACE:
+                return
+            if char == '"':
+                self._value = []
+                self._escape = None
+                self._state = "string_value"
+            else:
+                self._raw = [char]
+                self._raw_depth = 1 if char in "[{" else 0
+                self._raw_in_string = False
+                self._raw_escape = False
+                self._state = "raw_value"
+        elif state == "string_value":
+            decoded = self._string_char(char)
+            if decoded is None:
+                if self._delta:
+                    events.append(("delta", self._current_key, "".join(self._delta)))
+                    self._delta = []
+                events.append(("field", self._current_key, "".join(self._value)))
+                self._state = "after_value"
+            elif decoded:
+                self._value.append(decoded)
+                if self._current_key in self._stream_fields:
+                    self._delta.append(decoded)
+        elif state == "raw_value":
+            self._raw_char(char, events)
+        elif state == "after_value":
+            if char == ",":
+                self._state = "key_or_end"
+            elif char == "}":
+                self._state = "done"
+
+    def _string_char(self, char: str) -> Optional[str]:
+        """Decoded text for ``char`` inside a string ("" while an escape is incomplete); None ends the string."""
+        if self._escape is not None:
+            self._escape += char
+            if self._escape == "\\u" or (self._escape.startswith("\\u") and len(self._escape) < 6):
+                return ""
+            decoded = json.loads(f'"{self._escape}"')
+            self._escape = None
+            if self._pending_high_surrogate is not None:
+                decoded = json.loads(f'"{self._pending_high_surrogate}\\u{ord(decoded):04x}"')
+                self._pending_high_surrogate = None
+                return decoded
+            if len(decoded) == 1 and 0xD800 <= ord(decoded) <= 0xDBFF:
+                # Wait for the low half of a surrogate pair
+                self._pending_high_surrogate = f"\\u{ord(decoded):04x}"
+                return ""
+            return decoded
+        if char == "\\":
+            self._escape = "\\"
+            return ""
+        if char == '"':
+            return None
+        return char
+
+    def _raw_char(self, char: str, events: List[StreamEvent]) -> None:
+        if self._raw_in_string:
+            self._raw.append(char)
+            if self._raw_escape:
+                self._raw_escape = False
+            elif char == "\\":
+                self._raw_escape = True
+            elif char == '"':
+                self._raw_in_string = False
+            return
+        if self._raw_depth == 0 and char in ",}":
+            events.append(("field", self._current_key, json.loads("".join(self._raw))))
+            self._state = "key_or_end" if char == "," else "done"
+            return
+        self._raw.append(char)
+        if char == '"':
+            self._raw_in_string = True
+        elif char in "[{":
+            self._raw_depth += 1
+        elif char in "]}":
+            self._raw_depth -= 1
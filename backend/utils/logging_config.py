@@ -1,28 +1,204 @@
+"""
+Logging setup: records are queued by the logging thread and written by a
+background listener, so the event loop never blocks on file I/O or rollover.
+
+- The rotating file gets one JSON object per line; the console gets text.
+- Every record carries the ``request_id`` / ``ticket_id`` of the context that
+  logged it (see ``request_id_var`` / ``ticket_id_var``).
+- Repeated warnings and errors (same logger, level and message template, e.g.
+  "Gemini timeout on attempt %s" during an outage) are limited to
+  ``LOG_RATE_LIMIT_BURST`` per ``LOG_RATE_LIMIT_INTERVAL_SECONDS``; the next
+  record let through reports how many were suppressed.
+- When the queue is full, records are dropped and counted instead of blocking.
+"""
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from backend.config import get_settings
+from backend.utils.metrics import LOG_RECORDS_DROPPED, LOG_RECORDS_SUPPRESSED
+
+
+settings = get_settings()
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("flowgen_request_id", default=None)
+ticket_id_var: ContextVar[Optional[int]] = ContextVar("flowgen_ticket_id", default=None)
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_setup_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["_DroppingQueueHandler"] = None
+
+
+class ContextFilter(logging.Filter):
+    """Copy the request / ticket context onto the record, in the thread that logged it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.ticket_id = ticket_id_var.get()
+        return True
+
+
+class RepeatedRecordFilter(logging.Filter):
+    """
+    Let at most ``burst`` records per (logger, level, message template) through
+    per ``interval`` seconds, for WARNING and above. The first record after a
+    suppressed run gets ``suppressed`` set to the number of records dropped.
+    """
+
+    def __init__(self, *, burst: int, interval: float) -> None:
+        super().__init__()
+        self._burst = burst
+        self._interval = interval
+        # key -> [window start, records let through, records suppressed]
+        self._windows: Dict[Tuple[str, int, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._burst <= 0 or record.levelno < logging.WARNING:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self._interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 10_000:
+                    self._evict(now)
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self._burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+        LOG_RECORDS_SUPPRESSED.inc(record.levelname)
+        return False
+
+    def _evict(self, now: float) -> None:
+        expired = [key for key, window in self._windows.items() if now - window[0] >= self._interval]
+        for key in expired:
+            del self._windows[key]
+
+
+class _DroppingQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message here; for the traceback only capture the frame summaries
+        # (cheap, and it does not keep the frames alive): reading the source lines and
+        # formatting is left to the listener thread, see _exc_text()
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_traceback = traceback.TracebackException(*record.exc_info, lookup_lines=False)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def _exc_text(record: logging.LogRecord) -> Optional[str]:
+    # Formatted once and cached on the record, which both handlers share
+    captured = getattr(record, "exc_traceback", None)
+    if captured is not None and not record.exc_text:
+        record.exc_text = "".join(captured.format()).rstrip("\n")
+    return record.exc_text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        exc_text = _exc_text(record)
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "ticket_id": getattr(record, "ticket_id", None),
+        }
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if exc_text:
+            entry["exception"] = exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        _exc_text(record)
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            text += f" [{suppressed} similar records suppressed]"
+        return text
 
 
-def setup_logging():
-    logs_dir = Path("logs")
-    logs_dir.mkdir(exist_ok=True)
+def setup_logging(log_dir: str = "logs", console: bool = True, rate_limit_burst: Optional[int] = None) -> None:
+    """
+    Install the queue handler on the root logger; calling it again is a no-op.
+    ``rate_limit_burst`` overrides LOG_RATE_LIMIT_BURST.
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return
 
-    log_file = logs_dir / "flowgen_backend.log"
+        logs_dir = Path(log_dir)
+        logs_dir.mkdir(exist_ok=True)
+        file_handler = RotatingFileHandler(
+            logs_dir / "flowgen_backend.log", maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers = [file_handler]
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(TextFormatter(TEXT_FORMAT))
+            handlers.append(console_handler)
 
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max(1, settings.log_queue_max_size))
+        _queue_handler = _DroppingQueueHandler(log_queue)
+        _queue_handler.addFilter(
+            RepeatedRecordFilter(
+                burst=settings.log_rate_limit_burst if rate_limit_burst is None else rate_limit_burst,
+                interval=settings.log_rate_limit_interval_seconds,
+            )
+        )
+        _queue_handler.addFilter(ContextFilter())
 
-    handler = RotatingFileHandler(
-        log_file, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8"
-    )
-    handler.setFormatter(formatter)
+        root_logger = logging.getLogger()
+        root_logger.setLevel(logging.INFO)
+        root_logger.addHandler(_queue_handler)
 
-    console = logging.StreamHandler()
-    console.setFormatter(formatter)
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
 
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(handler)
-    root_logger.addHandler(console)
 
+def stop_logging() -> None:
+    """Flush queued records and detach the handler (runs at exit; safe to call more than once)."""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener, _queue_handler = None, None
@@ -0,0 +1,216 @@
+"""
+In-process Prometheus metrics (text exposition format 0.0.4), served on ``/metrics``.
+
+Every metric keeps one shard per thread: the hot path only touches its own
+thread's dict and lists, so recording takes no lock. The lock is only taken when
+a thread records its first value, to register the new shard. ``render()``
+merges the shards at scrape time. A scrape may miss an update made during the
+scrape, never one made before it. Values are per process; with several workers,
+each one serves its own totals.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple, TypeVar
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers in-memory stages (~0.1 ms) up to slow Gemini calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+LabelValues = Tuple[str, ...]
+MetricT = TypeVar("MetricT", bound="_Metric")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[LabelValues, List[float]]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[LabelValues, List[float]]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict[LabelValues, List[float]] = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _merged(self, width: int) -> Dict[LabelValues, List[float]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged: Dict[LabelValues, List[float]] = {}
+        for shard in shards:
+            # list() copies under the GIL, so concurrent inserts cannot break the iteration
+            for labels, values in list(shard.items()):
+                total = merged.setdefault(labels, [0.0] * width)
+                for i, value in enumerate(list(values)):
+                    total[i] += value
+        return merged
+
+    def _labels(self, labels: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            cell = shard[labels] = [0.0]
+        cell[0] += amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labels, (value,) in sorted(self._merged(1).items()):
+            lines.append(f"{self.name}{self._labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one count per bucket (not cumulative) + the +Inf bucket, then sum
+        self._width = len(self.buckets) + 2
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            cell = shard[labels] = [0.0] * self._width
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def timer(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labels, cell in sorted(self._merged(self._width).items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), cell[:-1]):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{self._labels(labels, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_format_value(cell[-1])}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: MetricT) -> MetricT:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "flowgen_http_request_duration_seconds",
+        "Time until the response starts, by route template.",
+        ("method", "route", "status"),
+    )
+)
+STAGE_DURATION = registry.register(
+    Histogram(
+        "flowgen_stage_duration_seconds",
+        "Duration of ticket pipeline stages (the Server-Timing stages plus db_commit).",
+        ("stage",),
+    )
+)
+GEMINI_ATTEMPT_DURATION = registry.register(
+    Histogram(
+        "flowgen_gemini_attempt_duration_seconds",
+        "Duration of each Gemini request attempt, including queueing on the executor.",
+        ("kind", "outcome"),
+    )
+)
+GEMINI_ATTEMPTS = registry.register(
+    Counter(
+        "flowgen_gemini_attempts_total",
+        "Gemini request attempts by outcome (ok, timeout, invalid_json, quota, overloaded, error).",
+        ("kind", "outcome"),
+    )
+)
+GUARDRAIL_FLAGS = registry.register(
+    Counter("flowgen_guardrail_flags_total", "Guardrail flags raised on analysed tickets.", ("flag",))
+)
+ROUTING_DECISIONS = registry.register(
+    Counter("flowgen_routing_decisions_total", "Routing decisions of analysed tickets.", ("decision",))
+)
+LOCAL_CLASSIFIER_DECISIONS = registry.register(
+    Counter(
+        "flowgen_local_classifier_decisions_total",
+        "Local classifier outcomes: local (Gemini skipped), low_confidence or no_template (sent to Gemini).",
+        ("decision",),
+    )
+)
+RATE_LIMIT_REJECTIONS = registry.register(
+    Counter("flowgen_rate_limit_rejections_total", "Requests rejected with 429 by the per-IP rate limiter.")
+)
+LOG_RECORDS_SUPPRESSED = registry.register(
+    Counter("flowgen_log_records_suppressed_total", "Repeated log records dropped by the rate limit.", ("level",))
+)
+LOG_RECORDS_DROPPED = registry.register(
+    Counter("flowgen_log_records_dropped_total", "Log records dropped because the log queue was full.")
+)
+CHANGE_FEED_EVENTS = registry.register(
+    Counter("flowgen_change_feed_events_total", "Ticket changes published to the live feed.", ("change",))
+)
+CHANGE_FEED_OVERFLOWS = registry.register(
+    Counter(
+        "flowgen_change_feed_overflows_total",
+        "Change feed subscribers disconnected because they fell too far behind.",
+    )
+)
@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Tuple
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> List[Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+def encode_cursor(created_at: datetime, ticket_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) ordering."""
+    return _encode([created_at.isoformat(), ticket_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, ticket_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Malformed pagination cursor.") from exc
+
+
+def encode_search_cursor(score: float, ticket_id: int) -> str:
+    """Opaque keyset cursor for the (relevance score, id) ordering of search results."""
+    return _encode([score, ticket_id])
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, ticket_id = _decode(cursor)
+        return float(score), int(ticket_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Malformed pagination cursor.") from exc
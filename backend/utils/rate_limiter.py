@@ -1,44 +1,207 @@
+import logging
+import math
+import sqlite3
+import threading
 import time
-from typing import Dict, Tuple
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 from fastapi import HTTPException, Request, status
 
 from backend.config import get_settings
+from backend.utils.metrics import RATE_LIMIT_REJECTIONS
 
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
-_rate_limit_store: Dict[str, Tuple[int, float]] = {}
 
-
-def rate_limiter(request: Request):
+class RateLimitBackend(ABC):
     """
-    Simple in-memory fixed-window rate limiter per client IP.
-    Allows N requests per 60-second window.
+    Token-bucket storage. Each key holds (tokens, updated_at); a bucket refills
+    ``capacity`` tokens per window, so an idle key is indistinguishable from a
+    missing one once full and can be evicted without changing behaviour.
     """
-    max_requests = settings.rate_limit_requests_per_minute
-    window_seconds = 60
 
-    client_ip = request.client.host if request.client else "unknown"
-    now = time.time()
+    @abstractmethod
+    def consume(self, key: str, *, capacity: float, refill_per_second: float, now: float) -> float:
+        """Take one token; return 0 if allowed, else seconds until a token is available."""
+
+    @abstractmethod
+    def sweep(self, *, idle_seconds: float, now: float) -> None:
+        """Drop buckets idle for at least ``idle_seconds``."""
+
+
+def _take(tokens: float, updated_at: float, *, capacity: float, refill_per_second: float, now: float) -> Tuple[float, float]:
+    """Return (new_tokens, retry_after) for one request against a bucket."""
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * refill_per_second)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / refill_per_second
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets in an LRU dict hard-capped at ``max_keys``."""
+
+    def __init__(self, *, max_keys: int) -> None:
+        self._max_keys = max(1, max_keys)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, *, capacity: float, refill_per_second: float, now: float) -> float:
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens, retry_after = _take(
+                tokens, updated_at, capacity=capacity, refill_per_second=refill_per_second, now=now
+            )
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def sweep(self, *, idle_seconds: float, now: float) -> None:
+        cutoff = now - idle_seconds
+        with self._lock:
+            # Least recently used first: stop at the first key that is still active
+            while self._buckets:
+                key, (_, updated_at) = next(iter(self._buckets.items()))
+                if updated_at > cutoff:
+                    break
+                del self._buckets[key]
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """Buckets in a local SQLite file so every worker process on the host shares them."""
+
+    def __init__(self, *, path: str, max_keys: int) -> None:
+        self._path = path
+        self._max_keys = max(1, max_keys)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_rate_limit_buckets_updated_at "
+            "ON rate_limit_buckets (updated_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key: str, *, capacity: float, refill_per_second: float, now: float) -> float:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated_at = row if row else (capacity, now)
+            tokens, retry_after = _take(
+                tokens, updated_at, capacity=capacity, refill_per_second=refill_per_second, now=now
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
 
-    count, window_start = _rate_limit_store.get(client_ip, (0, now))
+    def sweep(self, *, idle_seconds: float, now: float) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM rate_limit_buckets WHERE updated_at < ?", (now - idle_seconds,))
+        conn.execute(
+            "DELETE FROM rate_limit_buckets WHERE key IN ("
+            "SELECT key FROM rate_limit_buckets ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self._max_keys,),
+        )
+
+
+class RateLimiter:
+    """Per-key token bucket allowing ``requests_per_minute`` with bursts of at most that many."""
+
+    def __init__(self, backend: RateLimitBackend, *, requests_per_minute: int, sweep_interval: float) -> None:
+        self._backend = backend
+        self._capacity = float(max(1, requests_per_minute))
+        self._refill_per_second = self._capacity / 60.0
+        self._sweep_interval = sweep_interval
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_lock = threading.Lock()
+
+    @property
+    def idle_seconds(self) -> float:
+        # Time for an empty bucket to refill completely
+        return self._capacity / self._refill_per_second
+
+    def check(self, key: str) -> float:
+        """Return 0 if the request is allowed, else the seconds to wait."""
+        self._ensure_sweeper()
+        return self._backend.consume(
+            key, capacity=self._capacity, refill_per_second=self._refill_per_second, now=time.time()
+        )
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is not None:
+            return
+        with self._sweeper_lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(
+                    target=self._sweep_forever, name="rate-limit-sweeper", daemon=True
+                )
+                self._sweeper.start()
+
+    def _sweep_forever(self) -> None:
+        while True:
+            time.sleep(self._sweep_interval)
+            try:
+                self._backend.sweep(idle_seconds=self.idle_seconds, now=time.time())
+            except Exception:  # noqa: BLE001
+                logger.exception("Rate limit sweep failed")
 
-    if now - window_start > window_seconds:
-        # Reset window
-        count = 0
-        window_start = now
 
-    count += 1
+def _build_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend == "sqlite":
+        return SQLiteRateLimitBackend(
+            path=settings.rate_limit_sqlite_path, max_keys=settings.rate_limit_max_keys
+        )
+    return MemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys)
+
+
+_limiter = RateLimiter(
+    _build_backend(),
+    requests_per_minute=settings.rate_limit_requests_per_minute,
+    sweep_interval=settings.rate_limit_sweep_interval_seconds,
+)
 
-    _rate_limit_store[client_ip] = (count, window_start)
 
-    if count > max_requests:
+def rate_limiter(request: Request):
+    """
+    Per-client-IP token bucket: up to N requests at once, refilled at N per minute.
+    State lives in memory or, with RATE_LIMIT_BACKEND=sqlite, in a file shared by
+    all worker processes on the host.
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = _limiter.check(client_ip)
+
+    if retry_after > 0:
+        RATE_LIMIT_REJECTIONS.inc()
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
                 "code": "rate_limit_exceeded",
                 "message": "Too many requests. Please wait and try again.",
             },
+            headers={"Retry-After": str(math.ceil(retry_after))},
         )
-
@@ -0,0 +1,37 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from backend.utils.metrics import STAGE_DURATION
+
+
+# Per-request stage durations in milliseconds (set by the timing middleware)
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("flowgen_stages", default=None)
+
+
+def start_request_timing() -> Dict[str, float]:
+    stages: Dict[str, float] = {}
+    _stages.set(stages)
+    return stages
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Record the duration of the block in the stage histogram and, for the current
+    request (if any), add it to ``name`` in the Server-Timing header.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_DURATION.observe(elapsed, name)
+        stages = _stages.get()
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + elapsed * 1000.0
+
+
+def server_timing_header(stages: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={duration:.2f}" for name, duration in stages.items())
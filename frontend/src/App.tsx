@@ -9,13 +9,16 @@ import {
   TabsTrigger,
 } from "./components/ui/tabs";
 import { ToastProvider } from "./components/ui/toast";
-import type { TicketResponse } from "./lib/api";
+import type { TicketResponse, TicketStreamPartial } from "./lib/api";
 
 const App: React.FC = () => {
   const [latestTicket, setLatestTicket] = React.useState<TicketResponse | null>(
     null
   );
   const [loading, setLoading] = React.useState(false);
+  const [partial, setPartial] = React.useState<TicketStreamPartial | null>(
+    null
+  );
 
   return (
     <ToastProvider>
@@ -57,8 +60,13 @@ const App: React.FC = () => {
                 <TicketForm
                   onResult={(ticket) => setLatestTicket(ticket)}
                   onLoadingChange={setLoading}
+                  onPartial={setPartial}
+                />
+                <TicketResult
+                  ticket={latestTicket}
+                  loading={loading}
+                  partial={partial}
                 />
-                <TicketResult ticket={latestTicket} loading={loading} />
               </div>
             </TabsContent>
 
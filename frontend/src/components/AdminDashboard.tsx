@@ -11,8 +11,12 @@ import { Select } from "./ui/select";
 import { Badge } from "./ui/badge";
 import { Skeleton } from "./ui/skeleton";
 import { Card, CardContent, CardHeader, CardTitle } from "./ui/card";
-import type { TicketListItem, TicketLogEntry } from "../lib/api";
-import { getTickets, getTicketLogs } from "../lib/api";
+import type { TicketChange, TicketListItem, TicketLogEntry } from "../lib/api";
+import {
+  getTickets,
+  getTicketLogs,
+  subscribeTicketChanges,
+} from "../lib/api";
 import { useToast } from "./ui/toast";
 
 export const AdminDashboard: React.FC = () => {
@@ -57,6 +61,37 @@ export const AdminDashboard: React.FC = () => {
     void loadTickets();
   }, [loadTickets]);
 
+  // Live updates instead of polling: merge changes into the loaded list
+  React.useEffect(() => {
+    const matches = (t: TicketChange) =>
+      (!statusFilter || t.status === statusFilter) &&
+      (!urgencyFilter || t.urgency === urgencyFilter);
+
+    return subscribeTicketChanges(
+      {
+        status: statusFilter || undefined,
+        urgency: urgencyFilter || undefined,
+      },
+      {
+        onChange: (change, ticket) =>
+          setTickets((current) => {
+            if (!matches(ticket)) {
+              return current.filter((t) => t.id !== ticket.id);
+            }
+            if (change === "updated" && current.some((t) => t.id === ticket.id)) {
+              return current.map((t) => (t.id === ticket.id ? ticket : t));
+            }
+            // New, or updated into the current filters
+            return [ticket, ...current.filter((t) => t.id !== ticket.id)].slice(
+              0,
+              50
+            );
+          }),
+        onReset: () => void loadTickets(),
+      }
+    );
+  }, [statusFilter, urgencyFilter, loadTickets]);
+
   const loadLogs = async (ticketId: number) => {
     try {
       setLogsLoading(true);
@@ -2,16 +2,25 @@ import * as React from "react";
 import { Button } from "./ui/button";
 import { Textarea } from "./ui/textarea";
 import { Alert } from "./ui/alert";
-import type { TicketPayload, TicketResponse } from "../lib/api";
-import { submitTicket } from "../lib/api";
+import type {
+  TicketPayload,
+  TicketResponse,
+  TicketStreamPartial,
+} from "../lib/api";
+import { submitTicketStream } from "../lib/api";
 import { useToast } from "./ui/toast";
 
 type Props = {
   onResult: (ticket: TicketResponse) => void;
   onLoadingChange: (loading: boolean) => void;
+  onPartial: (partial: TicketStreamPartial | null) => void;
 };
 
-export const TicketForm: React.FC<Props> = ({ onResult, onLoadingChange }) => {
+export const TicketForm: React.FC<Props> = ({
+  onResult,
+  onLoadingChange,
+  onPartial,
+}) => {
   const [form, setForm] = React.useState<TicketPayload>({
     name: "",
     email: "",
@@ -59,7 +68,8 @@ export const TicketForm: React.FC<Props> = ({ onResult, onLoadingChange }) => {
     try {
       setSubmitting(true);
       onLoadingChange(true);
-      const result = await submitTicket(form);
+      onPartial(null);
+      const result = await submitTicketStream(form, onPartial);
       onResult(result);
       push({
         title: "Ticket submitted",
@@ -76,6 +86,7 @@ export const TicketForm: React.FC<Props> = ({ onResult, onLoadingChange }) => {
     } finally {
       setSubmitting(false);
       onLoadingChange(false);
+      onPartial(null);
     }
   };
 
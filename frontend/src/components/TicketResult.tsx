@@ -3,11 +3,12 @@ import { Card, CardContent, CardHeader, CardTitle } from "./ui/card";
 import { Badge } from "./ui/badge";
 import { Progress } from "./ui/progress";
 import { Skeleton } from "./ui/skeleton";
-import type { TicketResponse } from "../lib/api";
+import type { TicketResponse, TicketStreamPartial } from "../lib/api";
 
 type Props = {
   ticket?: TicketResponse | null;
   loading: boolean;
+  partial?: TicketStreamPartial | null;
 };
 
 const formatDate = (iso: string) =>
@@ -16,7 +17,47 @@ const formatDate = (iso: string) =>
     timeStyle: "short",
   });
 
-export const TicketResult: React.FC<Props> = ({ ticket, loading }) => {
+export const TicketResult: React.FC<Props> = ({
+  ticket,
+  loading,
+  partial,
+}) => {
+  if (loading && partial) {
+    return (
+      <Card className="h-full">
+        <CardHeader>
+          <CardTitle>Analysis in progress</CardTitle>
+        </CardHeader>
+        <CardContent className="space-y-4">
+          <div className="flex flex-wrap items-center gap-2">
+            {partial.category ? (
+              <Badge className="uppercase tracking-wide">
+                Category: {partial.category}
+              </Badge>
+            ) : (
+              <Skeleton className="h-4 w-32" />
+            )}
+            {partial.urgency && (
+              <Badge variant="outline">
+                Urgency: {partial.urgency.toUpperCase()}
+              </Badge>
+            )}
+          </div>
+          {partial.draft_reply ? (
+            <div className="rounded-md border border-slate-200 bg-slate-50 p-3 text-sm text-slate-800">
+              <p className="whitespace-pre-wrap">{partial.draft_reply}</p>
+              <p className="mt-2 text-[11px] text-slate-500">
+                Still generating; guardrails run once the draft is complete.
+              </p>
+            </div>
+          ) : (
+            <Skeleton className="h-24 w-full" />
+          )}
+        </CardContent>
+      </Card>
+    );
+  }
+
   if (loading) {
     return (
       <Card className="h-full">
@@ -45,6 +45,21 @@ export type TicketLogEntry = {
   ai_output?: string | null;
   guardrail_flags?: string | null;
   routing_decision?: string | null;
+  gemini_error?: string | null;
+  prompt_tokens?: number | null;
+  output_tokens?: number | null;
+  total_tokens?: number | null;
+  classifier?: "gemini" | "local" | null;
+};
+
+// Fields received so far from POST /tickets/stream, before the final ticket
+export type TicketStreamPartial = {
+  category?: string | null;
+  urgency?: string | null;
+  priority_score?: number | null;
+  confidence_score?: number | null;
+  reasoning_summary?: string | null;
+  draft_reply: string;
 };
 
 const API_BASE =
@@ -81,6 +96,65 @@ export async function submitTicket(
   return handleResponse<TicketResponse>(res);
 }
 
+function parseSseEvent(block: string): { event: string; data: string } {
+  let event = "message";
+  const data: string[] = [];
+  for (const line of block.split("\n")) {
+    if (line.startsWith("event:")) event = line.slice(6).trim();
+    else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+  }
+  return { event, data: data.join("\n") };
+}
+
+export async function submitTicketStream(
+  payload: TicketPayload,
+  onPartial: (partial: TicketStreamPartial) => void
+): Promise<TicketResponse> {
+  const res = await fetch(`${API_BASE}/tickets/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "text/event-stream",
+    },
+    body: JSON.stringify(payload),
+  });
+  if (!res.ok || !res.body) {
+    return handleResponse<TicketResponse>(res);
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let partial: TicketStreamPartial = { draft_reply: "" };
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += value.replace(/\r\n/g, "\n");
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const { event, data } = parseSseEvent(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+      if (event === "field") {
+        const field = JSON.parse(data);
+        partial = { ...partial, [field.name]: field.value };
+        onPartial(partial);
+      } else if (event === "draft_delta") {
+        partial = {
+          ...partial,
+          draft_reply: partial.draft_reply + JSON.parse(data).text,
+        };
+        onPartial(partial);
+      } else if (event === "ticket") {
+        await reader.cancel();
+        return JSON.parse(data) as TicketResponse;
+      } else if (event === "error") {
+        throw new Error(JSON.parse(data).message ?? "Request failed");
+      }
+    }
+  }
+  throw new Error("Connection closed before the ticket was stored");
+}
+
 export async function getTickets(params: {
   status?: string;
   urgency?: string;
@@ -101,3 +175,38 @@ export async function getTicketLogs(
   return handleResponse<TicketLogEntry[]>(res);
 }
 
+
+// Event from GET /tickets/changes; previous_* are set on "updated" events
+export type TicketChange = TicketListItem & {
+  routing_decision?: string | null;
+  previous_status?: string | null;
+  previous_urgency?: string | null;
+};
+
+// Subscribes to ticket changes matching the filters. EventSource reconnects on
+// its own and resumes with Last-Event-ID; onReset means the events since the
+// last one received are gone and the list must be reloaded. Returns a function
+// closing the subscription.
+export function subscribeTicketChanges(
+  params: { status?: string; urgency?: string },
+  handlers: {
+    onChange: (change: "created" | "updated", ticket: TicketChange) => void;
+    onReset: () => void;
+  }
+): () => void {
+  const search = new URLSearchParams();
+  if (params.status) search.set("status", params.status);
+  if (params.urgency) search.set("urgency", params.urgency);
+
+  const source = new EventSource(
+    `${API_BASE}/tickets/changes?${search.toString()}`
+  );
+  source.addEventListener("created", (e) =>
+    handlers.onChange("created", JSON.parse((e as MessageEvent).data))
+  );
+  source.addEventListener("updated", (e) =>
+    handlers.onChange("updated", JSON.parse((e as MessageEvent).data))
+  );
+  source.addEventListener("reset", () => handlers.onReset());
+  return () => source.close();
+}